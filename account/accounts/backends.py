@@ -1,10 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 
+from .hashing import check_password
+
 
 class EmailOrPhoneBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         UserModel = get_user_model()
+        # The only backend: also take the USERNAME_FIELD keyword, as
+        # ModelBackend does.
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
         user = None
         if "@" in username:
             try:
@@ -17,6 +25,6 @@ class EmailOrPhoneBackend(ModelBackend):
             except UserModel.DoesNotExist:
                 return None
 
-        if user and user.check_password(password) and self.user_can_authenticate(user):
+        if user and check_password(user, password) and self.user_can_authenticate(user):
             return user
         return None
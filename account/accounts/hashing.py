@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins in progress, please retry shortly."
+    default_code = "hashing_overloaded"
+
+
+class HashingPool:
+    """
+    Process pool for password hashing with a bound on the work in flight:
+    one slot per worker plus PASSWORD_HASH_QUEUE_DEPTH waiting. Work beyond
+    that is rejected at once instead of queueing behind a login burst.
+    """
+
+    def __init__(self, workers, queue_depth):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+        self.executor = ProcessPoolExecutor(workers, initializer=django.setup)
+
+    def run(self, function, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = self.executor.submit(function, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        # The slot frees when the work does, even if the caller gave up.
+        future.add_done_callback(lambda future: self.slots.release())
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+        except TimeoutError:
+            raise HashingOverloaded()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    workers, queue_depth = (
+        settings.PASSWORD_HASH_WORKERS,
+        settings.PASSWORD_HASH_QUEUE_DEPTH,
+    )
+    with _pool_lock:
+        if _pool is None or (_pool.workers, _pool.queue_depth) != (
+            workers,
+            queue_depth,
+        ):
+            if _pool is not None:
+                _pool.executor.shutdown(wait=False)
+            _pool = HashingPool(workers, queue_depth)
+        return _pool
+
+
+def run(function, *args):
+    # PASSWORD_HASH_WORKERS = 0 hashes on the calling thread, as Django does.
+    if not settings.PASSWORD_HASH_WORKERS:
+        return function(*args)
+    return get_pool().run(function, *args)
+
+
+def make_password(raw_password):
+    return run(hashers.make_password, raw_password)
+
+
+def set_password(user, raw_password):
+    """
+    User.set_password, hashing in the pool when one is configured.
+    """
+    user.password = make_password(raw_password)
+    user._password = raw_password
+
+
+def check_password(user, raw_password):
+    """
+    User.check_password, hashing in the pool when one is configured. Like
+    Django, stores a fresh hash when the hasher or its work factor changed.
+    """
+    is_correct, must_update = run(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        set_password(user, raw_password)
+        user._password = None
+        user.save(update_fields=["password"])
+    return is_correct
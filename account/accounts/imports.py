@@ -0,0 +1,134 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import ProhibitNullCharactersValidator
+
+# Columns read from an import file, per model; everything else is ignored.
+IMPORT_FIELDS = {
+    "Customer": ("first_name", "last_name", "phone", "email", "address"),
+    "Supplier": ("name", "phone", "email", "address"),
+}
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+prohibit_null_characters = ProhibitNullCharactersValidator()
+
+
+class RowError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+
+
+def read_csv(upload):
+    # The upload is read line by line from its temporary file, never whole.
+    lines = codecs.iterdecode(upload, "utf-8-sig")
+    for row in csv.DictReader(lines):
+        yield row
+
+
+def read_ndjson(upload):
+    for line in codecs.iterdecode(upload, "utf-8-sig"):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield RowError({"non_field_errors": ["Invalid JSON."]})
+            continue
+        if not isinstance(row, dict):
+            row = RowError({"non_field_errors": ["Expected a JSON object."]})
+        yield row
+
+
+def read_rows(upload):
+    if upload.name.lower().endswith(NDJSON_EXTENSIONS):
+        return read_ndjson(upload)
+    return read_csv(upload)
+
+
+def check_file(upload):
+    """
+    Read the whole upload once without touching the database, so a file that
+    is not UTF-8 or not parseable is refused before any chunk is inserted.
+    Raises ValueError with the reason.
+    """
+    try:
+        for _ in read_rows(upload):
+            pass
+    except UnicodeDecodeError:
+        raise ValueError("The file must be encoded as UTF-8.")
+    except csv.Error as error:
+        raise ValueError(f"The file is not valid CSV: {error}.")
+    finally:
+        upload.seek(0)
+
+
+def clean_row(model, row):
+    """
+    Validate one row with the model's own field validation, including the
+    phone format. Returns the cleaned values or raises RowError.
+    """
+    if isinstance(row, RowError):
+        raise row
+    values, errors = {}, {}
+    for name in IMPORT_FIELDS[model.__name__]:
+        field = model._meta.get_field(name)
+        value = row.get(name)
+        value = "" if value is None else str(value).strip()
+        try:
+            # PostgreSQL text cannot hold NUL; the model fields do not check.
+            prohibit_null_characters(value)
+            values[name] = field.clean(value, None)
+        except ValidationError as error:
+            errors[name] = error.messages
+    if errors:
+        raise RowError(errors)
+    return values
+
+
+def import_records(model, upload, business, user):
+    """
+    Stream an uploaded CSV or NDJSON file into `model` rows of `business`,
+    IMPORT_CHUNK_SIZE rows at a time: each chunk is validated, checked for
+    phones already in the business with one query, and inserted with one
+    bulk_create. Invalid and duplicate rows are skipped and reported by
+    their 1-based row number.
+    """
+    report = {"created": 0, "duplicates": 0, "errors": []}
+    rows = enumerate(read_rows(upload), start=1)
+    seen = set()
+    while chunk := list(islice(rows, settings.IMPORT_CHUNK_SIZE)):
+        valid = []
+        for number, row in chunk:
+            try:
+                valid.append((number, clean_row(model, row)))
+            except RowError as error:
+                report["errors"].append({"row": number, "errors": error.errors})
+
+        existing = set(
+            model.objects.filter(
+                business=business, phone__in={values["phone"] for _, values in valid}
+            ).values_list("phone", flat=True)
+        )
+        records = []
+        for number, values in valid:
+            if values["phone"] in existing or values["phone"] in seen:
+                report["duplicates"] += 1
+                report["errors"].append(
+                    {
+                        "row": number,
+                        "errors": {
+                            "phone": [
+                                f"A {model._meta.verbose_name} with this phone already exists."
+                            ]
+                        },
+                    }
+                )
+                continue
+            seen.add(values["phone"])
+            records.append(model(business=business, created_by=user, **values))
+        model.objects.bulk_create(records)
+        report["created"] += len(records)
+    return report
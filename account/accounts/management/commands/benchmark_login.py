@@ -0,0 +1,60 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand
+
+from accounts.hashing import HashingOverloaded, check_password
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password checks per second as done by login, with the "
+        "current PASSWORD_HASH_* settings. Touches no database rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--logins", type=int, default=200, help="Password checks to run."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=(os.cpu_count() or 1) * 2,
+            help="Request threads checking passwords at once.",
+        )
+
+    def handle(self, *args, **options):
+        password = "benchmark-password"
+        user = User(password=hashers.make_password(password))
+        cores = len(os.sched_getaffinity(0))
+
+        def login(_):
+            try:
+                return check_password(user, password)
+            except HashingOverloaded:
+                return None
+
+        # The first check starts the pool's processes; keep it out of the timing.
+        login(None)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            results = list(executor.map(login, range(options["logins"])))
+        elapsed = time.perf_counter() - started
+
+        succeeded = sum(result is True for result in results)
+        rejected = results.count(None)
+        mode = (
+            f"{settings.PASSWORD_HASH_WORKERS} hashing processes"
+            if settings.PASSWORD_HASH_WORKERS
+            else "hashing on request threads"
+        )
+        self.stdout.write(
+            f"{succeeded} logins in {elapsed:.2f}s with {mode}, "
+            f"{options['concurrency']} concurrent, {rejected} rejected: "
+            f"{succeeded / elapsed:.1f} logins/s, "
+            f"{succeeded / elapsed / cores:.1f} logins/s per core ({cores} cores)."
+        )
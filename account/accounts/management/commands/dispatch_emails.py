@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.models import EmailOutbox
+from accounts.outbox import dispatch_batch, notification_session
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued emails from the outbox to the notification service, "
+        "retrying failures with backoff. Runs until stopped unless --once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send what is due and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Emails claimed per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        session = notification_session()
+        while True:
+            batch = dispatch_batch(session, options["batch_size"])
+            sent = sum(email.status == EmailOutbox.SENT for email in batch)
+            if batch:
+                self.stdout.write(f"Sent {sent} of {len(batch)} emails.")
+            if len(batch) < options["batch_size"]:
+                if options["once"]:
+                    return
+                time.sleep(settings.EMAIL_DISPATCH_POLL_SECONDS)
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0011_remove_employee_business_remove_employee_role_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["business", "created_at"], name="customer_business_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["created_by", "created_at"], name="customer_created_by_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employeebusiness",
+            index=models.Index(
+                fields=["business", "role"], name="employment_business_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["business", "created_at"], name="supplier_business_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["created_by", "created_at"], name="supplier_created_by_idx"
+            ),
+        ),
+    ]
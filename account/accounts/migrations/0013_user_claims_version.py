@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0012_supplier_customer_employment_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="claims_version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
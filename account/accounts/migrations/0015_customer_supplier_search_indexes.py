@@ -0,0 +1,69 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:59
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0014_emailoutbox"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["phone"],
+                name="customer_phone_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Concat(
+                        "first_name", models.Value(" "), "last_name"
+                    ),
+                    name="gin_trgm_ops",
+                ),
+                name="customer_full_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["email"],
+                name="customer_email_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(
+                fields=["phone"],
+                name="supplier_phone_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="supplier_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["email"],
+                name="supplier_email_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
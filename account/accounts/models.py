@@ -1,8 +1,12 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Concat
 from django.core.validators import RegexValidator
 from .manager import CustomUserManager
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
 
@@ -30,6 +34,9 @@ class User(TimeStampedModel, AbstractUser):
         blank=True,
     )
 
+    # Bumped whenever data copied into tokens changes, see accounts.tokens.
+    claims_version = models.PositiveIntegerField(default=1)
+
     objects = CustomUserManager()
 
     USERNAME_FIELD = "phone"
@@ -81,10 +88,41 @@ class Supplier(TimeStampedModel):
         blank=True,
     )
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["business", "created_at"], name="supplier_business_idx"
+            ),
+            models.Index(
+                fields=["created_by", "created_at"], name="supplier_created_by_idx"
+            ),
+            # Prefix search on phone numbers.
+            models.Index(
+                fields=["phone"],
+                name="supplier_phone_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            GinIndex(
+                fields=["name"],
+                name="supplier_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["email"],
+                name="supplier_email_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
 
+# Expression behind the customer name search and its index; the query must
+# use the same expression for PostgreSQL to pick the index.
+CUSTOMER_FULL_NAME = Concat("first_name", Value(" "), "last_name")
+
+
 class Customer(TimeStampedModel):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
@@ -114,6 +152,32 @@ class Customer(TimeStampedModel):
         blank=True,
     )
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=["business", "created_at"], name="customer_business_idx"
+            ),
+            models.Index(
+                fields=["created_by", "created_at"], name="customer_created_by_idx"
+            ),
+            # Prefix search on phone numbers.
+            models.Index(
+                fields=["phone"],
+                name="customer_phone_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            # Names are searched whole, "first last", as cashiers type them.
+            GinIndex(
+                OpClass(CUSTOMER_FULL_NAME, name="gin_trgm_ops"),
+                name="customer_full_name_trgm_idx",
+            ),
+            GinIndex(
+                fields=["email"],
+                name="customer_email_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -163,3 +227,48 @@ class EmployeeBusiness(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
     business = models.ForeignKey(Business, on_delete=models.CASCADE)
     role = models.CharField(max_length=10, choices=Employee.ROLE_CHOICES)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["business", "role"], name="employment_business_idx"),
+        ]
+
+
+class EmailOutbox(models.Model):
+    """
+    Emails waiting to be handed to the notification service. Rows are
+    written in the transaction that triggers the email and sent afterwards
+    by the `dispatch_emails` command.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    recipients = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status="pending"),
+                name="outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.recipients} ({self.status})"
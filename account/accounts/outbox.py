@@ -0,0 +1,137 @@
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import EmailOutbox
+
+
+def enqueue_email(subject, message, recipients):
+    """
+    Queue an email for the notification service. The row is written in the
+    caller's transaction, so the email only goes out if that commits.
+    """
+    return EmailOutbox.objects.create(
+        subject=subject, message=message, recipients=recipients
+    )
+
+
+def enqueue_emails(emails):
+    """
+    Queue many `(subject, message, recipients)` emails with one insert.
+    """
+    return EmailOutbox.objects.bulk_create(
+        EmailOutbox(subject=subject, message=message, recipients=recipients)
+        for subject, message, recipients in emails
+    )
+
+
+def notification_session():
+    # One keep-alive connection per dispatch worker.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=settings.EMAIL_DISPATCH_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(
+        {
+            "Authorization": f"Api-Key {settings.NOTIFICATION_API_KEY}",
+            "Content-Type": "application/json",
+        }
+    )
+    return session
+
+
+def send_emails(session, emails):
+    """
+    Post a chunk of emails to the notification service in one call. Returns
+    one error message per email, None for those that were sent.
+    """
+    payload = json.dumps(
+        {
+            "emails": [
+                {
+                    "subject": email.subject,
+                    "message": email.message,
+                    "recipients": email.recipients,
+                }
+                for email in emails
+            ]
+        }
+    )
+    try:
+        response = session.post(
+            settings.EMAIL_BULK_URL,
+            data=payload,
+            timeout=settings.EMAIL_DISPATCH_TIMEOUT,
+        )
+        response.raise_for_status()
+        results = response.json()["results"]
+        if len(results) != len(emails):
+            raise ValueError(f"Expected {len(emails)} results, got {len(results)}")
+    except (requests.RequestException, ValueError, KeyError) as error:
+        return [str(error)] * len(emails)
+    return [
+        None if result.get("status") == "sent" else result.get("error", "Not sent")
+        for result in results
+    ]
+
+
+def retry_delay(attempts):
+    return datetime.timedelta(
+        seconds=min(
+            settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1),
+            settings.EMAIL_OUTBOX_MAX_BACKOFF_SECONDS,
+        )
+    )
+
+
+def dispatch_batch(session, batch_size=None):
+    """
+    Send up to `batch_size` due emails, EMAIL_OUTBOX_CHUNK_SIZE per call to
+    the notification service, and record the outcome of each. Rows are
+    claimed with SKIP LOCKED, so several dispatchers can run side by side.
+    Failed sends are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS, then marked failed. Returns the batch.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                status=EmailOutbox.PENDING, next_attempt_at__lte=timezone.now()
+            )[:batch_size]
+        )
+        if not batch:
+            return batch
+        size = settings.EMAIL_OUTBOX_CHUNK_SIZE
+        chunks = [batch[start : start + size] for start in range(0, len(batch), size)]
+        with ThreadPoolExecutor(settings.EMAIL_DISPATCH_WORKERS) as executor:
+            errors = [
+                error
+                for chunk_errors in executor.map(
+                    lambda chunk: send_emails(session, chunk), chunks
+                )
+                for error in chunk_errors
+            ]
+
+        now = timezone.now()
+        for email, error in zip(batch, errors):
+            email.attempts += 1
+            if error is None:
+                email.status = EmailOutbox.SENT
+                email.sent_at = now
+                email.last_error = ""
+            elif email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = EmailOutbox.FAILED
+                email.last_error = error
+            else:
+                email.next_attempt_at = now + retry_delay(email.attempts)
+                email.last_error = error
+        EmailOutbox.objects.bulk_update(
+            batch, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+    return batch
@@ -1,5 +1,7 @@
+from django.db.models import Exists, OuterRef, Q
 from rest_framework.permissions import BasePermission
-from .models import Business, Employee, EmployeeBusiness
+from .models import Employee, EmployeeBusiness
+from .roles import get_role_map, parse_business_id, request_role_map
 
 
 class IsOwnerOrAdmin(BasePermission):
@@ -33,28 +35,13 @@ class EmployeeCreatePermission(BasePermission):
     def has_permission(self, request, view):
         if request.method != "POST":
             return True
-        business_id = request.data.get("business")
+        business_id = parse_business_id(request.data.get("business"))
         new_role = request.data.get("role")
         if not business_id or not new_role:
             return False
-        try:
-            business = Business.objects.get(id=business_id)
-        except Business.DoesNotExist:
-            return False
-        user = request.user
-        if business.owner == user or user.is_staff:
-            return True
-        try:
-            requester_eb = EmployeeBusiness.objects.get(
-                business=business, employee=user
-            )
-        except EmployeeBusiness.DoesNotExist:
-            return False
-        if requester_eb.role == "Admin" and new_role in ("Manager", "Sales"):
-            return True
-        elif requester_eb.role == "Manager" and new_role == "Sales":
+        if request.user.is_staff:
             return True
-        return False
+        return request_role_map(request).can_assign(business_id, new_role)
 
 
 class EmployeeUpdatePermission(BasePermission):
@@ -78,21 +65,12 @@ class EmployeeUpdatePermission(BasePermission):
             return base_permission
 
         # For updates that include a business/role change, check permission for that business.
-        try:
-            biz = Business.objects.get(id=business)
-        except Business.DoesNotExist:
+        business_id = parse_business_id(business)
+        if not business_id:
             return False
-        if biz.owner == user or user.is_staff:
-            return True
-        try:
-            requester_eb = EmployeeBusiness.objects.get(business=biz, employee=user)
-        except EmployeeBusiness.DoesNotExist:
-            return False
-        if requester_eb.role == "Admin" and role in ("Manager", "Sales"):
-            return True
-        elif requester_eb.role == "Manager" and role == "Sales":
+        if user.is_staff:
             return True
-        return False
+        return request_role_map(request).can_assign(business_id, role)
 
 
 class EmployeeDeletePermission(BasePermission):
@@ -103,22 +81,13 @@ class EmployeeDeletePermission(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        if user.is_staff:
+        if request.user.is_staff:
             return True
-        ebs = EmployeeBusiness.objects.filter(employee=obj)
-        for eb in ebs:
-            if eb.business.owner == user:
-                return True
-            try:
-                requester_eb = EmployeeBusiness.objects.get(
-                    business=eb.business, employee=user
-                )
-            except EmployeeBusiness.DoesNotExist:
-                continue
-            if requester_eb.role == "Admin":
-                return True
-        return False
+        role_map = request_role_map(request)
+        return any(
+            role_map.owns(business_id) or role_map.role(business_id) == "Admin"
+            for business_id in get_role_map(obj.id).roles
+        )
 
 
 class EmployeeRetrievePermission(BasePermission):
@@ -132,20 +101,13 @@ class EmployeeRetrievePermission(BasePermission):
     def has_object_permission(self, request, view, obj):
         if obj.id == request.user.id:
             return True
-        hierarchy = {"Sales": 1, "Manager": 2, "Admin": 3}
-        ebs = EmployeeBusiness.objects.filter(employee=obj)
-        for eb in ebs:
-            if eb.business.owner == request.user:
-                return True
-            try:
-                requester_eb = EmployeeBusiness.objects.get(
-                    business=eb.business, employee=request.user
-                )
-            except EmployeeBusiness.DoesNotExist:
-                continue
-            if hierarchy.get(requester_eb.role, 0) > hierarchy.get(eb.role, 0):
-                return True
-        return False
+        role_map = request_role_map(request)
+        target = get_role_map(obj.id)
+        return any(
+            role_map.owns(business_id)
+            or role_map.rank(business_id) > target.rank(business_id)
+            for business_id in target.roles
+        )
 
 
 class IsNonEmployeeUser(BasePermission):
@@ -153,3 +115,37 @@ class IsNonEmployeeUser(BasePermission):
         if request.method == "POST":
             return not Employee.objects.filter(id=request.user.id).exists()
         return True
+
+
+def visible_business_records(queryset, request):
+    """
+    Limit a queryset of business-scoped rows (suppliers, customers) to those
+    the user created or that belong to a business they own or work for.
+    """
+    user = request.user
+    if user.is_staff:
+        return queryset
+    return queryset.filter(
+        Q(created_by=user) | Q(business_id__in=request_role_map(request).business_ids())
+    )
+
+
+def visible_employees(queryset, request):
+    """
+    Limit an Employee queryset to the user, the employees they created and
+    the employees they may retrieve: everyone in a business they own, and
+    lower roles in a business they work for.
+    """
+    user = request.user
+    if user.is_staff:
+        return queryset
+    role_map = request_role_map(request)
+    employments = Q(business_id__in=role_map.owned)
+    for business_id, roles in role_map.outranked_roles().items():
+        if roles:
+            employments |= Q(business_id=business_id, role__in=roles)
+    return queryset.filter(
+        Q(pk=user.pk)
+        | Q(created_by=user)
+        | Exists(EmployeeBusiness.objects.filter(employments, employee=OuterRef("pk")))
+    )
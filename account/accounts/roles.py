@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Business, EmployeeBusiness
+
+ROLE_RANK = {"Sales": 1, "Manager": 2, "Admin": 3}
+# Roles an employee may hand out within their business.
+ASSIGNABLE_ROLES = {"Admin": {"Manager", "Sales"}, "Manager": {"Sales"}}
+
+
+class RoleMap:
+    """
+    The businesses a user owns and the role they hold in every business they
+    work for, so permission checks are dictionary lookups.
+    """
+
+    def __init__(self, owned, roles):
+        self.owned = frozenset(owned)
+        self.roles = dict(roles)
+
+    def owns(self, business_id):
+        return business_id in self.owned
+
+    def role(self, business_id):
+        return self.roles.get(business_id)
+
+    def rank(self, business_id):
+        return ROLE_RANK.get(self.roles.get(business_id), 0)
+
+    def business_ids(self):
+        return self.owned | self.roles.keys()
+
+    def outranked_roles(self):
+        # {business: roles below the user's}, for every business they work for.
+        return {
+            business_id: [
+                other for other, rank in ROLE_RANK.items() if rank < ROLE_RANK[role]
+            ]
+            for business_id, role in self.roles.items()
+        }
+
+    def can_assign(self, business_id, role):
+        return self.owns(business_id) or role in ASSIGNABLE_ROLES.get(
+            self.roles.get(business_id), ()
+        )
+
+
+def cache_key(user_id):
+    return f"accounts:roles:{user_id}"
+
+
+def load_role_map(user_id):
+    owned = Business.objects.filter(owner_id=user_id).values_list("id", flat=True)
+    roles = EmployeeBusiness.objects.filter(employee_id=user_id).values_list(
+        "business_id", "role"
+    )
+    return RoleMap(owned, roles)
+
+
+def get_role_map(user_id):
+    """
+    Role map of a user from the shared cache, loaded in two queries on a
+    miss. Entries are dropped whenever an owned business or an employment
+    of the user changes.
+    """
+    key = cache_key(user_id)
+    role_map = cache.get(key)
+    if role_map is None:
+        role_map = load_role_map(user_id)
+        cache.set(key, role_map, settings.ROLE_MAP_CACHE_TIMEOUT)
+    return role_map
+
+
+def request_role_map(request):
+    # Permission classes run several times per request; look up once.
+    role_map = getattr(request, "_role_map", None)
+    if role_map is None:
+        role_map = request._role_map = get_role_map(request.user.id)
+    return role_map
+
+
+def invalidate_role_maps(*user_ids):
+    # Dropped once the change commits: a request in between would otherwise
+    # reload the old roles and cache them for ROLE_MAP_CACHE_TIMEOUT.
+    keys = [cache_key(user_id) for user_id in user_ids if user_id]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def capture_business_owner(sender, instance, raw=False, **kwargs):
+    # Connected to pre_save: a changed owner invalidates the previous one too.
+    instance.previous_owner_id = None
+    if not raw and instance.pk:
+        instance.previous_owner_id = (
+            Business.objects.filter(pk=instance.pk)
+            .values_list("owner_id", flat=True)
+            .first()
+        )
+
+
+def business_changed(sender, instance, **kwargs):
+    invalidate_role_maps(
+        instance.owner_id, getattr(instance, "previous_owner_id", None)
+    )
+
+
+def employment_changed(sender, instance, **kwargs):
+    invalidate_role_maps(instance.employee_id)
+
+
+def parse_business_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,55 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from .roles import parse_business_id
+
+
+def search_records(queryset, term, fields):
+    """
+    Search business records by `term`, best matches first. Digits are matched
+    as a phone prefix; anything else by trigram word similarity against
+    `fields`, field names or expressions. Both filters are served by the
+    indexes on the model.
+    """
+    term = term.strip()
+    if term.isdigit():
+        return queryset.filter(phone__startswith=term).order_by("phone")
+    expressions = {
+        f"search_{index}": F(field) if isinstance(field, str) else field
+        for index, field in enumerate(fields)
+    }
+    # `%>` is the operator the gin_trgm_ops indexes answer; similarity()
+    # in the WHERE clause would scan every row.
+    matches = Q()
+    for alias in expressions:
+        matches |= Q(**{f"{alias}__trigram_word_similar": term})
+    similarities = [
+        TrigramWordSimilarity(term, expression) for expression in expressions.values()
+    ]
+    return (
+        queryset.alias(**expressions)
+        .filter(matches)
+        .annotate(
+            similarity=(
+                Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+            )
+        )
+        .order_by("-similarity", "-created_at")
+    )
+
+
+def search_list(queryset, request, fields):
+    """
+    Apply the `business` and `search` query parameters of a list request.
+    """
+    business = request.query_params.get("business")
+    if business is not None:
+        business_id = parse_business_id(business)
+        if business_id is None:
+            return queryset.none()
+        queryset = queryset.filter(business_id=business_id)
+    term = request.query_params.get("search", "")
+    if term.strip():
+        queryset = search_records(queryset, term, fields)
+    return queryset
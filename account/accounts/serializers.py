@@ -1,5 +1,3 @@
-import json
-import requests
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.encoding import force_bytes, force_str
@@ -7,7 +5,12 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from rest_framework import serializers
 from django.core.mail import send_mail
 from django.conf import settings
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 from .models import (
     Supplier,
     Customer,
@@ -16,13 +19,15 @@ from .models import (
     EmployeeInvitation,
     EmployeeBusiness,
 )
+from .hashing import set_password
+from .imports import check_file
+from .outbox import enqueue_email
+from .throttling import login_failed, login_succeeded
+from .tokens import add_user_claims
 
 
 User = get_user_model()
 
-email_url = settings.EMAIL_URL
-notification_api_key = settings.NOTIFICATION_API_KEY
-
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -46,7 +51,7 @@ class UserSerializer(serializers.ModelSerializer):
             password = validated_data.pop("password", None)
             user = super().create(validated_data)
             if password:
-                user.set_password(password)
+                set_password(user, password)
                 user.save()
             return user
         raise serializers.ValidationError("Email or phone is required.")
@@ -67,20 +72,7 @@ class PasswordResetSerializer(serializers.Serializer):
         token = default_token_generator.make_token(user)
         reset_url = f"{request.scheme}://{request.get_host()}/accounts/password-reset-confirm/{uid}/{token}/"
         email_message = "Click the link below to reset your password:\n\n" + reset_url
-        email_subject = "Password Reset"
-        recipients = user.email
-        payload = json.dumps(
-            {
-                "subject": email_subject,
-                "message": email_message,
-                "recipients": recipients,
-            }
-        )
-        headers = {
-            "Authorization": f"Api-Key {notification_api_key}",
-            "Content-Type": "application/json",
-        }
-        response = requests.request("POST", email_url, headers=headers, data=payload)
+        enqueue_email("Password Reset", email_message, user.email)
 
 
 class SetNewPasswordSerializer(serializers.Serializer):
@@ -123,18 +115,24 @@ class PasswordChangeSerializer(serializers.Serializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = "identifier"
 
+    @classmethod
+    def get_token(cls, user):
+        # Profile and business roles travel in the token, so verifying it
+        # needs no database access.
+        return add_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         identifier = attrs.get("identifier")
         password = attrs.get("password", "")
         if not identifier or not password:
             raise serializers.ValidationError("Identifier and password are required.")
 
-        user = authenticate(
-            request=self.context.get("request"), username=identifier, password=password
-        )
+        request = self.context.get("request")
+        user = authenticate(request=request, username=identifier, password=password)
         if not user:
-            print(user)
+            login_failed(request)
             raise serializers.ValidationError("No user with these credentials.")
+        login_succeeded(request)
 
         refresh = self.get_token(user)
         data = {
@@ -153,6 +151,24 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that issues the access token with the user's current claims
+    rather than the ones copied from the refresh token.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        return {"access": str(add_user_claims(refresh.access_token, user))}
+
+
 class SupplierSerializer(serializers.ModelSerializer):
     class Meta:
         model = Supplier
@@ -240,3 +256,51 @@ class EmployeeInvitationSerializer(serializers.ModelSerializer):
     class Meta:
         model = EmployeeInvitation
         fields = ["email", "first_name", "last_name", "phone", "role", "business"]
+
+
+class EmployeeInvitationLineSerializer(serializers.ModelSerializer):
+    # A plain id: the businesses of a bulk request are checked in one query.
+    business = serializers.IntegerField()
+
+    class Meta:
+        model = EmployeeInvitation
+        fields = ["email", "first_name", "last_name", "phone", "role", "business"]
+
+
+class BulkEmployeeInvitationSerializer(serializers.Serializer):
+    invitations = EmployeeInvitationLineSerializer(
+        many=True, allow_empty=False, max_length=settings.EMPLOYEE_INVITATION_BULK_MAX
+    )
+
+    def validate_invitations(self, invitations):
+        business_ids = {line["business"] for line in invitations}
+        missing = business_ids - set(
+            Business.objects.filter(id__in=business_ids).values_list("id", flat=True)
+        )
+        if missing:
+            raise serializers.ValidationError(
+                f"Unknown businesses: {', '.join(map(str, sorted(missing)))}."
+            )
+        seen = set()
+        for line in invitations:
+            key = (line["email"].lower(), line["business"])
+            if key in seen:
+                raise serializers.ValidationError(
+                    f"{line['email']} is invited to business {line['business']} more than once."
+                )
+            seen.add(key)
+        return invitations
+
+
+class RecordImportSerializer(serializers.Serializer):
+    file = serializers.FileField(
+        help_text="CSV with a header row, or NDJSON (.ndjson, .jsonl)."
+    )
+    business = serializers.PrimaryKeyRelatedField(queryset=Business.objects.all())
+
+    def validate_file(self, upload):
+        try:
+            check_file(upload)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        return upload
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import Business, Employee, EmployeeBusiness, User
+from .roles import business_changed, capture_business_owner, employment_changed
+from .tokens import (
+    business_deleted,
+    business_saved,
+    capture_profile_claims,
+    employment_roles_changed,
+    profile_saved,
+)
+
+pre_save.connect(
+    capture_business_owner, sender=Business, dispatch_uid="roles_business_owner"
+)
+post_save.connect(business_changed, sender=Business, dispatch_uid="roles_business_save")
+post_delete.connect(
+    business_changed, sender=Business, dispatch_uid="roles_business_delete"
+)
+post_save.connect(
+    employment_changed, sender=EmployeeBusiness, dispatch_uid="roles_employment_save"
+)
+post_delete.connect(
+    employment_changed,
+    sender=EmployeeBusiness,
+    dispatch_uid="roles_employment_delete",
+)
+
+post_save.connect(business_saved, sender=Business, dispatch_uid="claims_business_save")
+post_delete.connect(
+    business_deleted, sender=Business, dispatch_uid="claims_business_delete"
+)
+post_save.connect(
+    employment_roles_changed,
+    sender=EmployeeBusiness,
+    dispatch_uid="claims_employment_save",
+)
+post_delete.connect(
+    employment_roles_changed,
+    sender=EmployeeBusiness,
+    dispatch_uid="claims_employment_delete",
+)
+
+for model in (User, Employee):
+    pre_save.connect(
+        capture_profile_claims,
+        sender=model,
+        dispatch_uid=f"claims_profile_{model.__name__}",
+    )
+    post_save.connect(
+        profile_saved,
+        sender=model,
+        dispatch_uid=f"claims_profile_save_{model.__name__}",
+    )
@@ -3,7 +3,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from .models import (
     EmployeeBusiness,
     User,
@@ -12,9 +12,25 @@ from .models import (
     Business,
     Employee,
     EmployeeInvitation,
+    EmailOutbox,
 )
+from . import hashing
+from .outbox import enqueue_emails
+from .serializers import UserSerializer
 import json
-from unittest.mock import patch
+from io import StringIO
+from unittest.mock import Mock, patch
+import requests
+from django.core.management import call_command
+from unittest import skipUnless
+from django.db import connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from django.core.cache import cache
+from core.testing import QueryCountAssertionsMixin
+from .roles import cache_key, get_role_map
+from .tokens import claims_version_key
 
 
 env = Env()
@@ -250,6 +266,156 @@ class UserCRUDAPITestCase(BaseAPITestCase):
         self.assertIn("refresh", response.data)
 
 
+@override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_DEPTH=0)
+class PasswordHashingPoolTestCase(BaseAPITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="pooled@example.com", phone="912345790", password="pooledpass"
+        )
+
+    def login(self, password, identifier=None):
+        return self.client.post(
+            reverse("token_obtain_pair"),
+            {"identifier": identifier or self.user.email, "password": password},
+            format="json",
+            **self.get_api_key(),
+        )
+
+    def test_login_hashes_in_pool(self):
+        cache.clear()
+        attempts = [
+            ("pooledpass", self.user.email, status.HTTP_200_OK),
+            ("wrongpass", self.user.email, status.HTTP_400_BAD_REQUEST),
+            ("wrongpass", self.user.phone, status.HTTP_400_BAD_REQUEST),
+        ]
+        for password, identifier, expected in attempts:
+            with self.subTest(password=password, identifier=identifier), patch.object(
+                hashing.HashingPool,
+                "run",
+                autospec=True,
+                side_effect=hashing.HashingPool.run,
+            ) as pool_run, patch(
+                "django.contrib.auth.base_user.check_password"
+            ) as thread_check:
+                response = self.login(password, identifier)
+                self.assertEqual(response.status_code, expected)
+                # One hash, in the pool; none on the request thread, even
+                # after a failure.
+                self.assertEqual(pool_run.call_count, 1)
+                self.assertFalse(thread_check.called)
+
+    def test_full_pool_rejects_at_once(self):
+        pool = hashing.get_pool()
+        pool.slots.acquire()
+        try:
+            response = self.login("pooledpass")
+        finally:
+            pool.slots.release()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_signup_hashes_in_pool(self):
+        serializer = UserSerializer(
+            data={
+                "email": "signup@example.com",
+                "phone": "912345791",
+                "first_name": "Sign",
+                "last_name": "Up",
+                "password": "signuppass",
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        user = serializer.save()
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("signuppass"))
+
+
+@override_settings(
+    LOGIN_THROTTLES={
+        "login": {"window": 60, "identifier": 3, "ip": 5},
+        "password_reset": {"window": 60, "identifier": 2, "ip": 5},
+    }
+)
+class LoginThrottleTestCase(BaseAPITestCase):
+    def setUp(self):
+        cache.clear()
+        # Mid-window, so no attempt of a test spills into the next bucket.
+        clock = patch("accounts.throttling.time", Mock(time=Mock(return_value=30.0)))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.user = User.objects.create_user(
+            email="throttled@example.com", phone="912345792", password="rightpass"
+        )
+
+    def login(self, identifier, password):
+        return self.client.post(
+            reverse("token_obtain_pair"),
+            {"identifier": identifier, "password": password},
+            format="json",
+            **self.get_api_key(),
+        )
+
+    def test_failed_logins_are_throttled_before_hashing(self):
+        for _ in range(3):
+            response = self.login(self.user.email, "wrongpass")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with patch("accounts.serializers.authenticate") as authenticate:
+            response = self.login("Throttled@example.com", "rightpass")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(authenticate.called)
+        # Other accounts from the same address are still below the IP limit.
+        self.assertEqual(
+            self.login(self.user.phone, "rightpass").status_code, status.HTTP_200_OK
+        )
+        # Which failures for any identifier count towards.
+        self.login("someone@example.com", "wrongpass")
+        self.login("someone.else@example.com", "wrongpass")
+        self.assertEqual(
+            self.login(self.user.phone, "rightpass").status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    def test_forged_forwarded_for_does_not_reset_ip_limit(self):
+        for index in range(5):
+            self.client.post(
+                reverse("token_obtain_pair"),
+                {"identifier": f"user{index}@example.com", "password": "wrongpass"},
+                format="json",
+                HTTP_X_FORWARDED_FOR=f"203.0.113.{index}",
+                **self.get_api_key(),
+            )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"identifier": self.user.email, "password": "rightpass"},
+            format="json",
+            HTTP_X_FORWARDED_FOR="198.51.100.7",
+            **self.get_api_key(),
+        )
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_successful_login_clears_identifier_failures(self):
+        for _ in range(2):
+            self.login(self.user.email, "wrongpass")
+        self.assertEqual(
+            self.login(self.user.email, "rightpass").status_code, status.HTTP_200_OK
+        )
+        for _ in range(2):
+            self.login(self.user.email, "wrongpass")
+        self.assertEqual(
+            self.login(self.user.email, "rightpass").status_code, status.HTTP_200_OK
+        )
+
+    def test_password_reset_is_throttled(self):
+        url = reverse("password-reset")
+        data = {"email": self.user.email}
+        for _ in range(2):
+            response = self.client.post(url, data, format="json", **self.get_api_key())
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(url, data, format="json", **self.get_api_key())
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+
 class SupplierCRUDAPITestCase(BaseAPITestCase):
     def setUp(self):
         self.admin_user = User.objects.create_superuser(
@@ -796,14 +962,10 @@ class EmployeeInvitationTestCase(BaseAPITestCase):
         headers.update(self.get_api_key())
         return headers
 
-    @patch("accounts.views.requests.request")
-    def test_employee_invitation_create(self, mock_request):
+    def test_employee_invitation_create(self):
         """
-        Ensure that an invitation is created and an email is attempted to be sent.
+        Ensure that an invitation is created and its email is queued.
         """
-        # Simulate a successful email API call
-        mock_request.return_value.status_code = 200
-
         data = {
             "email": "invitee@example.com",
             "first_name": "Invite",
@@ -825,22 +987,16 @@ class EmployeeInvitationTestCase(BaseAPITestCase):
         self.assertIsNotNone(invitation)
         self.assertFalse(invitation.accepted)
 
-        # Assert that the email sending API was called
-        self.assertTrue(mock_request.called)
-        args, kwargs = mock_request.call_args
-        # Check that the payload contains the acceptance link with the invitation token.
-        payload = json.loads(kwargs.get("data", "{}"))
-        self.assertIn(str(invitation.token), payload.get("message", ""))
+        # The invitation email waits in the outbox with the acceptance link.
+        email = EmailOutbox.objects.get(recipients="invitee@example.com")
+        self.assertEqual(email.status, EmailOutbox.PENDING)
+        self.assertIn(str(invitation.token), email.message)
 
-    @patch("accounts.views.requests.request")
-    def test_employee_invitation_accept(self, mock_request):
+    def test_employee_invitation_accept(self):
         """
         Ensure that hitting the accept URL immediately creates the employee using a temporary password,
-        marks the invitation as accepted and attempts to send a congratulatory email.
+        marks the invitation as accepted and queues a congratulatory email.
         """
-        # Simulate a successful email API call
-        mock_request.return_value.status_code = 200
-
         # Create an invitation manually
         invitation = EmployeeInvitation.objects.create(
             email="invitee2@example.com",
@@ -869,11 +1025,128 @@ class EmployeeInvitationTestCase(BaseAPITestCase):
         invitation.refresh_from_db()
         self.assertTrue(invitation.accepted)
 
-        # Assert that the congratulatory email API was called.
-        self.assertTrue(mock_request.called)
-        args, kwargs = mock_request.call_args
-        payload = json.loads(kwargs.get("data", "{}"))
-        self.assertIn("Welcome Aboard", payload.get("subject", ""))
+        # The congratulatory email is queued in the outbox.
+        email = EmailOutbox.objects.get(recipients="invitee2@example.com")
+        self.assertIn("Welcome Aboard", email.subject)
+
+    def test_employee_invitation_bulk_create(self):
+        other_business = Business.objects.create(
+            name="Second Business",
+            address="456 Invite Road",
+            category="Services",
+            owner=self.owner_user,
+        )
+        data = {
+            "invitations": [
+                {
+                    "email": f"bulk{index}@example.com",
+                    "first_name": "Bulk",
+                    "last_name": str(index),
+                    "phone": f"91234572{index}",
+                    "role": "Sales",
+                    "business": business.id,
+                }
+                for index, business in enumerate(
+                    [self.business, self.business, other_business]
+                )
+            ]
+        }
+        headers = self.get_auth_headers(self.owner_user)
+        response = self.client.post(
+            reverse("employee-invite-bulk"), data, format="json", **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(
+            EmployeeInvitation.objects.filter(email__startswith="bulk").count(), 3
+        )
+        # One queued email per invitation, each with its own link.
+        for invitation in EmployeeInvitation.objects.filter(email__startswith="bulk"):
+            email = EmailOutbox.objects.get(recipients=invitation.email)
+            self.assertIn(str(invitation.token), email.message)
+
+    def test_employee_invitation_bulk_create_checks_each_business(self):
+        other_business = Business.objects.create(
+            name="Foreign Business",
+            address="789 Invite Road",
+            category="Services",
+            owner=self.owner_user,
+        )
+        data = {
+            "invitations": [
+                {
+                    "email": "allowed@example.com",
+                    "first_name": "Allowed",
+                    "last_name": "Invitee",
+                    "phone": "912345730",
+                    "role": "Sales",
+                    "business": self.business.id,
+                },
+                {
+                    "email": "denied@example.com",
+                    "first_name": "Denied",
+                    "last_name": "Invitee",
+                    "phone": "912345731",
+                    "role": "Sales",
+                    "business": other_business.id,
+                },
+            ]
+        }
+        headers = self.get_auth_headers(self.creator)
+        response = self.client.post(
+            reverse("employee-invite-bulk"), data, format="json", **headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data["businesses"], [other_business.id])
+        # Nothing is created when any line is refused.
+        self.assertFalse(EmployeeInvitation.objects.exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    @patch("accounts.outbox.requests.Session.post")
+    @override_settings(EMAIL_OUTBOX_CHUNK_SIZE=2)
+    def test_dispatch_sends_and_retries(self, mock_post):
+        sent, refused, retried = enqueue_emails(
+            [
+                ("Sent", "Message", "sent@example.com"),
+                ("Refused", "Message", "refused@example.com"),
+                ("Retried", "Message", "retried@example.com"),
+            ]
+        )
+
+        def post(url, data, timeout):
+            emails = json.loads(data)["emails"]
+            if emails[0]["recipients"] == retried.recipients:
+                raise requests.ConnectionError("Notification service down")
+            return Mock(
+                json=Mock(
+                    return_value={
+                        "results": [
+                            {"status": "sent"},
+                            {"status": "failed", "error": "Recipient refused"},
+                        ]
+                    }
+                )
+            )
+
+        mock_post.side_effect = post
+        call_command("dispatch_emails", "--once", stdout=StringIO())
+        # Two chunks, two calls.
+        self.assertEqual(mock_post.call_count, 2)
+
+        for email in (sent, refused, retried):
+            email.refresh_from_db()
+        self.assertEqual(sent.status, EmailOutbox.SENT)
+        self.assertEqual(refused.status, EmailOutbox.PENDING)
+        self.assertEqual(refused.last_error, "Recipient refused")
+        self.assertEqual(retried.status, EmailOutbox.PENDING)
+        self.assertEqual(retried.attempts, 1)
+        self.assertGreater(retried.next_attempt_at, timezone.now())
+        self.assertIn("Notification service down", retried.last_error)
+
+        # Nothing is due until the backoff has passed.
+        mock_post.reset_mock()
+        call_command("dispatch_emails", "--once", stdout=StringIO())
+        self.assertFalse(mock_post.called)
 
 
 class EmployeeCRUDPermissionTestCase(BaseAPITestCase):
@@ -1015,3 +1288,503 @@ class EmployeeCRUDPermissionTestCase(BaseAPITestCase):
                 employee=self.employee_by_owner, business=self.business, role="Sales"
             ).exists()
         )
+
+
+class RoleMapTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.owner = User.objects.create_user(
+            email="ownerroles@example.com", phone="912345691", password="ownerpass"
+        )
+        self.business = Business.objects.create(
+            name="Roles Business",
+            address="200 Business Rd",
+            category="Retail",
+            owner=self.owner,
+        )
+        self.manager = Employee.objects.create_user(
+            email="managerroles@example.com", phone="912345692", password="pass"
+        )
+        self.sales = Employee.objects.create_user(
+            email="salesroles@example.com", phone="912345693", password="pass"
+        )
+        EmployeeBusiness.objects.create(
+            employee=self.manager, business=self.business, role="Manager"
+        )
+        EmployeeBusiness.objects.create(
+            employee=self.sales, business=self.business, role="Sales"
+        )
+
+    def get_headers(self, user):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.get_jwt_token(user)}"}
+        headers.update(self.get_api_key())
+        return headers
+
+    def test_role_map_is_cached(self):
+        with self.assertNumQueries(2):
+            role_map = get_role_map(self.owner.id)
+        self.assertTrue(role_map.owns(self.business.id))
+        get_role_map(self.manager.id)
+        with self.assertNumQueries(0):
+            role_map = get_role_map(self.manager.id)
+        self.assertEqual(role_map.role(self.business.id), "Manager")
+        self.assertTrue(role_map.can_assign(self.business.id, "Sales"))
+        self.assertFalse(role_map.can_assign(self.business.id, "Admin"))
+
+    def test_changes_invalidate_role_map(self):
+        self.assertEqual(
+            get_role_map(self.manager.id).role(self.business.id), "Manager"
+        )
+        eb = EmployeeBusiness.objects.get(employee=self.manager)
+        eb.role = "Admin"
+        with self.captureOnCommitCallbacks(execute=True):
+            eb.save()
+        self.assertEqual(get_role_map(self.manager.id).role(self.business.id), "Admin")
+        with self.captureOnCommitCallbacks(execute=True):
+            eb.delete()
+        self.assertIsNone(get_role_map(self.manager.id).role(self.business.id))
+
+        self.assertTrue(get_role_map(self.owner.id).owns(self.business.id))
+        self.business.owner = self.manager
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.save()
+        self.assertFalse(get_role_map(self.owner.id).owns(self.business.id))
+        self.assertTrue(get_role_map(self.manager.id).owns(self.business.id))
+
+    def test_role_map_is_dropped_after_commit(self):
+        get_role_map(self.manager.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                EmployeeBusiness.objects.get(employee=self.manager).delete()
+                # Nothing is dropped before the commit, so a concurrent
+                # request cannot reload and re-cache the old roles.
+                self.assertIsNotNone(cache.get(cache_key(self.manager.id)))
+            self.assertIsNotNone(cache.get(cache_key(self.manager.id)))
+        self.assertIsNone(cache.get(cache_key(self.manager.id)))
+        self.assertIsNone(get_role_map(self.manager.id).role(self.business.id))
+
+    def test_retrieve_uses_role_hierarchy(self):
+        response = self.client.get(
+            reverse("employee-detail", args=[self.sales.id]),
+            **self.get_headers(self.manager),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(
+            reverse("employee-detail", args=[self.manager.id]),
+            **self.get_headers(self.sales),
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ScopedListTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.owner = User.objects.create_user(
+            email="ownerscope@example.com", phone="912345701", password="pass"
+        )
+        self.other_owner = User.objects.create_user(
+            email="otherscope@example.com", phone="912345702", password="pass"
+        )
+        self.business = Business.objects.create(
+            name="Scoped", address="1 Rd", category="Retail", owner=self.owner
+        )
+        self.other_business = Business.objects.create(
+            name="Other", address="2 Rd", category="Retail", owner=self.other_owner
+        )
+        self.manager = Employee.objects.create_user(
+            email="managerscope@example.com", phone="912345703", password="pass"
+        )
+        self.sales = Employee.objects.create_user(
+            email="salesscope@example.com", phone="912345704", password="pass"
+        )
+        self.outsider = Employee.objects.create_user(
+            email="outsiderscope@example.com", phone="912345705", password="pass"
+        )
+        for employee, business, role in (
+            (self.manager, self.business, "Manager"),
+            (self.sales, self.business, "Sales"),
+            (self.outsider, self.other_business, "Sales"),
+        ):
+            EmployeeBusiness.objects.create(
+                employee=employee, business=business, role=role
+            )
+        supplier = {
+            "phone": "912345706",
+            "email": "supplier@example.com",
+            "address": "Supplier address",
+        }
+        self.own_supplier = Supplier.objects.create(
+            name="Own", business=self.business, **supplier
+        )
+        self.other_supplier = Supplier.objects.create(
+            name="Other", business=self.other_business, **supplier
+        )
+
+    def get_headers(self, user):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.get_jwt_token(user)}"}
+        headers.update(self.get_api_key())
+        return headers
+
+    def list_ids(self, url_name, user):
+        response = self.client.get(reverse(url_name), **self.get_headers(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row["id"] for row in response.data["results"]}
+
+    def test_suppliers_are_scoped_to_business(self):
+        self.assertEqual(
+            self.list_ids("supplier-list", self.owner), {self.own_supplier.id}
+        )
+        self.assertEqual(
+            self.list_ids("supplier-list", self.sales), {self.own_supplier.id}
+        )
+        self.assertEqual(
+            self.list_ids("supplier-list", self.other_owner), {self.other_supplier.id}
+        )
+        # Single objects still go through the object-level permission.
+        response = self.client.get(
+            reverse("supplier-detail", args=[self.other_supplier.id]),
+            **self.get_headers(self.owner),
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def search_ids(self, url_name, user, **params):
+        response = self.client.get(reverse(url_name), params, **self.get_headers(user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_search_by_phone_prefix(self):
+        Customer.objects.bulk_create(
+            Customer(
+                first_name="Prefix",
+                last_name=str(index),
+                phone=phone,
+                email=f"prefix{index}@example.com",
+                address="Customer address",
+                business=business,
+            )
+            for index, (phone, business) in enumerate(
+                [
+                    ("911000002", self.business),
+                    ("911000001", self.business),
+                    ("922000001", self.business),
+                    ("911000003", self.other_business),
+                ]
+            )
+        )
+        ids = self.search_ids("customer-list", self.sales, search="9110")
+        # Only the caller's businesses, in phone order.
+        self.assertEqual(
+            [Customer.objects.get(id=id).phone for id in ids],
+            ["911000001", "911000002"],
+        )
+        self.assertEqual(
+            self.search_ids(
+                "supplier-list", self.owner, search="9123", business=self.business.id
+            ),
+            [self.own_supplier.id],
+        )
+        self.assertEqual(
+            self.search_ids("supplier-list", self.owner, business="abc"), []
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Trigram search needs PostgreSQL")
+    def test_search_by_name(self):
+        supplier = {
+            "phone": "912345707",
+            "email": "wholesale@example.com",
+            "address": "Supplier address",
+            "business": self.business,
+        }
+        match = Supplier.objects.create(name="Abebe Trading", **supplier)
+        Supplier.objects.create(name="Kebede Imports", **supplier)
+        # Partial, misspelled names still find the supplier.
+        self.assertEqual(
+            self.search_ids("supplier-list", self.owner, search="abebe trad"),
+            [match.id],
+        )
+        self.assertEqual(
+            self.search_ids("supplier-list", self.owner, search="Abebi"),
+            [match.id],
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "Trigram search needs PostgreSQL")
+    def test_search_customers_by_full_name(self):
+        customer = {
+            "phone": "912345708",
+            "email": "walkin@example.com",
+            "address": "Customer address",
+            "business": self.business,
+        }
+        match = Customer.objects.create(
+            first_name="Abebe", last_name="Kebede", **customer
+        )
+        Customer.objects.create(first_name="Abebe", last_name="Tadesse", **customer)
+        Customer.objects.create(first_name="Almaz", last_name="Girma", **customer)
+        # First and last name together, as cashiers type them.
+        self.assertEqual(
+            self.search_ids("customer-list", self.sales, search="Abebe Kebede"),
+            [match.id],
+        )
+        self.assertEqual(
+            self.search_ids("customer-list", self.sales, search="kebede"), [match.id]
+        )
+
+    def import_file(self, url_name, user, name, content, business):
+        return self.client.post(
+            reverse(url_name),
+            {
+                "file": SimpleUploadedFile(
+                    name, content if isinstance(content, bytes) else content.encode()
+                ),
+                "business": business,
+            },
+            format="multipart",
+            **self.get_headers(user),
+        )
+
+    @override_settings(IMPORT_CHUNK_SIZE=2)
+    def test_import_customers_from_csv(self):
+        Customer.objects.create(
+            first_name="Existing",
+            last_name="Customer",
+            phone="911111111",
+            email="existing@example.com",
+            address="Address",
+            business=self.business,
+        )
+        content = (
+            "first_name,last_name,phone,email,address\n"
+            "New,One,911111112,one@example.com,Address\n"
+            "Bad,Phone,811111113,bad@example.com,Address\n"
+            "Old,Phone,911111111,old@example.com,Address\n"
+            "New,Two,711111114,two@example.com,Address\n"
+            "Same,File,911111112,again@example.com,Address\n"
+        )
+        response = self.import_file(
+            "customer-import", self.sales, "customers.csv", content, self.business.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["duplicates"], 2)
+        self.assertEqual(
+            sorted(
+                (error["row"], *error["errors"]) for error in response.data["errors"]
+            ),
+            [(2, "phone"), (3, "phone"), (5, "phone")],
+        )
+        imported = Customer.objects.filter(
+            business=self.business, created_by=self.sales
+        )
+        self.assertEqual(
+            sorted(imported.values_list("phone", flat=True)), ["711111114", "911111112"]
+        )
+
+    @override_settings(IMPORT_CHUNK_SIZE=1)
+    def test_import_rejects_unreadable_files_up_front(self):
+        content = (
+            "first_name,last_name,phone,email,address\n"
+            "New,One,911111112,one@example.com,Address\n"
+            "Caf\xe9,Two,911111113,two@example.com,Address\n"
+        ).encode("cp1252")
+        response = self.import_file(
+            "customer-import", self.owner, "customers.csv", content, self.business.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data)
+        # Not even the chunk before the bad byte is inserted.
+        self.assertFalse(Customer.objects.filter(phone="911111112").exists())
+
+    def test_import_reports_null_characters(self):
+        content = (
+            "first_name,last_name,phone,email,address\n"
+            "Nul\x00,One,911111112,one@example.com,Address\n"
+        )
+        response = self.import_file(
+            "customer-import", self.owner, "customers.csv", content, self.business.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "row": 1,
+                    "errors": {"first_name": ["Null characters are not allowed."]},
+                }
+            ],
+        )
+
+    def test_import_suppliers_from_ndjson(self):
+        content = "\n".join(
+            [
+                json.dumps(
+                    {
+                        "name": "Imported",
+                        "phone": "912222221",
+                        "email": "imported@example.com",
+                        "address": "Address",
+                    }
+                ),
+                "{not json",
+                json.dumps({"name": "No Phone", "email": "nophone@example.com"}),
+            ]
+        )
+        response = self.import_file(
+            "supplier-import", self.owner, "suppliers.ndjson", content, self.business.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        errors = {error["row"]: error["errors"] for error in response.data["errors"]}
+        self.assertIn("non_field_errors", errors[2])
+        self.assertEqual(set(errors[3]), {"phone", "address"})
+        self.assertTrue(
+            Supplier.objects.filter(name="Imported", business=self.business).exists()
+        )
+
+        # Only into businesses the requester belongs to.
+        response = self.import_file(
+            "supplier-import",
+            self.outsider,
+            "suppliers.ndjson",
+            content,
+            self.business.id,
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_employees_are_scoped_by_role(self):
+        self.assertEqual(
+            self.list_ids("employee-list", self.owner),
+            {self.manager.id, self.sales.id},
+        )
+        self.assertEqual(
+            self.list_ids("employee-list", self.manager),
+            {self.manager.id, self.sales.id},
+        )
+        self.assertEqual(self.list_ids("employee-list", self.sales), {self.sales.id})
+
+
+class EmployeeListQueryCountTestCase(QueryCountAssertionsMixin, BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # One owner per list size, each with that many employees.
+        self.owners = {}
+        for size in (1, 5, 10):
+            owner = User.objects.create_user(
+                email=f"ownercount{size}@example.com",
+                phone=f"9123457{size:02d}",
+                password="pass",
+            )
+            business = Business.objects.create(
+                name=f"Counted {size}", address="3 Rd", category="Retail", owner=owner
+            )
+            for index in range(size):
+                employee = Employee.objects.create_user(
+                    email=f"counted{size}-{index}@example.com",
+                    phone=f"91234{size:02d}{index:02d}",
+                    password="pass",
+                )
+                EmployeeBusiness.objects.create(
+                    employee=employee, business=business, role="Sales"
+                )
+            self.owners[size] = owner
+
+    def list_employees(self, size):
+        owner = self.owners[size]
+        response = self.client.get(
+            reverse("employee-list"),
+            HTTP_AUTHORIZATION=f"Bearer {self.get_jwt_token(owner)}",
+            **self.get_api_key(),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], size)
+        self.assertTrue(
+            all(row["employee_businesses"] for row in response.data["results"])
+        )
+
+    def test_employee_list_query_count_is_constant(self):
+        self.assertQueryCountConstant(self.list_employees)
+
+
+class TokenClaimsTestCase(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="claims@example.com",
+            phone="912345721",
+            password="claimspass",
+            first_name="Claims",
+        )
+        self.business = Business.objects.create(
+            name="Claims", address="4 Rd", category="Retail", owner=self.user
+        )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"identifier": self.user.email, "password": "claimspass"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.access = response.data["access"]
+        self.refresh = response.data["refresh"]
+
+    def verify(self, token):
+        return self.client.post(
+            reverse("token_verify"), {"token": token}, format="json"
+        )
+
+    def test_verification_reads_claims_from_token(self):
+        claims = AccessToken(self.access)
+        self.assertEqual(claims["email"], self.user.email)
+        self.assertEqual(claims["businesses"], [self.business.id])
+        self.verify(self.access)
+        with self.assertNumQueries(0):
+            response = self.verify(self.access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["user"]["first_name"], "Claims")
+        self.assertEqual(response.data["user"]["id"], self.user.id)
+
+    def test_profile_change_rejects_stale_claims(self):
+        # Caches the current claims version.
+        self.assertEqual(self.verify(self.access).status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.user.first_name = "Renamed"
+        key = claims_version_key(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+            # Kept until the commit, so no verification in between can
+            # cache the old version again.
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+        response = self.verify(self.access)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": self.refresh}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.verify(response.data["access"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["user"]["first_name"], "Renamed")
+
+    def test_role_change_rejects_stale_claims(self):
+        self.user.last_login = None
+        self.user.save(update_fields=["last_login"])
+        self.assertEqual(self.verify(self.access).status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Business.objects.create(
+                name="Other", address="5 Rd", category="Retail", owner=self.user
+            )
+        self.assertEqual(
+            self.verify(self.access).status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        response = self.client.post(
+            reverse("token_refresh"), {"refresh": self.refresh}, format="json"
+        )
+        response = self.verify(response.data["access"])
+        self.assertEqual(
+            response.data["user"]["businesses"], [self.business.id, other.id]
+        )
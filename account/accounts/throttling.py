@@ -0,0 +1,129 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Sliding window counters in the shared cache, one per identifier (email
+    or phone) and one per client IP, with limits from LOGIN_THROTTLES[scope].
+    Each counter keeps a bucket per window; the count is the current bucket
+    plus the share of the previous one still inside the window. Checked
+    before the view runs, so a rejected request costs one cache read and
+    no password hash.
+    """
+
+    scope = None
+    identifier_field = None
+
+    def __init__(self):
+        self.config = settings.LOGIN_THROTTLES[self.scope]
+        self.window = self.config["window"]
+
+    def counter_keys(self, request):
+        # {limit name: counter key}; the identifier is hashed to keep keys
+        # short and free of characters some cache backends refuse.
+        keys = {"ip": f"throttle:{self.scope}:ip:{self.get_ident(request)}"}
+        identifier = request.data.get(self.identifier_field)
+        if isinstance(identifier, str) and identifier.strip():
+            digest = hashlib.sha256(identifier.strip().lower().encode()).hexdigest()
+            keys["identifier"] = f"throttle:{self.scope}:identifier:{digest}"
+        return keys
+
+    def buckets(self, now):
+        current = int(now // self.window)
+        return current, current - 1
+
+    def counts(self, keys, now):
+        current, previous = self.buckets(now)
+        stored = cache.get_many(
+            [
+                f"{key}:{bucket}"
+                for key in keys.values()
+                for bucket in (current, previous)
+            ]
+        )
+        # Share of the previous window that still overlaps the sliding one.
+        overlap = 1 - (now % self.window) / self.window
+        return {
+            name: stored.get(f"{key}:{current}", 0)
+            + stored.get(f"{key}:{previous}", 0) * overlap
+            for name, key in keys.items()
+        }
+
+    def allow_request(self, request, view):
+        self.now = time.time()
+        self.keys = self.counter_keys(request)
+        counts = self.counts(self.keys, self.now)
+        return all(counts[name] < self.config[name] for name in self.keys)
+
+    def wait(self):
+        # The previous bucket has fully aged out by the end of this window.
+        return self.window - self.now % self.window
+
+    def hit(self):
+        current, _ = self.buckets(self.now)
+        for key in self.keys.values():
+            bucket_key = f"{key}:{current}"
+            # The bucket lives through this window and the next one.
+            cache.add(bucket_key, 0, self.window * 2)
+            try:
+                cache.incr(bucket_key)
+            except ValueError:
+                cache.set(bucket_key, 1, self.window * 2)
+
+    def reset(self, names):
+        current, previous = self.buckets(self.now)
+        cache.delete_many(
+            [
+                f"{self.keys[name]}:{bucket}"
+                for name in names
+                if name in self.keys
+                for bucket in (current, previous)
+            ]
+        )
+
+
+class LoginThrottle(SlidingWindowThrottle):
+    """
+    Limits failed logins. Failures are counted by the token serializer
+    through `login_failed`; a success clears the identifier's counter.
+    """
+
+    scope = "login"
+    identifier_field = "identifier"
+
+    def allow_request(self, request, view):
+        allowed = super().allow_request(request, view)
+        request.login_throttle = self
+        return allowed
+
+
+class PasswordResetThrottle(SlidingWindowThrottle):
+    """
+    Limits password reset requests; each one sends an email.
+    """
+
+    scope = "password_reset"
+    identifier_field = "email"
+
+    def allow_request(self, request, view):
+        if not super().allow_request(request, view):
+            return False
+        self.hit()
+        return True
+
+
+def login_failed(request):
+    throttle = getattr(request, "login_throttle", None)
+    if throttle is not None:
+        throttle.hit()
+
+
+def login_succeeded(request):
+    throttle = getattr(request, "login_throttle", None)
+    if throttle is not None:
+        throttle.reset(["identifier"])
@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import User
+from .roles import get_role_map
+
+# User fields copied into tokens; changing any of them bumps claims_version.
+PROFILE_CLAIMS = ("email", "first_name", "last_name", "phone")
+
+
+def user_claims(user):
+    role_map = get_role_map(user.id)
+    return {
+        **{field: getattr(user, field) for field in PROFILE_CLAIMS},
+        "businesses": sorted(role_map.owned),
+        # JSON object keys are strings.
+        "roles": {
+            str(business_id): role for business_id, role in role_map.roles.items()
+        },
+        "claims_version": user.claims_version,
+    }
+
+
+def add_user_claims(token, user):
+    for claim, value in user_claims(user).items():
+        token[claim] = value
+    return token
+
+
+def claims_version_key(user_id):
+    return f"accounts:claims_version:{user_id}"
+
+
+def current_claims_version(user_id):
+    """
+    The claims version tokens of a user must carry, from the cache or one
+    query on a miss. None if the user no longer exists.
+    """
+    key = claims_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id)
+            .values_list("claims_version", flat=True)
+            .first()
+        )
+        if version is not None:
+            cache.set(key, version, settings.CLAIMS_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def forget_claims_versions(*user_ids):
+    # Dropped once the change commits: a token verified in between would
+    # otherwise re-cache the old version and keep stale tokens valid.
+    keys = [claims_version_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def bump_claims_version(*user_ids):
+    user_ids = [user_id for user_id in user_ids if user_id]
+    User.objects.filter(pk__in=user_ids).update(claims_version=F("claims_version") + 1)
+    forget_claims_versions(*user_ids)
+
+
+def capture_profile_claims(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Connected to pre_save of User and Employee. Always takes the stored
+    # version, so saving an instance loaded earlier never winds it back.
+    instance.claims_changed = False
+    if raw or instance.pk is None:
+        return
+    stored = (
+        User.objects.filter(pk=instance.pk)
+        .values("claims_version", *PROFILE_CLAIMS)
+        .first()
+    )
+    if stored is None:
+        return
+    fields = PROFILE_CLAIMS if update_fields is None else update_fields
+    instance.claims_changed = any(
+        getattr(instance, field) != stored[field]
+        for field in PROFILE_CLAIMS
+        if field in fields
+    )
+    instance.claims_version = stored["claims_version"] + int(instance.claims_changed)
+
+
+def profile_saved(sender, instance, update_fields=None, **kwargs):
+    if not getattr(instance, "claims_changed", False):
+        return
+    if update_fields is not None and "claims_version" not in update_fields:
+        User.objects.filter(pk=instance.pk).update(
+            claims_version=instance.claims_version
+        )
+    forget_claims_versions(instance.pk)
+
+
+def business_saved(sender, instance, created, raw=False, **kwargs):
+    # Saves that keep the owner leave the claims as they were.
+    previous_owner_id = getattr(instance, "previous_owner_id", None)
+    if created:
+        bump_claims_version(instance.owner_id)
+    elif previous_owner_id != instance.owner_id:
+        bump_claims_version(instance.owner_id, previous_owner_id)
+
+
+def business_deleted(sender, instance, **kwargs):
+    bump_claims_version(instance.owner_id)
+
+
+def employment_roles_changed(sender, instance, **kwargs):
+    bump_claims_version(instance.employee_id)
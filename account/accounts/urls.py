@@ -5,7 +5,6 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     UserViewSet,
     SupplierViewSet,
@@ -16,9 +15,11 @@ from .views import (
     PasswordResetConfirmView,
     PasswordChangeView,
     CustomTokenObtainPairView,
+    ClaimsTokenRefreshView,
     JWTTokenVerifyView,
     api_documentation,
     EmployeeInvitationCreateView,
+    EmployeeInvitationBulkCreateView,
     EmployeeInvitationAcceptView,
 )
 
@@ -32,7 +33,7 @@ router.register(r"businesses", BusinessViewSet)
 urlpatterns = [
     path("", api_documentation, name="api_documentation"),
     path("token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/refresh/", ClaimsTokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", JWTTokenVerifyView.as_view(), name="token_verify"),
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -51,6 +52,11 @@ urlpatterns = [
         EmployeeInvitationCreateView.as_view(),
         name="employee-invite",
     ),
+    path(
+        "employee/invite/bulk/",
+        EmployeeInvitationBulkCreateView.as_view(),
+        name="employee-invite-bulk",
+    ),
     path(
         "employee/invite/accept/<uuid:token>/",
         EmployeeInvitationAcceptView.as_view(),
@@ -1,16 +1,24 @@
-import json
 from django.contrib.auth import get_user_model
 from django.contrib.auth import update_session_auth_hash
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenVerifyView
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+    TokenVerifyView,
+)
 from .serializers import (
     PasswordResetSerializer,
     SetNewPasswordSerializer,
     PasswordChangeSerializer,
     UserSerializer,
     CustomTokenObtainPairSerializer,
+    ClaimsTokenRefreshSerializer,
     SupplierSerializer,
     CustomerSerializer,
     BusinessSerializer,
@@ -28,17 +36,38 @@ from .permissions import (
     EmployeeDeletePermission,
     EmployeeRetrievePermission,
     IsNonEmployeeUser,
+    visible_business_records,
+    visible_employees,
+)
+from .models import (
+    CUSTOMER_FULL_NAME,
+    EmployeeBusiness,
+    User,
+    Supplier,
+    Customer,
+    Business,
+    Employee,
 )
-from .models import EmployeeBusiness, User, Supplier, Customer, Business, Employee
+from .imports import import_records
+from .outbox import enqueue_email, enqueue_emails
+from .roles import request_role_map
+from .search import search_list
+from .throttling import LoginThrottle, PasswordResetThrottle
+from .tokens import PROFILE_CLAIMS, current_claims_version, user_claims
 from django.shortcuts import render
 from rest_framework_simplejwt.tokens import AccessToken
-import requests
-from django.conf import settings
 from .models import EmployeeInvitation
 from .serializers import (
+    BulkEmployeeInvitationSerializer,
     EmployeeInvitationSerializer,
+    RecordImportSerializer,
 )  # create one for invitation if needed
-from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiExample
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiExample,
+    OpenApiParameter,
+)
 
 User = get_user_model()
 
@@ -106,6 +135,7 @@ class UserViewSet(viewsets.ModelViewSet):
 )
 class PasswordResetView(generics.GenericAPIView):
     serializer_class = PasswordResetSerializer
+    throttle_classes = [PasswordResetThrottle]
 
     def post(self, request):
         serializer = self.get_serializer(
@@ -184,12 +214,58 @@ class PasswordChangeView(generics.UpdateAPIView):
 )
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginThrottle]
+
+
+@extend_schema_view(
+    post=extend_schema(
+        summary="Token refresh",
+        description="Obtain a new access token, carrying the user's current claims, from a refresh token.",
+    ),
+)
+class ClaimsTokenRefreshView(TokenRefreshView):
+    serializer_class = ClaimsTokenRefreshSerializer
+
+
+def import_response(view, request):
+    """
+    Import the uploaded file into the view's model for a business the
+    requester owns or works for, and report the outcome per row.
+    """
+    serializer = RecordImportSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    business = serializer.validated_data["business"]
+    if not request.user.is_staff and business.id not in (
+        request_role_map(request).business_ids()
+    ):
+        return Response(
+            {"detail": "You do not have access to this business."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    report = import_records(
+        view.queryset.model,
+        serializer.validated_data["file"],
+        business,
+        request.user,
+    )
+    return Response(report)
+
+
+SEARCH_LIST_PARAMETERS = [
+    OpenApiParameter(
+        "search",
+        str,
+        description="Digits match a phone prefix; other text matches names and email by similarity, best first.",
+    ),
+    OpenApiParameter("business", int, description="Only this business."),
+]
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List Suppliers",
-        description="Retrieve a list of all suppliers. (Admin only)",
+        description="Retrieve the suppliers of your businesses or created by you. (Admin: all)",
+        parameters=SEARCH_LIST_PARAMETERS,
     ),
     retrieve=extend_schema(
         summary="Retrieve Supplier",
@@ -216,12 +292,41 @@ class SupplierViewSet(viewsets.ModelViewSet):
     queryset = Supplier.objects.all()
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    search_fields = ("name", "email")
+
+    def get_queryset(self):
+        # Lists are scoped in the query; single objects keep the object-level
+        # permission check and its 403.
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = search_list(
+                visible_business_records(queryset, self.request),
+                self.request,
+                self.search_fields,
+            )
+        return queryset
+
+    @extend_schema(
+        summary="Import Suppliers",
+        description="Create suppliers of a business from a CSV or NDJSON file. Invalid rows and phones already in the business are skipped and reported by row number.",
+        request=RecordImportSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_file(self, request):
+        return import_response(self, request)
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List Customers",
-        description="Retrieve a list of all customers. (Admin only)",
+        description="Retrieve the customers of your businesses or created by you. (Admin: all)",
+        parameters=SEARCH_LIST_PARAMETERS,
     ),
     retrieve=extend_schema(
         summary="Retrieve Customer",
@@ -248,6 +353,34 @@ class CustomerViewSet(viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+    search_fields = (CUSTOMER_FULL_NAME, "email")
+
+    def get_queryset(self):
+        # Lists are scoped in the query; single objects keep the object-level
+        # permission check and its 403.
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = search_list(
+                visible_business_records(queryset, self.request),
+                self.request,
+                self.search_fields,
+            )
+        return queryset
+
+    @extend_schema(
+        summary="Import Customers",
+        description="Create customers of a business from a CSV or NDJSON file. Invalid rows and phones already in the business are skipped and reported by row number.",
+        request=RecordImportSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_file(self, request):
+        return import_response(self, request)
 
 
 @extend_schema_view(
@@ -293,7 +426,7 @@ class BusinessViewSet(viewsets.ModelViewSet):
 @extend_schema_view(
     list=extend_schema(
         summary="List Employees",
-        description="Retrieve a list of all employees. (Admin only)",
+        description="Retrieve the employees you may view: yourself, those you created and those below you in your businesses. (Admin: all)",
     ),
     retrieve=extend_schema(
         summary="Retrieve Employee",
@@ -327,6 +460,19 @@ class EmployeeViewSet(viewsets.ModelViewSet):
             self.permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "employeebusiness_set",
+                    queryset=EmployeeBusiness.objects.select_related("business"),
+                )
+            )
+        if self.action == "list":
+            queryset = visible_employees(queryset, self.request)
+        return queryset
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         business_id = request.data.get("business")
@@ -390,12 +536,31 @@ class JWTTokenVerifyView(TokenVerifyView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        # Decode token and fetch user data
-        token = request.data.get("token")
-        access_token = AccessToken(token)
+        access_token = AccessToken(request.data.get("token"))
         user_id = access_token.get("user_id")
-        user = User.objects.get(id=user_id)
-        user_data = UserSerializer(user).data
+        version = current_claims_version(user_id)
+        if version is None:
+            return Response(
+                {"detail": "Token is invalid or expired"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        if "claims_version" in access_token:
+            # Claims travel in the token; only their version is checked.
+            if access_token["claims_version"] != version:
+                return Response(
+                    {"detail": "Token claims are outdated, refresh the token"},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+            user_data = {
+                claim: access_token[claim]
+                for claim in (*PROFILE_CLAIMS, "businesses", "roles")
+            }
+        else:
+            # Tokens issued without claims fall back to the database.
+            user = User.objects.get(id=user_id)
+            user_data = user_claims(user)
+            user_data.pop("claims_version")
         user_data.update({"id": user_id})
 
         return Response(
@@ -418,26 +583,90 @@ class EmployeeInvitationCreateView(generics.CreateAPIView):
     serializer_class = EmployeeInvitationSerializer
     permission_classes = [IsAuthenticated, EmployeeCreatePermission]
 
+    @transaction.atomic
     def perform_create(self, serializer):
         invitation = serializer.save(created_by=self.request.user)
-        # Construct the acceptance URL. Adjust BASE_URL as appropriate.
-        request = self.request
-        acceptance_link = f"{request.scheme}://{request.get_host()}/employee/invite/accept/{invitation.token}/"
-        # Send invitation email via NOTIFICATION_API.
-        email_url = settings.EMAIL_URL
-        notification_api_key = settings.NOTIFICATION_API_KEY
-        payload = json.dumps(
-            {
-                "subject": "You're Invited to Join as an Employee",
-                "message": f"Please click the following link to accept your invitation: {acceptance_link}",
-                "recipients": invitation.email,
-            }
+        # Queued with the invitation, sent by the dispatch_emails command.
+        enqueue_email(*invitation_email(self.request, invitation))
+
+
+def invitation_email(request, invitation):
+    """
+    The (subject, message, recipients) of the email inviting an employee.
+    """
+    # Construct the acceptance URL. Adjust BASE_URL as appropriate.
+    acceptance_link = f"{request.scheme}://{request.get_host()}/employee/invite/accept/{invitation.token}/"
+    return (
+        "You're Invited to Join as an Employee",
+        f"Please click the following link to accept your invitation: {acceptance_link}",
+        invitation.email,
+    )
+
+
+@extend_schema_view(
+    post=extend_schema(
+        summary="Bulk Employee Invitation Create",
+        description="Create many invitations at once, across businesses, and queue their emails.",
+        responses=EmployeeInvitationSerializer(many=True),
+    )
+)
+class EmployeeInvitationBulkCreateView(generics.GenericAPIView):
+    """
+    Creates invitations in bulk. Permission is checked per business from the
+    requester's role map, with the same rules as a single invitation.
+    """
+
+    serializer_class = BulkEmployeeInvitationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = serializer.validated_data["invitations"]
+
+        if not request.user.is_staff:
+            role_map = request_role_map(request)
+            denied = sorted(
+                {
+                    line["business"]
+                    for line in lines
+                    if not role_map.can_assign(line["business"], line["role"])
+                }
+            )
+            if denied:
+                return Response(
+                    {
+                        "detail": "You may not invite these roles to these businesses.",
+                        "businesses": denied,
+                    },
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        with transaction.atomic():
+            invitations = EmployeeInvitation.objects.bulk_create(
+                EmployeeInvitation(
+                    created_by=request.user,
+                    business_id=line["business"],
+                    **{
+                        field: line[field]
+                        for field in (
+                            "email",
+                            "first_name",
+                            "last_name",
+                            "phone",
+                            "role",
+                        )
+                    },
+                )
+                for line in lines
+            )
+            enqueue_emails(
+                invitation_email(request, invitation) for invitation in invitations
+            )
+        return Response(
+            EmployeeInvitationSerializer(invitations, many=True).data,
+            status=status.HTTP_201_CREATED,
         )
-        headers = {
-            "Authorization": f"Api-Key {notification_api_key}",
-            "Content-Type": "application/json",
-        }
-        response = requests.request("POST", email_url, headers=headers, data=payload)
 
 
 @extend_schema_view(
@@ -454,9 +683,12 @@ class EmployeeInvitationAcceptView(generics.GenericAPIView):
 
     permission_classes = [AllowAny]
 
+    @transaction.atomic
     def post(self, request, token):
         try:
-            invitation = EmployeeInvitation.objects.get(token=token, accepted=False)
+            invitation = EmployeeInvitation.objects.select_for_update().get(
+                token=token, accepted=False
+            )
         except EmployeeInvitation.DoesNotExist:
             return Response(
                 {"detail": "Invalid or expired invitation token."},
@@ -487,24 +719,15 @@ class EmployeeInvitationAcceptView(generics.GenericAPIView):
         invitation.accepted = True
         invitation.save()
 
-        # Send congratulatory email via NOTIFICATION_API.
-        email_url = settings.EMAIL_URL
-        notification_api_key = settings.NOTIFICATION_API_KEY
-        payload = json.dumps(
-            {
-                "subject": "Welcome Aboard!",
-                "message": (
-                    "Congratulations on joining our team. Your default password is 'password'. "
-                    "Please change it after logging in."
-                ),
-                "recipients": invitation.email,
-            }
+        # Congratulatory email, sent once this transaction commits.
+        enqueue_email(
+            "Welcome Aboard!",
+            (
+                "Congratulations on joining our team. Your default password is 'password'. "
+                "Please change it after logging in."
+            ),
+            invitation.email,
         )
-        headers = {
-            "Authorization": f"Api-Key {notification_api_key}",
-            "Content-Type": "application/json",
-        }
-        requests.request("POST", email_url, headers=headers, data=payload)
 
         serializer = EmployeeSerializer(employee)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
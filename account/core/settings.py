@@ -31,6 +31,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "rest_framework_simplejwt",
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryStatsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -47,6 +49,30 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request query instrumentation, see core.middleware.
+QUERY_STATS_ENABLED = env.bool("QUERY_STATS_ENABLED", default=True)
+# Server-Timing reveals DB timings to clients, keep it to development.
+QUERY_STATS_SERVER_TIMING = env.bool("QUERY_STATS_SERVER_TIMING", default=DEBUG)
+QUERY_STATS_SLOWEST = env.int("QUERY_STATS_SLOWEST", default=3)
+# Identical statements run this many times in one request are logged as
+# a likely N+1 pattern.
+QUERY_STATS_REPEAT_THRESHOLD = env.int("QUERY_STATS_REPEAT_THRESHOLD", default=10)
+
+# One JSON line per request from QueryStatsMiddleware; the default WARNING
+# threshold would keep only the N+1 warnings.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"query_stats": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "query_stats": {
+            "handlers": ["query_stats"],
+            "level": env.str("QUERY_STATS_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -82,6 +108,15 @@ DATABASES = {
     }
 }
 
+# locmem is per process; with several workers point CACHE_URL at a shared
+# cache (e.g. redis://) so invalidations reach all of them.
+CACHES = {"default": env.dj_cache_url("CACHE_URL", default="locmem://")}
+
+# Seconds a user's business roles stay cached; changes invalidate it earlier.
+ROLE_MAP_CACHE_TIMEOUT = env.int("ROLE_MAP_CACHE_TIMEOUT", default=300)
+# Seconds a user's current token claims version stays cached.
+CLAIMS_VERSION_CACHE_TIMEOUT = env.int("CLAIMS_VERSION_CACHE_TIMEOUT", default=300)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -132,9 +167,22 @@ REST_FRAMEWORK = {
         "accounts.api_key_auth.APIKeyAuthentication",
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "accounts.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "accounts.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    # Reverse proxies in front of the service that append to X-Forwarded-For.
+    # Throttles key on the client IP; with 0 the header is ignored, so
+    # clients cannot forge it to dodge the per-IP login limit.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
 SPECTACULAR_SETTINGS = {
@@ -148,12 +196,55 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
-EMAIL_URL = env.str("NOTIFICATION_API_URL") + "/api/send-single-email/"
+EMAIL_BULK_URL = env.str("NOTIFICATION_API_URL") + "/api/send-bulk-email/"
 NOTIFICATION_API_KEY = env.str("NOTIFICATION_API_KEY")
 
+# Outbox dispatch, see accounts.outbox and the dispatch_emails command.
+EMAIL_OUTBOX_BATCH_SIZE = env.int("EMAIL_OUTBOX_BATCH_SIZE", default=200)
+# Emails per send-bulk-email call, at most the notification service's limit.
+EMAIL_OUTBOX_CHUNK_SIZE = env.int("EMAIL_OUTBOX_CHUNK_SIZE", default=50)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int("EMAIL_OUTBOX_MAX_ATTEMPTS", default=8)
+# Retries wait BACKOFF * 2^(attempts - 1) seconds, up to MAX_BACKOFF.
+EMAIL_OUTBOX_BACKOFF_SECONDS = env.int("EMAIL_OUTBOX_BACKOFF_SECONDS", default=30)
+EMAIL_OUTBOX_MAX_BACKOFF_SECONDS = env.int(
+    "EMAIL_OUTBOX_MAX_BACKOFF_SECONDS", default=3600
+)
+# Rows of a customer or supplier import validated and inserted together.
+IMPORT_CHUNK_SIZE = env.int("IMPORT_CHUNK_SIZE", default=1000)
+# Most invitations accepted by one bulk invitation request.
+EMPLOYEE_INVITATION_BULK_MAX = env.int("EMPLOYEE_INVITATION_BULK_MAX", default=500)
+EMAIL_DISPATCH_WORKERS = env.int("EMAIL_DISPATCH_WORKERS", default=4)
+EMAIL_DISPATCH_TIMEOUT = env.float("EMAIL_DISPATCH_TIMEOUT", default=10.0)
+EMAIL_DISPATCH_POLL_SECONDS = env.float("EMAIL_DISPATCH_POLL_SECONDS", default=2.0)
+
+# Sliding window limits, kept in the shared cache, per identifier and per
+# client IP: failed logins, and password reset requests.
+LOGIN_THROTTLES = {
+    "login": {
+        "window": env.int("LOGIN_THROTTLE_WINDOW", default=900),
+        "identifier": env.int("LOGIN_THROTTLE_IDENTIFIER_LIMIT", default=5),
+        "ip": env.int("LOGIN_THROTTLE_IP_LIMIT", default=100),
+    },
+    "password_reset": {
+        "window": env.int("PASSWORD_RESET_THROTTLE_WINDOW", default=3600),
+        "identifier": env.int("PASSWORD_RESET_THROTTLE_IDENTIFIER_LIMIT", default=3),
+        "ip": env.int("PASSWORD_RESET_THROTTLE_IP_LIMIT", default=20),
+    },
+}
+
+# Processes hashing passwords for logins and sign-ups; 0 hashes on the
+# request thread. At most PASSWORD_HASH_QUEUE_DEPTH more hashes wait for a
+# worker, beyond that requests get a 503 right away.
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=0)
+PASSWORD_HASH_QUEUE_DEPTH = env.int("PASSWORD_HASH_QUEUE_DEPTH", default=16)
+# Seconds a request waits for its hash once queued.
+PASSWORD_HASH_TIMEOUT = env.float("PASSWORD_HASH_TIMEOUT", default=10)
+
+# EmailOrPhoneBackend extends ModelBackend and hashes through
+# accounts.hashing; a ModelBackend fallback would hash again on the request
+# thread after every failed login.
 AUTHENTICATION_BACKENDS = [
     "accounts.backends.EmailOrPhoneBackend",
-    "django.contrib.auth.backends.ModelBackend",
 ]
 
 API_KEYS = {
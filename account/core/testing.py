@@ -0,0 +1,30 @@
+from .middleware import collect_queries
+
+
+class QueryCountAssertionsMixin:
+    """
+    TestCase mixin for catching N+1 queries before they ship.
+    """
+
+    def assertQueryCountConstant(self, run, sizes=(1, 5, 10)):
+        """
+        Call `run(size)` for each size, typically a request returning `size`
+        rows, and fail if the number of queries differs between sizes.
+        """
+        counts = {}
+        for size in sizes:
+            with collect_queries() as stats:
+                run(size)
+            counts[size] = stats
+        if len({stats.count for stats in counts.values()}) > 1:
+            largest = counts[max(sizes)]
+            repeated = largest.repeated(2)
+            self.fail(
+                "Query count grows with result size: "
+                + ", ".join(f"{size}: {stats.count}" for size, stats in counts.items())
+                + (
+                    f". Most repeated ({repeated[0][1]}x): {repeated[0][0]}"
+                    if repeated
+                    else ""
+                )
+            )
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryStatsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -37,6 +38,30 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request query instrumentation, see core.middleware.
+QUERY_STATS_ENABLED = True
+# Server-Timing reveals DB timings to clients, keep it to development.
+QUERY_STATS_SERVER_TIMING = DEBUG
+QUERY_STATS_SLOWEST = 3
+# Identical statements run this many times in one request are logged as
+# a likely N+1 pattern.
+QUERY_STATS_REPEAT_THRESHOLD = 10
+
+# One JSON line per request from QueryStatsMiddleware; the default WARNING
+# threshold would keep only the N+1 warnings.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"query_stats": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "query_stats": {
+            "handlers": ["query_stats"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 ROOT_URLCONF = "core.urls"
 
 TEMPLATES = [
@@ -109,6 +134,15 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "inventory.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "inventory.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
@@ -157,6 +191,276 @@ ITEM_LIST_QUERY_PARAMETERS = [
     ),
 ]
 
+ITEM_AUTOCOMPLETE_LIMIT = 10
+ITEM_AUTOCOMPLETE_MAX_LIMIT = 50
+
+ITEM_AUTOCOMPLETE_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="q",
+        description="Name prefix to complete (case insensitive)",
+        required=True,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="limit",
+        description=f"Maximum number of names to return (at most {ITEM_AUTOCOMPLETE_MAX_LIMIT})",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+]
+
+SUPPLY_STOCK_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="item_id",
+        description="Only aggregate supplies of this item",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="store_id",
+        description="Only aggregate supplies held in this store",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+]
+
+RETURNS_MAX_LINES = 1000
+
+RECALL_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="batch_number",
+        description="Batch number to trace",
+        required=True,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+STOCK_LEDGER_LIST_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="item",
+        description="Filter by item id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="store",
+        description="Filter by store id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="supply",
+        description="Filter by supply id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="batch_number",
+        description="Filter by batch number",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="since",
+        description="Entries recorded at or after this date or datetime",
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+    OpenApiParameter(
+        name="until",
+        description="Entries recorded at or before this date or datetime",
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+]
+
+STOCK_ON_HAND_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="at",
+        description="Date or datetime to report stock for; a date means the end of that day. Defaults to now",
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+    OpenApiParameter(
+        name="store",
+        description="Filter by store id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="item",
+        description="Filter by item id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+]
+
+SUPPLY_PRICE_HISTORY_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="since",
+        description="Start of the range as a date or datetime; the price in effect then is included",
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+    OpenApiParameter(
+        name="until",
+        description="End of the range as a date or datetime; a date means the end of that day",
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+]
+
+REORDER_DEFAULT_DAYS = 28
+REORDER_MAX_DAYS = 365
+REORDER_DEFAULT_LEAD_TIME = 7
+REORDER_DEFAULT_REVIEW_PERIOD = 7
+REORDER_DEFAULT_SERVICE_LEVEL = 0.95
+
+REORDER_SUGGESTION_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="days",
+        description=f"Days of fulfilled reservations to forecast from (default {REORDER_DEFAULT_DAYS}, at most {REORDER_MAX_DAYS})",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="lead_time",
+        description=f"Days between ordering and receiving stock (default {REORDER_DEFAULT_LEAD_TIME})",
+        required=False,
+        type=OpenApiTypes.FLOAT,
+    ),
+    OpenApiParameter(
+        name="review_period",
+        description=f"Days between stock reviews (default {REORDER_DEFAULT_REVIEW_PERIOD})",
+        required=False,
+        type=OpenApiTypes.FLOAT,
+    ),
+    OpenApiParameter(
+        name="service_level",
+        description=f"Probability of not running out during the lead time (default {REORDER_DEFAULT_SERVICE_LEVEL})",
+        required=False,
+        type=OpenApiTypes.FLOAT,
+    ),
+    OpenApiParameter(
+        name="store",
+        description="Filter by store id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="item",
+        description="Filter by item id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="needs_reorder",
+        description="Only return series at or below their reorder point",
+        required=False,
+        type=OpenApiTypes.BOOL,
+    ),
+]
+
+ABC_DEFAULT_DAYS = 90
+ABC_MAX_DAYS = 365
+# Cumulative consumption value shares closing the A and B classes.
+ABC_A_SHARE = 0.8
+ABC_B_SHARE = 0.95
+ABC_CACHE_TIMEOUT = 15 * 60
+
+ABC_ANALYSIS_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="business_id",
+        description="Business whose stores are analysed",
+        required=True,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="days",
+        description=f"Days of fulfilled reservations to analyse (default {ABC_DEFAULT_DAYS}, at most {ABC_MAX_DAYS})",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="store",
+        description="Filter by store id",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="class",
+        description="Filter by ABC class",
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=["A", "B", "C"],
+    ),
+    OpenApiParameter(
+        name="refresh",
+        description="Recompute instead of serving the cached result",
+        required=False,
+        type=OpenApiTypes.BOOL,
+    ),
+]
+
+CYCLE_COUNT_MAX_LINES = 10000
+
+AVAILABILITY_MAX_ITEMS = 500
+AVAILABILITY_MAX_STORES = 100
+
+SUPPLY_AVAILABILITY_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="items",
+        description=f"Comma separated item ids, at most {AVAILABILITY_MAX_ITEMS}. May also be sent as a list in a POST body",
+        required=True,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="stores",
+        description=f"Comma separated store ids, at most {AVAILABILITY_MAX_STORES}. Defaults to every store holding one of the items",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="business_id",
+        description="Only include stores of this business",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+]
+
+SYNC_DEFAULT_LIMIT = 1000
+SYNC_MAX_LIMIT = 5000
+# How far before the previous snapshot the next sync starts, covering rows
+# committed late by long transactions. Rows may be sent twice.
+SYNC_OVERLAP_SECONDS = 60
+
+SYNC_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="updated_since",
+        description="Return rows changed after this datetime. Omit for a full download",
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+    OpenApiParameter(
+        name="cursor",
+        description="Cursor from the previous page; the other filters are taken from it",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="limit",
+        description=f"Maximum rows per page across all streams (default {SYNC_DEFAULT_LIMIT}, at most {SYNC_MAX_LIMIT})",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="business_id",
+        description="Only sync stores and supplies of this business",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+]
+
 SUPPLY_RESERVATION_LIST_QUERY_PARAMETERS = [
     OpenApiParameter(
         name="status",
@@ -166,5 +470,43 @@ SUPPLY_RESERVATION_LIST_QUERY_PARAMETERS = [
     ),
 ]
 
+BATCH_RETRIEVE_MAX_IDS = 100
+
+BATCH_RETRIEVE_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="ids",
+        description="Comma separated list of ids to retrieve (GET only)",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+CHANGE_FEED_DEFAULT_LIMIT = 100
+CHANGE_FEED_MAX_LIMIT = 1000
+# Upper bound for long polling, kept below typical proxy read timeouts.
+CHANGE_FEED_MAX_WAIT = 25
+CHANGE_FEED_POLL_INTERVAL = 0.5
+
+CHANGE_FEED_QUERY_PARAMETERS = [
+    OpenApiParameter(
+        name="since",
+        description="Return changes with a sequence number greater than this value",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="limit",
+        description=f"Maximum number of changes to return (at most {CHANGE_FEED_MAX_LIMIT})",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="wait",
+        description=f"Seconds to wait for new changes when none are available (at most {CHANGE_FEED_MAX_WAIT})",
+        required=False,
+        type=OpenApiTypes.NUMBER,
+    ),
+]
+
 AUTH_SERVICE_URL = os.environ.get("AUTH_SERVICE_URL")
 AUTH_SERVICE_API_KEY = os.environ.get("AUTH_SERVICE_API_KEY")
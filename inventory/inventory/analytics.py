@@ -0,0 +1,182 @@
+import datetime
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .forecasting import series_keys
+from .models import Supply, SupplyReservation
+
+ABC_CLASSES = np.array(["A", "B", "C"])
+
+
+def fetch_columns(queryset, dtype, chunk_size=10_000):
+    """
+    Run a `values_list` queryset and load its rows into a NumPy record array
+    chunk by chunk, without building model instances or one dict per row.
+    """
+    sql, params = queryset.query.sql_with_params()
+    chunks = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            chunks.append(np.array(rows, dtype=dtype))
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+
+def load_stock_values(business_id):
+    return fetch_columns(
+        Supply.objects.filter(store__business_id=business_id)
+        .values("item_id", "store_id")
+        .annotate(
+            on_hand=Sum("quantity"),
+            value=Sum(F("quantity") * F("cost_price")),
+        )
+        .order_by()
+        .values_list("item_id", "store_id", "on_hand", "value"),
+        dtype=[("item", "i8"), ("store", "i8"), ("units", "f8"), ("value", "f8")],
+    )
+
+
+def load_consumption(business_id, since):
+    return fetch_columns(
+        SupplyReservation.objects.filter(
+            status="fulfilled",
+            reserved_at__gte=since,
+            supply__store__business_id=business_id,
+        )
+        .values("supply__item_id", "supply__store_id")
+        .annotate(
+            units=Sum("quantity"),
+            value=Sum(F("quantity") * F("supply__cost_price")),
+        )
+        .order_by()
+        .values_list("supply__item_id", "supply__store_id", "units", "value"),
+        dtype=[("item", "i8"), ("store", "i8"), ("units", "f8"), ("value", "f8")],
+    )
+
+
+def align(keys, rows):
+    # Spread per-series rows over `keys`, leaving zeros where a series has none.
+    units, value = np.zeros(len(keys)), np.zeros(len(keys))
+    position = np.searchsorted(keys, series_keys(rows["item"], rows["store"]))
+    units[position], value[position] = rows["units"], rows["value"]
+    return units, value
+
+
+def compute_abc(stock, consumption, days):
+    """
+    Classify every (item, store) by its share of the store's consumption
+    value: A up to ABC_A_SHARE of the cumulative value, B up to ABC_B_SHARE,
+    C for the rest. Turnover is consumption over current stock value,
+    annualized from the `days` window.
+    """
+    keys = np.union1d(
+        series_keys(stock["item"], stock["store"]),
+        series_keys(consumption["item"], consumption["store"]),
+    )
+    on_hand, stock_value = align(keys, stock)
+    consumed, consumed_value = align(keys, consumption)
+    stores = keys & 0xFFFFFFFF
+
+    # Within each store, highest consumption value first.
+    order = np.lexsort((-consumed_value, stores))
+    keys, stores = keys[order], stores[order]
+    on_hand, stock_value = on_hand[order], stock_value[order]
+    consumed, consumed_value = consumed[order], consumed_value[order]
+
+    store_ids, store_index = np.unique(stores, return_inverse=True)
+    store_totals = np.bincount(store_index, weights=consumed_value)
+    cumulative = np.cumsum(consumed_value)
+    # Subtract everything accumulated in earlier stores.
+    group_start = np.searchsorted(stores, store_ids)
+    offsets = np.concatenate(([0.0], cumulative))[group_start]
+    cumulative -= offsets[store_index]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals = store_totals[store_index]
+        share = np.where(totals > 0, consumed_value / totals, 0)
+        cumulative_share = np.where(totals > 0, cumulative / totals, 0)
+        previous_share = np.where(totals > 0, (cumulative - consumed_value) / totals, 0)
+        turnover = np.where(
+            stock_value > 0, consumed_value / stock_value * 365 / days, np.nan
+        )
+    classes = np.where(
+        consumed_value <= 0,
+        2,
+        np.where(
+            previous_share < settings.ABC_A_SHARE,
+            0,
+            np.where(previous_share < settings.ABC_B_SHARE, 1, 2),
+        ),
+    )
+
+    return {
+        "item": keys >> 32,
+        "store": stores,
+        "on_hand": on_hand,
+        "stock_value": stock_value,
+        "consumed": consumed,
+        "consumed_value": consumed_value,
+        "share": share,
+        "cumulative_share": cumulative_share,
+        "abc_class": ABC_CLASSES[classes],
+        "turnover": turnover,
+    }
+
+
+def summarize_stores(columns, days):
+    store_ids, store_index = np.unique(columns["store"], return_inverse=True)
+    stock_value = np.bincount(store_index, weights=columns["stock_value"])
+    consumed_value = np.bincount(store_index, weights=columns["consumed_value"])
+    class_counts = {
+        abc_class: np.bincount(
+            store_index,
+            weights=columns["abc_class"] == abc_class,
+            minlength=len(store_ids),
+        )
+        for abc_class in ABC_CLASSES
+    }
+    return [
+        {
+            "store": int(store_ids[i]),
+            "stock_value": round(float(stock_value[i]), 2),
+            "consumed_value": round(float(consumed_value[i]), 2),
+            "turnover": (
+                round(float(consumed_value[i] / stock_value[i] * 365 / days), 2)
+                if stock_value[i] > 0
+                else None
+            ),
+            "classes": {
+                str(abc_class): int(counts[i])
+                for abc_class, counts in class_counts.items()
+            },
+        }
+        for i in range(len(store_ids))
+    ]
+
+
+def abc_analysis(business_id, days, refresh=False):
+    """
+    ABC columns and store summaries for a business, cached per business and
+    window. Returns the cached result with its `computed_at` timestamp.
+    """
+    key = f"inventory:abc:{business_id}:{days}"
+    result = None if refresh else cache.get(key)
+    if result is None:
+        since = timezone.now() - datetime.timedelta(days=days)
+        columns = compute_abc(
+            load_stock_values(business_id),
+            load_consumption(business_id, since),
+            days,
+        )
+        result = {
+            "computed_at": timezone.now(),
+            "columns": columns,
+            "stores": summarize_stores(columns, days),
+        }
+        cache.set(key, result, settings.ABC_CACHE_TIMEOUT)
+    return result
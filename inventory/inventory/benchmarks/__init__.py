@@ -0,0 +1,18 @@
+"""
+Load benchmark for the inventory API.
+
+Seeds a synthetic catalog, drives the busiest endpoints with concurrent
+clients and reports throughput and latency percentiles. Run it through the
+`benchmark_inventory` management command against a disposable database.
+"""
+
+from .runner import SCENARIOS, run_benchmark
+from .seed import Catalog, cleanup_catalog, seed_catalog
+
+__all__ = [
+    "SCENARIOS",
+    "Catalog",
+    "cleanup_catalog",
+    "run_benchmark",
+    "seed_catalog",
+]
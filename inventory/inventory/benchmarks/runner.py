@@ -0,0 +1,151 @@
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from .seed import WORDS
+
+
+class BenchmarkUser:
+    id = 1
+    email = "benchmark@example.com"
+    first_name = "Bench"
+    last_name = "Mark"
+    phone = None
+    is_authenticated = True
+
+
+@contextmanager
+def local_environment():
+    """
+    Authenticate every request locally instead of calling the auth service,
+    which would otherwise dominate the measured latency, and accept the
+    test client's host name.
+    """
+    with patch(
+        "inventory.authentication.RemoteJWTAuthentication.authenticate",
+        return_value=(BenchmarkUser(), "benchmark"),
+    ), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        yield
+
+
+def list_supplies(client, rng, catalog):
+    # Stay within the first pages of the seeded rows, where clients browse.
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or len(catalog.supply_ids)
+    pages = min(20, -(-len(catalog.supply_ids) // page_size))
+    return client.get(reverse("supplies-list"), {"page": rng.randint(1, pages)})
+
+
+def search_items(client, rng, catalog):
+    return client.get(reverse("items-list"), {"search": rng.choice(WORDS)})
+
+
+def reserve_supply(client, rng, catalog):
+    return client.post(
+        reverse("reservations-list"),
+        {"supply": rng.choice(catalog.supply_ids), "quantity": 1},
+        content_type="application/json",
+    )
+
+
+def transfer_stock(client, rng, catalog):
+    from_store, to_store = rng.sample(catalog.store_ids, 2)
+    return client.post(
+        reverse("stockmovement-list"),
+        {
+            "supply": rng.choice(catalog.supply_ids),
+            "from_store": from_store,
+            "to_store": to_store,
+            "quantity": 1,
+            "reason": f"{catalog.prefix} transfer",
+        },
+        content_type="application/json",
+    )
+
+
+# name -> (request function, expected status code)
+SCENARIOS = {
+    "list": (list_supplies, 200),
+    "search": (search_items, 200),
+    "reserve": (reserve_supply, 201),
+    "transfer": (transfer_stock, 201),
+}
+
+
+def percentile(quantiles, p):
+    return round(quantiles[p - 1] * 1000, 3)
+
+
+def summarize(latencies, errors, elapsed):
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "errors": errors}
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": percentile(quantiles, 50),
+            "p90": percentile(quantiles, 90),
+            "p99": percentile(quantiles, 99),
+            "max": round(max(latencies) * 1000, 3),
+        },
+    }
+
+
+def run_scenario(name, catalog, requests, concurrency, seed=0):
+    func, expected_status = SCENARIOS[name]
+    lock = threading.Lock()
+    latencies, errors = [], []
+
+    def worker(index, count):
+        # One client per thread; each thread also gets its own connection.
+        client = Client(HTTP_AUTHORIZATION="Bearer benchmark")
+        rng = random.Random(f"{seed}-{name}-{index}")
+        timings, failures = [], 0
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                response = func(client, rng, catalog)
+                timings.append(time.perf_counter() - start)
+                if response.status_code != expected_status:
+                    failures += 1
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(timings)
+            errors.append(failures)
+
+    counts = [
+        requests // concurrency + (index < requests % concurrency)
+        for index in range(concurrency)
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [
+            executor.submit(worker, index, count)
+            for index, count in enumerate(counts)
+            if count
+        ]:
+            future.result()
+    return summarize(latencies, sum(errors), time.perf_counter() - start)
+
+
+def run_benchmark(catalog, scenarios, requests, concurrency, seed=0):
+    """
+    Run each scenario in turn and return the results keyed by scenario name.
+    """
+    with local_environment():
+        return {
+            name: run_scenario(name, catalog, requests, concurrency, seed)
+            for name in scenarios
+        }
@@ -0,0 +1,104 @@
+import random
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+
+from inventory.models import (
+    Item,
+    Location,
+    StockCheckpoint,
+    StockLedgerEntry,
+    StockMovement,
+    Store,
+    Supply,
+    SupplyReservation,
+)
+
+# Ids of the seeded rows, used by the scenarios and for cleanup.
+Catalog = namedtuple("Catalog", ["prefix", "item_ids", "store_ids", "supply_ids"])
+
+# Real words so trigram search has something to match.
+WORDS = [
+    "rice",
+    "flour",
+    "sugar",
+    "coffee",
+    "tea",
+    "oil",
+    "soap",
+    "juice",
+    "milk",
+    "salt",
+    "pasta",
+    "lentil",
+    "honey",
+    "butter",
+    "spice",
+    "bean",
+]
+
+
+def seed_catalog(prefix, items, stores, supplies, reservations, seed=0):
+    """
+    Insert a synthetic catalog with bulk inserts. Every name and batch number
+    starts with `prefix` so runs never collide and cleanup is exact.
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        item_rows = Item.objects.bulk_create(
+            Item(
+                name=f"{prefix} {rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                description=" ".join(rng.choices(WORDS, k=6)),
+                notify_below=5,
+            )
+            for i in range(items)
+        )
+        locations = Location.objects.bulk_create(
+            Location(city="Benchmark") for _ in range(stores)
+        )
+        store_rows = Store.objects.bulk_create(
+            Store(business_id=1, name=f"{prefix} store {i}", location=location)
+            for i, location in enumerate(locations)
+        )
+        supply_rows = Supply.objects.bulk_create(
+            Supply(
+                item=rng.choice(item_rows),
+                store=rng.choice(store_rows),
+                quantity=rng.randint(100, 10_000),
+                unit=rng.choice(Supply.units),
+                sale_price=Decimal(rng.randint(20, 500)),
+                cost_price=Decimal(rng.randint(10, 400)),
+                batch_number=f"{prefix}-{i}",
+                supplier_id=rng.randint(1, 50),
+            )
+            for i in range(supplies)
+        )
+        SupplyReservation.objects.bulk_create(
+            SupplyReservation(supply=rng.choice(supply_rows), quantity=1)
+            for _ in range(reservations)
+        )
+    return Catalog(
+        prefix,
+        [item.id for item in item_rows],
+        [store.id for store in store_rows],
+        [supply.id for supply in supply_rows],
+    )
+
+
+def cleanup_catalog(catalog):
+    """
+    Delete the seeded rows and everything the benchmark created on top.
+    """
+    with transaction.atomic():
+        # Reservations and movements first, the cascades below would
+        # otherwise load them one supply at a time.
+        SupplyReservation.objects.filter(supply_id__in=catalog.supply_ids).delete()
+        StockMovement.objects.filter(supply_id__in=catalog.supply_ids).delete()
+        Supply.objects.filter(id__in=catalog.supply_ids).delete()
+        # Deleting a location cascades to its store.
+        Location.objects.filter(locations__id__in=catalog.store_ids).delete()
+        Item.objects.filter(id__in=catalog.item_ids).delete()
+        # Synthetic stock history is meaningless outside the run.
+        StockLedgerEntry.objects.filter(store_id__in=catalog.store_ids).delete()
+        StockCheckpoint.objects.filter(store_id__in=catalog.store_ids).delete()
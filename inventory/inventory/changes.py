@@ -0,0 +1,77 @@
+from django.db import connection
+
+from .models import ChangeLog, Item, StockMovement, Supply, SupplyReservation
+
+TRACKED_MODELS = {
+    Item: "item",
+    Supply: "supply",
+    SupplyReservation: "reservation",
+    StockMovement: "stock_movement",
+}
+
+# Arbitrary application-wide key for the advisory lock guarding the sequence.
+CHANGE_LOG_LOCK_KEY = 7_202_502
+
+
+def acquire_sequence_lock():
+    """
+    Serialize change log writers until the surrounding transaction ends.
+
+    Sequence values are handed out before commit, so without the lock a
+    consumer could read seq N + 1 while N is still uncommitted and then skip
+    N for good. Holding a transaction-level advisory lock makes the commit
+    order match the sequence order.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CHANGE_LOG_LOCK_KEY])
+
+
+def snapshot(instance):
+    # Deferred fields are skipped rather than loaded one query at a time.
+    deferred = instance.get_deferred_fields()
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+        if field.attname not in deferred
+    }
+
+
+def record_change(instance, action):
+    if action == ChangeLog.UPSERT:
+        # Generated columns are computed by the database and reloaded lazily
+        # after a save; fetch them together so the entry is complete.
+        generated = [
+            field.attname
+            for field in instance._meta.concrete_fields
+            if field.generated and field.attname in instance.get_deferred_fields()
+        ]
+        if generated:
+            instance.refresh_from_db(fields=generated)
+    acquire_sequence_lock()
+    return ChangeLog.objects.create(
+        entity=TRACKED_MODELS[type(instance)],
+        object_id=instance.pk,
+        action=action,
+        payload=snapshot(instance),
+    )
+
+
+def record_changes(model, pks, action=ChangeLog.UPSERT):
+    """
+    Log changes made with set-based updates, which bypass `save()` and its
+    signals. Must be called inside the transaction that made the changes.
+    """
+    if not pks:
+        return []
+    acquire_sequence_lock()
+    return ChangeLog.objects.bulk_create(
+        ChangeLog(
+            entity=TRACKED_MODELS[model],
+            object_id=instance.pk,
+            action=action,
+            payload=snapshot(instance),
+        )
+        for instance in model.objects.filter(pk__in=pks).order_by("pk")
+    )
@@ -0,0 +1,155 @@
+import datetime
+from statistics import NormalDist
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Supply, SupplyReservation
+
+DEMAND_DTYPE = np.dtype(
+    [("item", "i8"), ("store", "i8"), ("day", "i4"), ("quantity", "f8")]
+)
+
+
+def series_keys(items, stores):
+    # Pack (item, store) into one int64 so numpy can sort and search series.
+    return (np.asarray(items, dtype="i8") << 32) | np.asarray(stores, dtype="i8")
+
+
+def load_daily_demand(start, days, store=None, item=None):
+    """
+    Fulfilled reservation quantity per (item, store, day) over `days` days
+    from `start`, as one aggregate query. Reservations carry no fulfilment
+    timestamp, so demand is dated by `reserved_at`.
+    """
+    since = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+    queryset = SupplyReservation.objects.filter(
+        status="fulfilled",
+        reserved_at__gte=since,
+        reserved_at__lt=since + datetime.timedelta(days=days),
+    )
+    if store is not None:
+        queryset = queryset.filter(supply__store_id=store)
+    if item is not None:
+        queryset = queryset.filter(supply__item_id=item)
+    rows = (
+        queryset.annotate(day=TruncDate("reserved_at"))
+        .values("supply__item_id", "supply__store_id", "day")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+        .values_list("supply__item_id", "supply__store_id", "day", "total")
+        .iterator(chunk_size=10_000)
+    )
+    return np.fromiter(
+        (
+            (item_id, store_id, (day - start).days, total)
+            for item_id, store_id, day, total in rows
+        ),
+        dtype=DEMAND_DTYPE,
+    )
+
+
+def load_on_hand(store=None, item=None):
+    queryset = Supply.objects.all()
+    if store is not None:
+        queryset = queryset.filter(store_id=store)
+    if item is not None:
+        queryset = queryset.filter(item_id=item)
+    rows = np.fromiter(
+        queryset.values("item_id", "store_id")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+        .values_list("item_id", "store_id", "total")
+        .iterator(chunk_size=10_000),
+        dtype=[("item", "i8"), ("store", "i8"), ("quantity", "f8")],
+    )
+    return series_keys(rows["item"], rows["store"]), rows["quantity"]
+
+
+def compute_suggestions(
+    demand,
+    on_hand_keys,
+    on_hand,
+    days,
+    lead_time,
+    review_period,
+    service_level,
+):
+    """
+    Reorder points and quantities for every (item, store) series in
+    `demand` at once. Days without demand count as zero.
+
+    Average daily demand and its standard deviation come from per-series
+    sums and sums of squares, so the cost is a few passes over the rows no
+    matter how many series there are. Safety stock covers demand variation
+    over the lead time at the requested service level; the reorder quantity
+    tops stock up to cover the lead time and review period.
+    """
+    keys = series_keys(demand["item"], demand["store"])
+    series, inverse = np.unique(keys, return_inverse=True)
+    count = len(series)
+
+    total = np.bincount(inverse, weights=demand["quantity"], minlength=count)
+    squares = np.bincount(inverse, weights=demand["quantity"] ** 2, minlength=count)
+    mean = total / days
+    std = np.sqrt(np.clip(squares / days - mean**2, 0, None))
+
+    stock = np.zeros(count)
+    if len(on_hand_keys):
+        order = np.argsort(on_hand_keys)
+        sorted_keys = on_hand_keys[order]
+        position = np.clip(np.searchsorted(sorted_keys, series), 0, len(order) - 1)
+        found = sorted_keys[position] == series
+        stock[found] = on_hand[order[position[found]]]
+
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * std * np.sqrt(lead_time)
+    reorder_point = mean * lead_time + safety_stock
+    target = mean * (lead_time + review_period) + safety_stock
+    needs_reorder = stock <= reorder_point
+    reorder_quantity = np.where(
+        needs_reorder, np.ceil(np.clip(target - stock, 0, None)), 0
+    )
+    with np.errstate(divide="ignore"):
+        days_of_cover = np.where(mean > 0, stock / mean, np.inf)
+
+    return {
+        "item": series >> 32,
+        "store": series & 0xFFFFFFFF,
+        "on_hand": stock,
+        "daily_demand": mean,
+        "demand_std": std,
+        "safety_stock": np.ceil(safety_stock),
+        "notify_below": np.ceil(reorder_point),
+        "reorder_quantity": reorder_quantity,
+        "needs_reorder": needs_reorder,
+        "days_of_cover": days_of_cover,
+    }
+
+
+def reorder_suggestions(
+    days=28,
+    lead_time=7,
+    review_period=7,
+    service_level=0.95,
+    store=None,
+    item=None,
+):
+    """
+    Suggestions from the `days` full days before today, ordered with the
+    series that need reordering and have the least stock cover first.
+    Returns the columns and the row order.
+    """
+    start = timezone.localdate() - datetime.timedelta(days=days)
+    columns = compute_suggestions(
+        load_daily_demand(start, days, store=store, item=item),
+        *load_on_hand(store=store, item=item),
+        days=days,
+        lead_time=lead_time,
+        review_period=review_period,
+        service_level=service_level,
+    )
+    order = np.lexsort((columns["days_of_cover"], ~columns["needs_reorder"]))
+    return columns, order
@@ -0,0 +1,194 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .changes import acquire_sequence_lock
+from .models import StockCheckpoint, StockLedgerEntry, Supply
+
+
+def supply_entries(supply_id, previous, current, reason):
+    """
+    Ledger entries turning the `previous` ledger state of a supply into
+    `current`. Either side may be None for created or deleted supplies.
+    """
+    entries = []
+    for state, sign in ((previous, -1), (current, 1)):
+        if state and state["quantity"]:
+            entries.append(
+                StockLedgerEntry(
+                    item_id=state["item_id"],
+                    store_id=state["store_id"],
+                    supply_id=supply_id,
+                    batch_number=state["batch_number"],
+                    delta=sign * state["quantity"],
+                    reason=reason,
+                )
+            )
+    # A quantity change within the same batch and store is a single entry.
+    if len(entries) == 2 and all(
+        previous[field] == current[field]
+        for field in ("item_id", "store_id", "batch_number")
+    ):
+        entries[1].delta += entries[0].delta
+        entries = entries[1:]
+    return [entry for entry in entries if entry.delta]
+
+
+def record_entries(entries):
+    """
+    Append entries to the ledger. Must run inside the transaction that made
+    the stock change.
+    """
+    entries = list(entries)
+    if not entries:
+        return []
+    # Shares the change log lock: once a checkpoint run holds it, every entry
+    # with a lower id has been committed.
+    acquire_sequence_lock()
+    return StockLedgerEntry.objects.bulk_create(entries)
+
+
+def load_ledger_state(pk):
+    # Read under lock: the in-memory instance may be stale, the ledger must
+    # reflect what the row held before this write. The prices ride along for
+    # the price history.
+    return (
+        Supply.objects.select_for_update()
+        .filter(pk=pk)
+        .values(*Supply.ledger_fields, *Supply.price_fields)
+        .first()
+    )
+
+
+def capture_supply_state(sender, instance, raw=False, **kwargs):
+    # Connected to pre_save and pre_delete.
+    if raw or instance._state.adding:
+        instance.ledger_state = None
+        return
+    instance.ledger_state = load_ledger_state(instance.pk)
+
+
+def log_supply_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    current = {field: getattr(instance, field) for field in Supply.ledger_fields}
+    if update_fields is not None and instance.ledger_state:
+        # Fields left out of the update keep their stored values.
+        current = {
+            field: (
+                value
+                if Supply._meta.get_field(field).name in update_fields
+                else instance.ledger_state[field]
+            )
+            for field, value in current.items()
+        }
+    record_entries(
+        supply_entries(
+            instance.pk,
+            instance.ledger_state,
+            current,
+            "Supply created" if created else "Supply updated",
+        )
+    )
+
+
+def log_supply_delete(sender, instance, **kwargs):
+    record_entries(
+        supply_entries(instance.pk, instance.ledger_state, None, "Supply deleted")
+    )
+
+
+def balances(watermark, checkpoints, entries):
+    """
+    Quantities per (item, store, batch) from the checkpoint run at
+    `watermark` plus the ledger entries after it.
+    """
+    totals = defaultdict(int)
+    rows = checkpoints.filter(ledger_id=watermark).values_list(
+        "item_id", "store_id", "batch_number", "quantity"
+    )
+    for item_id, store_id, batch_number, quantity in rows:
+        totals[item_id, store_id, batch_number] += quantity
+
+    rows = (
+        entries.filter(id__gt=watermark)
+        .values("item_id", "store_id", "batch_number")
+        .annotate(total=Sum("delta"))
+        .order_by()
+        .values_list("item_id", "store_id", "batch_number", "total")
+    )
+    for item_id, store_id, batch_number, delta in rows:
+        totals[item_id, store_id, batch_number] += delta
+    return totals
+
+
+def stock_on_hand(at=None, store=None, item=None):
+    """
+    Stock per (item, store, batch) as of `at` (now when omitted), read from
+    the latest checkpoint run taken by then and the entries recorded since.
+    """
+    checkpoints = StockCheckpoint.objects.all()
+    entries = StockLedgerEntry.objects.all()
+    if at is not None:
+        checkpoints = checkpoints.filter(taken_at__lte=at)
+        entries = entries.filter(created_at__lte=at)
+    watermark = checkpoints.aggregate(watermark=Max("ledger_id"))["watermark"] or 0
+
+    if store is not None:
+        checkpoints = checkpoints.filter(store_id=store)
+        entries = entries.filter(store_id=store)
+    if item is not None:
+        checkpoints = checkpoints.filter(item_id=item)
+        entries = entries.filter(item_id=item)
+
+    totals = balances(watermark, checkpoints, entries)
+    results = [
+        {
+            "item": item_id,
+            "store": store_id,
+            "batch_number": batch_number,
+            "quantity": quantity,
+        }
+        for (item_id, store_id, batch_number), quantity in sorted(totals.items())
+        if quantity
+    ]
+    return watermark, results
+
+
+def create_checkpoints():
+    """
+    Snapshot the stock of every (item, store, batch) up to the newest ledger
+    entry. Returns the watermark and the checkpoints written, none if the
+    ledger has not moved since the previous run.
+    """
+    with transaction.atomic():
+        acquire_sequence_lock()
+        latest = StockLedgerEntry.objects.aggregate(latest=Max("id"))["latest"]
+        previous = (
+            StockCheckpoint.objects.aggregate(watermark=Max("ledger_id"))["watermark"]
+            or 0
+        )
+        if latest is None or latest <= previous:
+            return previous, []
+
+        totals = balances(
+            previous,
+            StockCheckpoint.objects.all(),
+            StockLedgerEntry.objects.filter(id__lte=latest),
+        )
+        taken_at = timezone.now()
+        checkpoints = StockCheckpoint.objects.bulk_create(
+            StockCheckpoint(
+                item_id=item_id,
+                store_id=store_id,
+                batch_number=batch_number,
+                quantity=quantity,
+                ledger_id=latest,
+                taken_at=taken_at,
+            )
+            for (item_id, store_id, batch_number), quantity in totals.items()
+            if quantity
+        )
+        return latest, checkpoints
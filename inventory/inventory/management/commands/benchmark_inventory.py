@@ -0,0 +1,77 @@
+import json
+import platform
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from inventory.benchmarks import SCENARIOS, cleanup_catalog, run_benchmark, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog and drive the list, search, reserve and "
+        "transfer endpoints with concurrent clients. Prints throughput and "
+        "latency percentiles as JSON. Run it against a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=1000)
+        parser.add_argument("--stores", type=int, default=20)
+        parser.add_argument("--supplies", type=int, default=5000)
+        parser.add_argument("--reservations", type=int, default=1000)
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Requests per scenario."
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(SCENARIOS),
+            help="Scenario to run, may be repeated. Defaults to all of them.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the seeded rows afterwards."
+        )
+
+    def handle(self, *args, **options):
+        if options["stores"] < 2:
+            raise CommandError("--stores must be at least 2 to benchmark transfers.")
+        if options["items"] < 1 or options["supplies"] < 1:
+            raise CommandError("--items and --supplies must be positive.")
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        scale = {
+            key: options[key] for key in ("items", "stores", "supplies", "reservations")
+        }
+        prefix = f"bench{int(time.time())}"
+        started = time.perf_counter()
+        catalog = seed_catalog(prefix, seed=options["seed"], **scale)
+        seed_seconds = time.perf_counter() - started
+
+        try:
+            results = run_benchmark(
+                catalog,
+                options["scenario"] or list(SCENARIOS),
+                options["requests"],
+                options["concurrency"],
+                options["seed"],
+            )
+        finally:
+            if not options["keep"]:
+                cleanup_catalog(catalog)
+
+        report = {
+            "prefix": prefix,
+            "scale": scale,
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "seed": options["seed"],
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "seed_seconds": round(seed_seconds, 3),
+            "scenarios": results,
+        }
+        self.stdout.write(json.dumps(report, indent=2))
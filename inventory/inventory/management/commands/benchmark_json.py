@@ -0,0 +1,83 @@
+import io
+import json
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from inventory.models import Supply
+from inventory.renderers import ORJSONParser, ORJSONRenderer, orjson
+from inventory.serializers import SupplySerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare JSONRenderer/JSONParser with their orjson counterparts on "
+        "serialized Supply rows. Rows are built in memory, no database is needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def build_payload(self, rows):
+        supplies = [
+            Supply(
+                id=i,
+                item_id=i % 200 + 1,
+                store_id=i % 20 + 1,
+                quantity=i % 500 + 1,
+                unit="Piece (pc)",
+                cost_price=Decimal("50.25") + i,
+                sale_price=Decimal("75.50") + i,
+                expiration_date=date(2026, 1, 1) + timedelta(days=i % 365),
+                batch_number=f"BATCH-{i:06d}",
+                man_date=date(2025, 1, 1),
+                supplier_id=i % 50 + 1,
+                # Generated columns normally come from the database.
+                base_unit="pc",
+                base_quantity=Decimal(i % 500 + 1),
+            )
+            for i in range(1, rows + 1)
+        ]
+        return SupplySerializer(supplies, many=True).data
+
+    def time_per_call(self, func, repeat):
+        return round(min(timeit.repeat(func, number=1, repeat=repeat)) * 1000, 3)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed, nothing to compare.")
+            return
+
+        payload = self.build_payload(options["rows"])
+        repeat = options["repeat"]
+        results = {"rows": options["rows"], "repeat": repeat}
+
+        for name, renderer_class, parser_class in (
+            ("stdlib", JSONRenderer, JSONParser),
+            ("orjson", ORJSONRenderer, ORJSONParser),
+        ):
+            renderer, parser = renderer_class(), parser_class()
+            body = renderer.render(payload)
+            parsed = parser.parse(io.BytesIO(body))
+            if parsed != json.loads(json.dumps(payload)):
+                raise AssertionError(f"{name} round trip does not match the payload")
+            results[name] = {
+                "render_ms": self.time_per_call(
+                    lambda: renderer.render(payload), repeat
+                ),
+                "parse_ms": self.time_per_call(
+                    lambda: parser.parse(io.BytesIO(body)), repeat
+                ),
+                "bytes": len(body),
+            }
+
+        for step in ("render_ms", "parse_ms"):
+            results[f"{step.split('_')[0]}_speedup"] = round(
+                results["stdlib"][step] / results["orjson"][step], 2
+            )
+        self.stdout.write(json.dumps(results, indent=2))
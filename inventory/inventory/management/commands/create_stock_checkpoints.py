@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from inventory.ledger import create_checkpoints
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot stock per item, store and batch from the stock ledger so "
+        "point-in-time queries only replay entries recorded after it. "
+        "Meant to run periodically, e.g. nightly from cron."
+    )
+
+    def handle(self, *args, **options):
+        watermark, checkpoints = create_checkpoints()
+        if not checkpoints:
+            self.stdout.write(f"No checkpoints written, ledger at entry #{watermark}.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(checkpoints)} checkpoints up to ledger entry #{watermark}."
+            )
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:20
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0007_changelog"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Lower("name"),
+                    name="text_pattern_ops",
+                ),
+                name="item_name_prefix_idx",
+            ),
+        ),
+    ]
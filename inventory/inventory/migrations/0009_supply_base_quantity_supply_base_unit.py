@@ -0,0 +1,117 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:22
+
+import django.db.models.expressions
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0008_item_item_name_prefix_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="supply",
+            name="base_quantity",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.expressions.CombinedExpression(
+                    models.F("quantity"),
+                    "*",
+                    models.Case(
+                        models.When(then=models.Value(Decimal("1")), unit="Piece (pc)"),
+                        models.When(
+                            then=models.Value(Decimal("12")), unit="Dozen (dz)"
+                        ),
+                        models.When(then=models.Value(Decimal("1")), unit="Pack (pk)"),
+                        models.When(then=models.Value(Decimal("1")), unit="Set (set)"),
+                        models.When(then=models.Value(Decimal("1")), unit="Gram(g)"),
+                        models.When(
+                            then=models.Value(Decimal("1000")), unit="Kilogram(kg)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("453.59237")), unit="Pound(lb)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("28.349523")), unit="Ounce(oz)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("1")), unit="Milliliter(mL)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("1000")), unit="Liter(L)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("29.573530")),
+                            unit="Fluid Ounce (fl oz)",
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("3785.411784")),
+                            unit="Gallon(gal)",
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("1000000")), unit="Cubic Meter"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("28316.846592")),
+                            unit="Cubic Foot",
+                        ),
+                        models.When(then=models.Value(Decimal("1")), unit="Meter (m)"),
+                        models.When(
+                            then=models.Value(Decimal("0.01")), unit="Centimeter (cm)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("0.0254")), unit="Inch (in)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("0.3048")), unit="Foot (ft)"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("1")), unit="Square Meter"
+                        ),
+                        models.When(
+                            then=models.Value(Decimal("0.092903")), unit="Square Foot"
+                        ),
+                        default=models.Value(Decimal("1")),
+                        output_field=models.DecimalField(
+                            decimal_places=6, max_digits=18
+                        ),
+                    ),
+                ),
+                output_field=models.DecimalField(decimal_places=6, max_digits=24),
+            ),
+        ),
+        migrations.AddField(
+            model_name="supply",
+            name="base_unit",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(then=models.Value("pc"), unit="Piece (pc)"),
+                    models.When(then=models.Value("pc"), unit="Dozen (dz)"),
+                    models.When(then=models.Value("pk"), unit="Pack (pk)"),
+                    models.When(then=models.Value("set"), unit="Set (set)"),
+                    models.When(then=models.Value("g"), unit="Gram(g)"),
+                    models.When(then=models.Value("g"), unit="Kilogram(kg)"),
+                    models.When(then=models.Value("g"), unit="Pound(lb)"),
+                    models.When(then=models.Value("g"), unit="Ounce(oz)"),
+                    models.When(then=models.Value("mL"), unit="Milliliter(mL)"),
+                    models.When(then=models.Value("mL"), unit="Liter(L)"),
+                    models.When(then=models.Value("mL"), unit="Fluid Ounce (fl oz)"),
+                    models.When(then=models.Value("mL"), unit="Gallon(gal)"),
+                    models.When(then=models.Value("mL"), unit="Cubic Meter"),
+                    models.When(then=models.Value("mL"), unit="Cubic Foot"),
+                    models.When(then=models.Value("m"), unit="Meter (m)"),
+                    models.When(then=models.Value("m"), unit="Centimeter (cm)"),
+                    models.When(then=models.Value("m"), unit="Inch (in)"),
+                    models.When(then=models.Value("m"), unit="Foot (ft)"),
+                    models.When(then=models.Value("m2"), unit="Square Meter"),
+                    models.When(then=models.Value("m2"), unit="Square Foot"),
+                    default=models.F("unit"),
+                ),
+                output_field=models.CharField(max_length=255),
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0009_supply_base_quantity_supply_base_unit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="returnrecall",
+            name="supply",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="returns",
+                to="inventory.supply",
+            ),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0010_returnrecall_supply"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("batch_number", models.CharField(max_length=255)),
+                ("quantity", models.BigIntegerField()),
+                ("ledger_id", models.BigIntegerField()),
+                ("taken_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="stock_checkpoints",
+                        to="inventory.item",
+                    ),
+                ),
+                (
+                    "store",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="stock_checkpoints",
+                        to="inventory.store",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_checkpoint",
+                "ordering": ["ledger_id", "id"],
+                "get_latest_by": "ledger_id",
+                "indexes": [
+                    models.Index(
+                        fields=["taken_at", "ledger_id"], name="checkpoint_taken_idx"
+                    ),
+                    models.Index(
+                        fields=["ledger_id", "store", "item"], name="checkpoint_run_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockLedgerEntry",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("batch_number", models.CharField(max_length=255)),
+                ("delta", models.IntegerField()),
+                ("reason", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_entries",
+                        to="inventory.item",
+                    ),
+                ),
+                (
+                    "store",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_entries",
+                        to="inventory.store",
+                    ),
+                ),
+                (
+                    "supply",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ledger_entries",
+                        to="inventory.supply",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_ledger_entry",
+                "ordering": ["id"],
+                "get_latest_by": "id",
+                "indexes": [
+                    models.Index(
+                        fields=["item", "store", "created_at"],
+                        name="ledger_item_store_created_idx",
+                    ),
+                    models.Index(
+                        fields=["store", "created_at"], name="ledger_store_created_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+def create_opening_entries(apps, schema_editor):
+    Supply = apps.get_model("inventory", "Supply")
+    StockLedgerEntry = apps.get_model("inventory", "StockLedgerEntry")
+    supplies = (
+        Supply.objects.filter(quantity__gt=0)
+        .values_list("id", "item_id", "store_id", "batch_number", "quantity")
+        .order_by("id")
+    )
+    batch = []
+    for supply_id, item_id, store_id, batch_number, quantity in supplies.iterator(
+        chunk_size=2000
+    ):
+        batch.append(
+            StockLedgerEntry(
+                item_id=item_id,
+                store_id=store_id,
+                supply_id=supply_id,
+                batch_number=batch_number,
+                delta=quantity,
+                reason="Opening balance",
+            )
+        )
+        if len(batch) == 2000:
+            StockLedgerEntry.objects.bulk_create(batch)
+            batch = []
+    StockLedgerEntry.objects.bulk_create(batch)
+
+
+def delete_opening_entries(apps, schema_editor):
+    StockLedgerEntry = apps.get_model("inventory", "StockLedgerEntry")
+    StockLedgerEntry.objects.filter(reason="Opening balance").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0011_stockcheckpoint_stockledgerentry"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_opening_entries, delete_opening_entries),
+    ]
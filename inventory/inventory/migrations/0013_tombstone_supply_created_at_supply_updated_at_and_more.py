@@ -0,0 +1,65 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0012_opening_stock_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("entity", models.CharField(max_length=50)),
+                ("object_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "db_table": "tombstone",
+                "ordering": ["deleted_at", "id"],
+                "get_latest_by": "deleted_at",
+            },
+        ),
+        migrations.AddField(
+            model_name="supply",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="supply",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["updated_at", "id"], name="category_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["updated_at", "id"], name="item_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=models.Index(fields=["updated_at", "id"], name="store_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="supply",
+            index=models.Index(fields=["updated_at", "id"], name="supply_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="tombstone_deleted_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.4 on 2026-10-19 06:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_initial_prices(apps, schema_editor):
+    Supply = apps.get_model("inventory", "Supply")
+    SupplyPriceHistory = apps.get_model("inventory", "SupplyPriceHistory")
+    supplies = Supply.objects.values_list(
+        "id", "sale_price", "cost_price", "created_at"
+    ).order_by("id")
+    batch = []
+    for supply_id, sale_price, cost_price, created_at in supplies.iterator(
+        chunk_size=2000
+    ):
+        batch.append(
+            SupplyPriceHistory(
+                supply_id=supply_id,
+                sale_price=sale_price,
+                cost_price=cost_price,
+                effective_at=created_at,
+            )
+        )
+        if len(batch) == 2000:
+            SupplyPriceHistory.objects.bulk_create(batch)
+            batch = []
+    SupplyPriceHistory.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0013_tombstone_supply_created_at_supply_updated_at_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupplyPriceHistory",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("sale_price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("cost_price", models.DecimalField(decimal_places=2, max_digits=12)),
+                (
+                    "effective_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "supply",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_history",
+                        to="inventory.supply",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "supply_price_history",
+                "ordering": ["effective_at", "id"],
+                "get_latest_by": "effective_at",
+                "indexes": [
+                    models.Index(
+                        fields=["supply", "effective_at"],
+                        name="price_supply_effective_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_initial_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+from django.conf import settings
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+def parse_id_list(raw_ids):
+    """
+    Parse ids given as a list or a comma separated string, dropping duplicates
+    but keeping the order they were given in. Raises ValueError when invalid.
+    """
+    if isinstance(raw_ids, str):
+        raw_ids = [value for value in raw_ids.split(",") if value.strip()]
+    if not isinstance(raw_ids, (list, tuple)):
+        raise ValueError("ids must be a list or a comma separated string.")
+
+    ids = []
+    for value in raw_ids:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid id: {value}")
+    return list(dict.fromkeys(ids))
+
+
+class BatchRetrieveMixin:
+    """
+    Adds a `batch` action that resolves many objects by id in a single query.
+
+    Ids are read from `?ids=1,2,3` on GET or from an `ids` list in the POST body.
+    Results keep the order of the requested ids and ids that could not be found
+    are reported under `missing`.
+    """
+
+    def get_batch_ids(self, request):
+        if request.method == "POST":
+            # A JSON body may be any value, not only an object.
+            if not isinstance(request.data, dict):
+                raise ValueError('The body must be an object with an "ids" list.')
+            raw_ids = request.data.get("ids", [])
+        else:
+            raw_ids = request.query_params.get("ids", "")
+        return parse_id_list(raw_ids)
+
+    @extend_schema(parameters=settings.BATCH_RETRIEVE_QUERY_PARAMETERS)
+    @action(detail=False, methods=["get", "post"], url_path="batch")
+    def batch(self, request, *args, **kwargs):
+        try:
+            ids = self.get_batch_ids(request)
+        except ValueError as error:
+            return Response({"ids": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not ids:
+            return Response(
+                {"ids": "At least one id is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) > settings.BATCH_RETRIEVE_MAX_IDS:
+            return Response(
+                {
+                    "ids": f"At most {settings.BATCH_RETRIEVE_MAX_IDS} ids can be requested at once."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(id__in=ids)
+        found = {obj.id: obj for obj in queryset.order_by()}
+        serializer = self.get_serializer(
+            [found[pk] for pk in ids if pk in found], many=True
+        )
+        return Response(
+            {
+                "results": serializer.data,
+                "missing": [pk for pk in ids if pk not in found],
+            }
+        )
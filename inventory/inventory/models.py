@@ -1,5 +1,11 @@
-from django.db import models
+from django.contrib.postgres.indexes import OpClass
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Lower
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 import enum
 from django.utils.translation import gettext as _
 from django.core.exceptions import ValidationError
@@ -7,6 +13,21 @@ import requests
 
 
 # Create your models here.
+class ChangeTrackedModel(models.Model):
+    """
+    Base for models mirrored by downstream services through the change feed.
+    Saves run inside a transaction so the change log entry written by the
+    post_save receiver commits or rolls back together with the row itself.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
 class Category(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
@@ -17,6 +38,9 @@ class Category(models.Model):
         db_table = "category"
         get_latest_by = "id"
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="category_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -54,6 +78,9 @@ class Store(models.Model):
         db_table = "store"
         get_latest_by = "id"
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="store_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -73,7 +100,7 @@ class Manufacturer(models.Model):
         return self.name
 
 
-class Item(models.Model):
+class Item(ChangeTrackedModel):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     category = models.ForeignKey(
@@ -97,6 +124,14 @@ class Item(models.Model):
         db_table = "item"
         get_latest_by = "id"
         ordering = ["id"]
+        indexes = [
+            # Serves `LIKE 'prefix%'` lookups on the normalized name for autocomplete.
+            models.Index(
+                OpClass(Lower("name"), name="text_pattern_ops"),
+                name="item_name_prefix_idx",
+            ),
+            models.Index(fields=["updated_at", "id"], name="item_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -128,6 +163,10 @@ class ReturnRecall(models.Model):
     item = models.ForeignKey(
         Item, models.SET_NULL, null=True, blank=True, related_name="items"
     )
+    # The batch the goods came from; approved returns are restocked into it.
+    supply = models.ForeignKey(
+        "Supply", models.SET_NULL, null=True, blank=True, related_name="returns"
+    )
     reason = models.TextField(null=True, blank=True)
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
     created_at = models.DateTimeField(auto_now_add=True)
@@ -137,7 +176,7 @@ class ReturnRecall(models.Model):
         return f"ReturnRecall ({self.status}) - {self.quantity} items"
 
 
-class Supply(models.Model):
+class Supply(ChangeTrackedModel):
     units = [
         _("Piece (pc)"),
         _("Kilogram(kg)"),
@@ -160,6 +199,31 @@ class Supply(models.Model):
         _("Pack (pk)"),
         _("Set (set)"),
     ]
+    # unit -> (base unit, factor). Quantities of one item recorded in
+    # different units of the same dimension share a base unit and can be
+    # summed in SQL. Packs and sets have no fixed size, so they stay separate.
+    unit_conversions = {
+        _("Piece (pc)"): ("pc", Decimal("1")),
+        _("Dozen (dz)"): ("pc", Decimal("12")),
+        _("Pack (pk)"): ("pk", Decimal("1")),
+        _("Set (set)"): ("set", Decimal("1")),
+        _("Gram(g)"): ("g", Decimal("1")),
+        _("Kilogram(kg)"): ("g", Decimal("1000")),
+        _("Pound(lb)"): ("g", Decimal("453.59237")),
+        _("Ounce(oz)"): ("g", Decimal("28.349523")),
+        _("Milliliter(mL)"): ("mL", Decimal("1")),
+        _("Liter(L)"): ("mL", Decimal("1000")),
+        _("Fluid Ounce (fl oz)"): ("mL", Decimal("29.573530")),
+        _("Gallon(gal)"): ("mL", Decimal("3785.411784")),
+        _("Cubic Meter"): ("mL", Decimal("1000000")),
+        _("Cubic Foot"): ("mL", Decimal("28316.846592")),
+        _("Meter (m)"): ("m", Decimal("1")),
+        _("Centimeter (cm)"): ("m", Decimal("0.01")),
+        _("Inch (in)"): ("m", Decimal("0.0254")),
+        _("Foot (ft)"): ("m", Decimal("0.3048")),
+        _("Square Meter"): ("m2", Decimal("1")),
+        _("Square Foot"): ("m2", Decimal("0.092903")),
+    }
 
     item = models.ForeignKey(
         Item, models.CASCADE, related_name="item_supply", default=1
@@ -177,17 +241,53 @@ class Supply(models.Model):
     man_date = models.DateField(null=True, blank=True)
     store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="stores")
     supplier_id = models.IntegerField()
+    # Stored generated columns, so the database keeps them in step with
+    # `quantity` and `unit` on every write, including set-based updates.
+    base_unit = models.GeneratedField(
+        expression=Case(
+            *[
+                When(unit=unit, then=Value(base_unit))
+                for unit, (base_unit, factor) in unit_conversions.items()
+            ],
+            default=F("unit"),
+        ),
+        output_field=models.CharField(max_length=255),
+        db_persist=True,
+    )
+    base_quantity = models.GeneratedField(
+        expression=F("quantity")
+        * Case(
+            *[
+                When(unit=unit, then=Value(factor))
+                for unit, (base_unit, factor) in unit_conversions.items()
+            ],
+            default=Value(Decimal("1")),
+            output_field=models.DecimalField(max_digits=18, decimal_places=6),
+        ),
+        output_field=models.DecimalField(max_digits=24, decimal_places=6),
+        db_persist=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Fields whose changes are mirrored into the stock ledger.
+    ledger_fields = ("item_id", "store_id", "batch_number", "quantity")
+    # Fields whose changes are kept in the price history.
+    price_fields = ("sale_price", "cost_price")
 
     class Meta:
         db_table = "supply"
         get_latest_by = "id"
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="supply_updated_idx"),
+        ]
 
     def __str__(self):
         return self.item.name
 
 
-class StockMovement(models.Model):
+class StockMovement(ChangeTrackedModel):
     supply = models.ForeignKey(Supply, on_delete=models.SET_NULL, null=True, blank=True)
     from_store = models.ForeignKey(
         Store,
@@ -217,7 +317,7 @@ class StockMovement(models.Model):
         return f"Movement {self.id}: {self.quantity} quantity of {self.supply.name} moved from {self.from_store.name} to {self.to_store.name}"
 
 
-class SupplyReservation(models.Model):
+class SupplyReservation(ChangeTrackedModel):
     supply = models.ForeignKey(
         Supply, on_delete=models.CASCADE, related_name="reservations"
     )
@@ -238,19 +338,199 @@ class SupplyReservation(models.Model):
         ordering = ["-reserved_at"]
 
     def save(self, *args, **kwargs):
-        # Check if updating an existing record and status has changed to fulfilled.
-        if self.pk:
-            previous = SupplyReservation.objects.get(pk=self.pk)
-            if previous.status != "fulfilled" and self.status == "fulfilled":
-                # Reduce supply quantity by this reservation's quantity.
-                self.supply.quantity = self.supply.quantity - self.quantity
-                self.supply.save()
-        else:
-            # For new records, if the reservation is created as fulfilled.
-            if self.status == "fulfilled":
-                self.supply.quantity = self.supply.quantity - self.quantity
-                self.supply.save()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            # Check if updating an existing record and status has changed to fulfilled.
+            if self.pk:
+                previous = SupplyReservation.objects.get(pk=self.pk)
+                if previous.status != "fulfilled" and self.status == "fulfilled":
+                    # Reduce supply quantity by this reservation's quantity.
+                    self.supply.quantity = self.supply.quantity - self.quantity
+                    self.supply.save()
+            else:
+                # For new records, if the reservation is created as fulfilled.
+                if self.status == "fulfilled":
+                    self.supply.quantity = self.supply.quantity - self.quantity
+                    self.supply.save()
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Reservation for {self.supply} - {self.quantity}"
+
+
+class ChangeLog(models.Model):
+    """
+    Append-only outbox of inventory changes. `seq` only ever grows, so
+    consumers can resume from the last sequence number they processed.
+    """
+
+    UPSERT = "upsert"
+    DELETE = "delete"
+    ACTION_CHOICES = [
+        (UPSERT, "Upsert"),
+        (DELETE, "Delete"),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    entity = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "change_log"
+        get_latest_by = "seq"
+        ordering = ["seq"]
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.entity} {self.object_id}"
+
+
+class StockLedgerEntry(models.Model):
+    """
+    Append-only record of signed quantity changes per (item, store, batch).
+    Foreign keys carry no database constraint so history outlives the rows
+    it refers to.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    item = models.ForeignKey(
+        Item,
+        models.DO_NOTHING,
+        db_constraint=False,
+        related_name="ledger_entries",
+    )
+    store = models.ForeignKey(
+        Store,
+        models.DO_NOTHING,
+        db_constraint=False,
+        related_name="ledger_entries",
+    )
+    supply = models.ForeignKey(
+        Supply,
+        models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="ledger_entries",
+    )
+    batch_number = models.CharField(max_length=255)
+    delta = models.IntegerField()
+    reason = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "stock_ledger_entry"
+        get_latest_by = "id"
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["item", "store", "created_at"],
+                name="ledger_item_store_created_idx",
+            ),
+            models.Index(
+                fields=["store", "created_at"], name="ledger_store_created_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError("Stock ledger entries cannot be changed.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Stock ledger entries cannot be deleted.")
+
+    def __str__(self):
+        return f"#{self.id} {self.delta:+d} of {self.batch_number}"
+
+
+class StockCheckpoint(models.Model):
+    """
+    Quantity per (item, store, batch) after applying every ledger entry up to
+    and including `ledger_id`. All rows written by one checkpoint run share
+    the same `ledger_id`, so a point-in-time query reads one run plus the
+    entries after it.
+    """
+
+    item = models.ForeignKey(
+        Item,
+        models.DO_NOTHING,
+        db_constraint=False,
+        related_name="stock_checkpoints",
+    )
+    store = models.ForeignKey(
+        Store,
+        models.DO_NOTHING,
+        db_constraint=False,
+        related_name="stock_checkpoints",
+    )
+    batch_number = models.CharField(max_length=255)
+    quantity = models.BigIntegerField()
+    ledger_id = models.BigIntegerField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "stock_checkpoint"
+        get_latest_by = "ledger_id"
+        ordering = ["ledger_id", "id"]
+        indexes = [
+            models.Index(fields=["taken_at", "ledger_id"], name="checkpoint_taken_idx"),
+            models.Index(
+                fields=["ledger_id", "store", "item"], name="checkpoint_run_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.batch_number} at #{self.ledger_id}: {self.quantity}"
+
+
+class Tombstone(models.Model):
+    """
+    Marker left behind by a deleted catalog row so offline clients syncing
+    by `updated_at` learn about the deletion.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    entity = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "tombstone"
+        get_latest_by = "deleted_at"
+        ordering = ["deleted_at", "id"]
+        indexes = [
+            models.Index(fields=["deleted_at", "id"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} deleted at {self.deleted_at}"
+
+
+class SupplyPriceHistory(models.Model):
+    """
+    Run-length price history of a supply: a row is written only when the
+    sale or cost price changes and holds until the next row's `effective_at`.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    supply = models.ForeignKey(
+        Supply, on_delete=models.CASCADE, related_name="price_history"
+    )
+    sale_price = models.DecimalField(max_digits=12, decimal_places=2)
+    cost_price = models.DecimalField(max_digits=12, decimal_places=2)
+    effective_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "supply_price_history"
+        get_latest_by = "effective_at"
+        ordering = ["effective_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["supply", "effective_at"], name="price_supply_effective_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.supply_id}: {self.sale_price}/{self.cost_price} from {self.effective_at}"
@@ -0,0 +1,48 @@
+from django.db.models import Q, Subquery
+
+from .models import Supply, SupplyPriceHistory
+
+
+def log_price_change(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    # Runs after the ledger's pre_save receiver stored the previous row in
+    # `ledger_state`, inside the transaction of the save.
+    if raw:
+        return
+    previous = instance.ledger_state
+    current = {
+        field: Supply._meta.get_field(field).to_python(getattr(instance, field))
+        for field in Supply.price_fields
+    }
+    if previous:
+        if update_fields is not None:
+            # Fields left out of the update keep their stored values.
+            current = {
+                field: value if field in update_fields else previous[field]
+                for field, value in current.items()
+            }
+        if all(previous[field] == value for field, value in current.items()):
+            return
+    SupplyPriceHistory.objects.create(
+        supply=instance, effective_at=instance.updated_at, **current
+    )
+
+
+def price_timeline(supply_id, since=None, until=None):
+    """
+    Price history of a supply between `since` and `until`, in one query. The
+    entry in effect at `since` is included so the timeline has no gap at the
+    start of the range.
+    """
+    history = SupplyPriceHistory.objects.filter(supply_id=supply_id)
+    in_range = Q()
+    if until is not None:
+        in_range &= Q(effective_at__lte=until)
+    if since is not None:
+        in_range &= Q(effective_at__gt=since)
+        in_effect = history.filter(effective_at__lte=since).order_by(
+            "-effective_at", "-id"
+        )
+        in_range |= Q(id=Subquery(in_effect.values("id")[:1]))
+    return history.filter(in_range).order_by("effective_at", "id")
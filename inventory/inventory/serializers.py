@@ -1,11 +1,15 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import (
     Category,
+    ChangeLog,
     Item,
     Location,
     ReturnRecall,
+    StockLedgerEntry,
     StockMovement,
     Supply,
+    SupplyPriceHistory,
     Store,
     ItemImage,
     SupplyReservation,
@@ -44,6 +48,10 @@ class StoreSerializer(serializers.ModelSerializer):
 
 
 class SupplySerializer(serializers.ModelSerializer):
+    base_unit = serializers.CharField(read_only=True)
+    base_quantity = serializers.DecimalField(
+        max_digits=24, decimal_places=6, read_only=True
+    )
 
     class Meta:
         model = Supply
@@ -59,9 +67,21 @@ class SupplySerializer(serializers.ModelSerializer):
             "man_date",
             "store",
             "supplier_id",
+            "base_unit",
+            "base_quantity",
         ]
 
 
+class SupplyStockSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    base_unit = serializers.CharField()
+    quantity = serializers.DecimalField(
+        source="total_quantity", max_digits=30, decimal_places=6
+    )
+    cost_value = serializers.DecimalField(max_digits=30, decimal_places=2)
+    sale_value = serializers.DecimalField(max_digits=30, decimal_places=2)
+
+
 class LocationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Location
@@ -77,7 +97,32 @@ class StockMovementSerializer(serializers.ModelSerializer):
 class ReturnRecallSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReturnRecall
-        fields = ["id", "item", "quantity", "reason", "status"]
+        fields = ["id", "item", "supply", "quantity", "reason", "status"]
+        # Status only changes through the approve and reject actions.
+        read_only_fields = ["status"]
+
+    def validate(self, data):
+        item = data.get("item")
+        supply = data.get("supply")
+        if supply:
+            if item and supply.item_id != item.id:
+                raise serializers.ValidationError(
+                    {"supply": "Supply does not belong to the returned item."}
+                )
+            data["item"] = supply.item
+        elif not item:
+            raise serializers.ValidationError(
+                {"item": "Either item or supply is required."}
+            )
+        return data
+
+
+class ReturnRecallDecisionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=settings.RETURNS_MAX_LINES,
+    )
 
 
 class ItemImageSerializer(serializers.ModelSerializer):
@@ -121,3 +166,97 @@ class SupplyReservationSerializer(serializers.ModelSerializer):
                 }
             )
         return data
+
+
+class ChangeLogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChangeLog
+        fields = ["seq", "entity", "object_id", "action", "payload", "created_at"]
+
+
+class SupplyPriceHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SupplyPriceHistory
+        fields = ["sale_price", "cost_price", "effective_at"]
+
+
+class StockLedgerEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockLedgerEntry
+        fields = [
+            "id",
+            "item",
+            "store",
+            "supply",
+            "batch_number",
+            "delta",
+            "reason",
+            "created_at",
+        ]
+
+
+class StockOnHandSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    store = serializers.IntegerField()
+    batch_number = serializers.CharField()
+    quantity = serializers.IntegerField()
+
+
+class ReorderSuggestionSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    store = serializers.IntegerField()
+    on_hand = serializers.IntegerField()
+    daily_demand = serializers.FloatField()
+    demand_std = serializers.FloatField()
+    safety_stock = serializers.IntegerField()
+    notify_below = serializers.IntegerField()
+    reorder_quantity = serializers.IntegerField()
+    needs_reorder = serializers.BooleanField()
+    days_of_cover = serializers.FloatField(allow_null=True)
+
+
+class ABCAnalysisSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    store = serializers.IntegerField()
+    on_hand = serializers.IntegerField()
+    stock_value = serializers.FloatField()
+    consumed = serializers.IntegerField()
+    consumed_value = serializers.FloatField()
+    share = serializers.FloatField()
+    cumulative_share = serializers.FloatField()
+    abc_class = serializers.CharField()
+    turnover = serializers.FloatField(allow_null=True)
+
+
+class CycleCountLineSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    store = serializers.IntegerField()
+    batch_number = serializers.CharField(required=False, allow_blank=True)
+    counted = serializers.IntegerField(min_value=0)
+
+
+class CycleCountSerializer(serializers.Serializer):
+    lines = CycleCountLineSerializer(
+        many=True, allow_empty=False, max_length=settings.CYCLE_COUNT_MAX_LINES
+    )
+    reason = serializers.CharField(required=False, default="Cycle count")
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_lines(self, lines):
+        # A location is counted either as a whole or batch by batch, once.
+        whole, batched, batches = set(), set(), set()
+        for line in lines:
+            location = (line["item"], line["store"])
+            if line.get("batch_number"):
+                key = (*location, line["batch_number"])
+                duplicate = key in batches or location in whole
+                batches.add(key)
+                batched.add(location)
+            else:
+                duplicate = location in whole or location in batched
+                whole.add(location)
+            if duplicate:
+                raise serializers.ValidationError(
+                    f"Item {line['item']} in store {line['store']} is counted more than once."
+                )
+        return lines
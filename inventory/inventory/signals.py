@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from .changes import TRACKED_MODELS, record_change
+from .ledger import capture_supply_state, log_supply_delete, log_supply_save
+from .models import ChangeLog, Supply
+from .pricing import log_price_change
+from .sync import (
+    ITEM_REFERENCES,
+    TOMBSTONE_ENTITIES,
+    record_tombstone,
+    touch_referencing_items,
+)
+
+
+def log_save(sender, instance, raw=False, **kwargs):
+    # Fixture loading saves raw rows; those are not changes to publish.
+    if raw:
+        return
+    record_change(instance, ChangeLog.UPSERT)
+
+
+def log_delete(sender, instance, **kwargs):
+    # Cascaded deletes also send post_delete inside the deletion transaction.
+    record_change(instance, ChangeLog.DELETE)
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(
+        log_save, sender=model, dispatch_uid=f"change_log_save_{model.__name__}"
+    )
+    post_delete.connect(
+        log_delete, sender=model, dispatch_uid=f"change_log_delete_{model.__name__}"
+    )
+
+pre_save.connect(capture_supply_state, sender=Supply, dispatch_uid="ledger_pre_save")
+pre_delete.connect(
+    capture_supply_state, sender=Supply, dispatch_uid="ledger_pre_delete"
+)
+post_save.connect(log_supply_save, sender=Supply, dispatch_uid="ledger_save")
+post_delete.connect(log_supply_delete, sender=Supply, dispatch_uid="ledger_delete")
+post_save.connect(log_price_change, sender=Supply, dispatch_uid="price_history_save")
+
+for model in TOMBSTONE_ENTITIES:
+    post_delete.connect(
+        record_tombstone, sender=model, dispatch_uid=f"tombstone_{model.__name__}"
+    )
+
+for model in ITEM_REFERENCES:
+    pre_delete.connect(
+        touch_referencing_items,
+        sender=model,
+        dispatch_uid=f"touch_items_{model.__name__}",
+    )
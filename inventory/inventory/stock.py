@@ -0,0 +1,138 @@
+from collections import defaultdict, namedtuple
+
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .changes import record_changes
+from .ledger import record_entries
+from .models import StockLedgerEntry, StockMovement, Supply
+
+# A signed change to one supply's quantity and the reason recorded with it.
+StockAdjustment = namedtuple(
+    "StockAdjustment", ["supply_id", "store_id", "delta", "reason"]
+)
+
+
+def apply_stock_adjustments(adjustments):
+    """
+    Apply many stock adjustments with set-based writes: one UPDATE for all
+    affected supplies and bulk INSERTs of StockMovement and ledger rows.
+
+    Incoming stock is recorded as a movement to the supply's store and
+    outgoing stock as a movement from it. Must run inside a transaction.
+    """
+    adjustments = list(adjustments)
+    deltas = defaultdict(int)
+    for adjustment in adjustments:
+        deltas[adjustment.supply_id] += adjustment.delta
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+
+    if deltas:
+        Supply.objects.filter(pk__in=deltas).update(
+            quantity=F("quantity")
+            + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+                default=Value(0),
+                output_field=models.IntegerField(),
+            ),
+            # update() skips auto_now; delta sync relies on it.
+            updated_at=timezone.now(),
+        )
+        record_changes(Supply, deltas)
+
+    movements = StockMovement.objects.bulk_create(
+        StockMovement(
+            supply_id=adjustment.supply_id,
+            from_store_id=adjustment.store_id if adjustment.delta < 0 else None,
+            to_store_id=adjustment.store_id if adjustment.delta > 0 else None,
+            quantity=abs(adjustment.delta),
+            reason=adjustment.reason,
+        )
+        for adjustment in adjustments
+        if adjustment.delta
+    )
+    record_changes(StockMovement, [movement.pk for movement in movements])
+
+    supplies = {
+        pk: (item_id, batch_number)
+        for pk, item_id, batch_number in Supply.objects.filter(
+            pk__in={adjustment.supply_id for adjustment in adjustments}
+        ).values_list("pk", "item_id", "batch_number")
+    }
+    record_entries(
+        StockLedgerEntry(
+            item_id=supplies[adjustment.supply_id][0],
+            store_id=adjustment.store_id,
+            supply_id=adjustment.supply_id,
+            batch_number=supplies[adjustment.supply_id][1],
+            delta=adjustment.delta,
+            reason=adjustment.reason,
+        )
+        for adjustment in adjustments
+        if adjustment.delta
+    )
+    return movements
+
+
+def fefo_key(supply):
+    # First expired, first out; undated batches go last, oldest rows first.
+    return (supply["expiration_date"] is None, supply["expiration_date"], supply["id"])
+
+
+def plan_cycle_count(lines, reason):
+    """
+    Compare counted quantities with the current stock and plan the
+    adjustments. Lines name an item and store, and optionally a batch; a line
+    without a batch counts every batch of the item in that store.
+
+    Shortfalls are taken from the batches expiring first; surpluses are
+    added to the batch expiring last. Current quantities for all lines are
+    loaded with one locking query, so call this inside a transaction.
+    Returns the variance per line, the unmatched lines and the adjustments.
+    """
+    supplies = defaultdict(list)
+    for supply in (
+        Supply.objects.select_for_update()
+        .filter(
+            item_id__in={line["item"] for line in lines},
+            store_id__in={line["store"] for line in lines},
+        )
+        .values(
+            "id", "item_id", "store_id", "batch_number", "quantity", "expiration_date"
+        )
+    ):
+        supplies[supply["item_id"], supply["store_id"]].append(supply)
+
+    variances, unmatched, adjustments = [], [], []
+    for line in lines:
+        batches = sorted(supplies.get((line["item"], line["store"]), []), key=fefo_key)
+        if line.get("batch_number"):
+            batches = [
+                supply
+                for supply in batches
+                if supply["batch_number"] == line["batch_number"]
+            ]
+        if not batches:
+            unmatched.append(line)
+            continue
+
+        expected = sum(supply["quantity"] for supply in batches)
+        variance = line["counted"] - expected
+        variances.append({**line, "expected": expected, "variance": variance})
+        if variance > 0:
+            newest = batches[-1]
+            adjustments.append(
+                StockAdjustment(newest["id"], newest["store_id"], variance, reason)
+            )
+        shortfall = -variance
+        for supply in batches:
+            if shortfall <= 0:
+                break
+            taken = min(supply["quantity"], shortfall)
+            if taken:
+                adjustments.append(
+                    StockAdjustment(supply["id"], supply["store_id"], -taken, reason)
+                )
+            shortfall -= taken
+    return variances, unmatched, adjustments
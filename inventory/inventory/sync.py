@@ -0,0 +1,159 @@
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Item, Manufacturer, Store, Supply, Tombstone
+
+# Streams are sent in this order, each row as a list of these fields. Every
+# field list starts with the id and ends with the timestamp it is paged by.
+SYNC_STREAMS = {
+    "category": (Category, ["id", "name", "description", "updated_at"]),
+    "store": (Store, ["id", "business_id", "name", "location_id", "updated_at"]),
+    "item": (
+        Item,
+        [
+            "id",
+            "name",
+            "description",
+            "category_id",
+            "barcode",
+            "manufacturer_id",
+            "is_returnable",
+            "notify_below",
+            "isvisible",
+            "updated_at",
+        ],
+    ),
+    "supply": (
+        Supply,
+        [
+            "id",
+            "item_id",
+            "store_id",
+            "quantity",
+            "unit",
+            "base_unit",
+            "base_quantity",
+            "sale_price",
+            "cost_price",
+            "expiration_date",
+            "batch_number",
+            "man_date",
+            "supplier_id",
+            "updated_at",
+        ],
+    ),
+    "deleted": (Tombstone, ["id", "entity", "object_id", "deleted_at"]),
+}
+STREAM_NAMES = list(SYNC_STREAMS)
+TOMBSTONE_ENTITIES = {
+    model: name
+    for name, (model, fields) in SYNC_STREAMS.items()
+    if model is not Tombstone
+}
+# Deleting these sets Item foreign keys to NULL with a plain UPDATE.
+ITEM_REFERENCES = {Category: "category", Manufacturer: "manufacturer"}
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(entity=TOMBSTONE_ENTITIES[sender], object_id=instance.pk)
+
+
+def touch_referencing_items(sender, instance, **kwargs):
+    # Runs before the SET_NULL update, which skips auto_now; bumping now puts
+    # the affected items in the next sync.
+    Item.objects.filter(**{ITEM_REFERENCES[sender]: instance}).update(
+        updated_at=timezone.now()
+    )
+
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not 0 <= state["stream"] < len(STREAM_NAMES) or not parse_datetime(
+            state["until"]
+        ):
+            raise ValueError
+    except (TypeError, KeyError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor.")
+    return state
+
+
+def stream_queryset(name, state):
+    model, fields = SYNC_STREAMS[name]
+    timestamp = fields[-1]
+    queryset = model.objects.filter(
+        **{f"{timestamp}__lte": parse_datetime(state["until"])}
+    )
+    if state["since"]:
+        queryset = queryset.filter(
+            **{f"{timestamp}__gt": parse_datetime(state["since"])}
+        )
+    if state["after"]:
+        after_timestamp, after_id = parse_datetime(state["after"][0]), state["after"][1]
+        queryset = queryset.filter(
+            Q(**{f"{timestamp}__gt": after_timestamp})
+            | Q(**{timestamp: after_timestamp, "id__gt": after_id})
+        )
+    if state["business_id"] is not None:
+        if name == "store":
+            queryset = queryset.filter(business_id=state["business_id"])
+        elif name == "supply":
+            queryset = queryset.filter(store__business_id=state["business_id"])
+    return queryset.order_by(timestamp, "id").values_list(*fields)
+
+
+def skip_streams(state):
+    # A full download has nothing stale to delete.
+    if not state["since"] and state["stream"] == STREAM_NAMES.index("deleted"):
+        state["stream"] += 1
+
+
+def sync_page(state, limit, overlap):
+    """
+    Read up to `limit` changed rows across the streams, continuing from the
+    position in `state`. Returns the rows per stream, the cursor for the next
+    page and, once every stream is exhausted, the `updated_since` to start
+    the next sync from.
+    """
+    results = {}
+    skip_streams(state)
+    while state["stream"] < len(STREAM_NAMES) and limit > 0:
+        name = STREAM_NAMES[state["stream"]]
+        rows = list(stream_queryset(name, state)[: limit + 1])
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            state["after"] = [last[-1].isoformat(), last[0]]
+        else:
+            state["stream"] += 1
+            state["after"] = None
+            skip_streams(state)
+        limit -= len(rows)
+        if rows:
+            results[name] = {"fields": SYNC_STREAMS[name][1], "rows": rows}
+
+    if state["stream"] < len(STREAM_NAMES):
+        return results, encode_cursor(state), None
+    # Rows saved in transactions still open at `until` can commit with an
+    # older timestamp; the next sync starts a little earlier to pick them up.
+    updated_since = parse_datetime(state["until"]) - datetime.timedelta(seconds=overlap)
+    return results, None, updated_since
+
+
+def initial_state(updated_since, business_id):
+    return {
+        "since": updated_since.isoformat() if updated_since else None,
+        "until": timezone.now().isoformat(),
+        "stream": 0,
+        "after": None,
+        "business_id": business_id,
+    }
@@ -1,17 +1,37 @@
+import datetime
+import random
 from decimal import Decimal
 from unittest.mock import patch
+from django.test import Client, SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from django.db import transaction
 from .models import (
     Category,
+    ChangeLog,
     Manufacturer,
     Location,
     Store,
     Item,
     Supply,
+    SupplyPriceHistory,
     SupplyReservation,
+    ReturnRecall,
+    StockLedgerEntry,
+    StockMovement,
 )
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from core.testing import QueryCountAssertionsMixin
+from .benchmarks import SCENARIOS, cleanup_catalog, seed_catalog
+from .benchmarks.runner import local_environment, summarize
+from .ledger import create_checkpoints
+from .stock import StockAdjustment, apply_stock_adjustments
+from .renderers import ORJSONRenderer
+from .views import parse_moment
 
 
 class DummyUser:
@@ -110,6 +130,52 @@ class TestItemViewSet(APITestCase):
         self.assertEqual(response_page2.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response_page2.data["results"]), 5)
 
+    def test_autocomplete_by_prefix(self):
+        Item.objects.create(name="Apple Juice", notify_below=5)
+        Item.objects.create(name="apple pie", notify_below=5)
+        Item.objects.create(name="Pineapple", notify_below=5)
+        response = self.client.get("/inventory/items/autocomplete/?q=APP")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["name"] for item in response.data["results"]],
+            ["Apple Juice", "apple pie"],
+        )
+
+    def test_autocomplete_limit(self):
+        response = self.client.get("/inventory/items/autocomplete/?q=test&limit=3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_batch_retrieve_keeps_order_and_reports_missing(self):
+        ids = list(Item.objects.values_list("id", flat=True)[:3])
+        requested = [ids[2], 999999, ids[0], ids[1]]
+        url = "/inventory/items/batch/?ids={}".format(
+            ",".join(str(pk) for pk in requested)
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]],
+            [ids[2], ids[0], ids[1]],
+        )
+        self.assertEqual(response.data["missing"], [999999])
+
+    def test_batch_retrieve_with_post_body(self):
+        ids = list(Item.objects.values_list("id", flat=True)[:2])
+        url = reverse("items-batch")
+        response = self.client.post(url, {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in response.data["results"]], ids)
+        self.assertEqual(response.data["missing"], [])
+
+    def test_batch_retrieve_invalid_ids(self):
+        response = self.client.get("/inventory/items/batch/?ids=1,abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ids", response.data)
+        response = self.client.post(reverse("items-batch"), [1, 2], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ids", response.data)
+
 
 class TestSupplyReservation(APITestCase):
     def setUp(self):
@@ -279,3 +345,966 @@ class TestSupplyReservation(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Supply quantity should be reduced by 20 after updating status to fulfilled
         self.assertEqual(self.supply.quantity, initial_quantity - 20)
+
+
+class TestSupplyStock(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=1, name="Stock Store", location=Location.objects.create()
+        )
+        self.item = Item.objects.create(name="Flour", notify_below=5)
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def create_supply(self, quantity, unit, batch_number, cost_price="10.00"):
+        return Supply.objects.create(
+            item=self.item,
+            quantity=quantity,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal(cost_price),
+            unit=unit,
+            batch_number=batch_number,
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def test_base_quantity_follows_unit(self):
+        supply = self.create_supply(2, "Kilogram(kg)", "flour-kg")
+        supply.refresh_from_db()
+        self.assertEqual(supply.base_unit, "g")
+        self.assertEqual(supply.base_quantity, Decimal("2000"))
+
+        supply.quantity = 3
+        supply.save()
+        supply.refresh_from_db()
+        self.assertEqual(supply.base_quantity, Decimal("3000"))
+
+    def test_stock_totals_across_units(self):
+        self.create_supply(2, "Kilogram(kg)", "flour-kg", cost_price="30.00")
+        self.create_supply(500, "Gram(g)", "flour-g", cost_price="1.00")
+        self.create_supply(1, "Pack (pk)", "flour-pk")
+
+        response = self.client.get(reverse("supplies-stock"), {"item_id": self.item.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        totals = {row["base_unit"]: row for row in response.data["results"]}
+        self.assertEqual(set(totals), {"g", "pk"})
+        self.assertEqual(Decimal(totals["g"]["quantity"]), Decimal("2500"))
+        self.assertEqual(Decimal(totals["g"]["cost_value"]), Decimal("560.00"))
+        self.assertEqual(Decimal(totals["pk"]["quantity"]), Decimal("1"))
+
+
+class TestReturnRecall(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=1, name="Returns Store", location=Location.objects.create()
+        )
+        self.item = Item.objects.create(name="Juice", notify_below=5)
+        self.supply = Supply.objects.create(
+            item=self.item,
+            quantity=10,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number="JUICE-001",
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def test_bulk_create_returns(self):
+        response = self.client.post(
+            reverse("returns-list"),
+            [
+                {"supply": self.supply.id, "quantity": 2, "reason": "Damaged"},
+                {"supply": self.supply.id, "quantity": 3},
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        # The item is filled in from the supply.
+        self.assertEqual(
+            ReturnRecall.objects.filter(
+                item=self.item, status=ReturnRecall.PENDING
+            ).count(),
+            2,
+        )
+
+    def test_return_requires_item_or_supply(self):
+        response = self.client.post(
+            reverse("returns-list"), {"quantity": 1}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_approve_restocks_supplies(self):
+        first = ReturnRecall.objects.create(
+            item=self.item, supply=self.supply, quantity=2
+        )
+        second = ReturnRecall.objects.create(
+            item=self.item, supply=self.supply, quantity=3
+        )
+        rejected = ReturnRecall.objects.create(
+            item=self.item,
+            supply=self.supply,
+            quantity=4,
+            status=ReturnRecall.REJECTED,
+        )
+
+        response = self.client.post(
+            reverse("returns-approve"),
+            {"ids": [first.id, second.id, rejected.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data["approved"]), [first.id, second.id])
+        self.assertEqual(response.data["not_pending"], [rejected.id])
+
+        self.supply.refresh_from_db()
+        self.assertEqual(self.supply.quantity, 15)
+        movements = StockMovement.objects.filter(supply=self.supply)
+        self.assertEqual(movements.count(), 2)
+        self.assertTrue(all(m.to_store_id == self.store.id for m in movements))
+        first.refresh_from_db()
+        self.assertEqual(first.status, ReturnRecall.APPROVED)
+
+    def test_approve_rejects_returns_without_supply(self):
+        line = ReturnRecall.objects.create(item=self.item, quantity=1)
+        response = self.client.post(
+            reverse("returns-approve"), {"ids": [line.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        line.refresh_from_db()
+        self.assertEqual(line.status, ReturnRecall.PENDING)
+
+    def test_reject_returns(self):
+        line = ReturnRecall.objects.create(
+            item=self.item, supply=self.supply, quantity=1
+        )
+        response = self.client.post(
+            reverse("returns-reject"), {"ids": [line.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        line.refresh_from_db()
+        self.assertEqual(line.status, ReturnRecall.REJECTED)
+        self.supply.refresh_from_db()
+        self.assertEqual(self.supply.quantity, 10)
+
+    def test_recall_by_batch_number(self):
+        ReturnRecall.objects.create(item=self.item, supply=self.supply, quantity=1)
+        response = self.client.get(
+            reverse("returns-recall"), {"batch_number": "JUICE-001"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["supplies"]), 1)
+        self.assertEqual(len(response.data["returns"]), 1)
+
+        response = self.client.get(reverse("returns-recall"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestStockLedger(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=1, name="Ledger Store", location=Location.objects.create()
+        )
+        self.other_store = Store.objects.create(
+            business_id=1, name="Other Store", location=Location.objects.create()
+        )
+        self.item = Item.objects.create(name="Rice", notify_below=5)
+        self.supply = Supply.objects.create(
+            item=self.item,
+            quantity=10,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number="RICE-001",
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def on_hand(self, **params):
+        response = self.client.get(reverse("stock-ledger-on-hand"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_supply_changes_are_recorded(self):
+        self.supply.quantity = 7
+        self.supply.save()
+        apply_stock_adjustments(
+            [StockAdjustment(self.supply.id, self.store.id, 4, "Restock")]
+        )
+        self.assertEqual(
+            list(
+                StockLedgerEntry.objects.filter(supply=self.supply).values_list(
+                    "delta", flat=True
+                )
+            ),
+            [10, -3, 4],
+        )
+
+        self.supply.refresh_from_db()
+        self.supply.store = self.other_store
+        self.supply.save()
+        rows = self.on_hand(item=self.item.id)["results"]
+        self.assertEqual(
+            [(row["store"], row["quantity"]) for row in rows],
+            [(self.other_store.id, 11)],
+        )
+
+    def test_point_in_time_from_checkpoint(self):
+        self.supply.quantity = 7
+        self.supply.save()
+        watermark, checkpoints = create_checkpoints()
+        self.assertEqual([c.quantity for c in checkpoints], [7])
+        moment = timezone.now()
+
+        self.supply.quantity = 12
+        self.supply.save()
+
+        data = self.on_hand(store=self.store.id, at=moment.isoformat())
+        self.assertEqual(data["checkpoint"], watermark)
+        self.assertEqual([row["quantity"] for row in data["results"]], [7])
+        data = self.on_hand(store=self.store.id)
+        self.assertEqual([row["quantity"] for row in data["results"]], [12])
+
+    def test_deleted_supply_leaves_stock(self):
+        self.supply.delete()
+        self.assertEqual(self.on_hand(item=self.item.id)["results"], [])
+        self.assertEqual(StockLedgerEntry.objects.count(), 2)
+
+    def test_entries_are_append_only(self):
+        entry = StockLedgerEntry.objects.get()
+        entry.delta = 100
+        with self.assertRaises(ValidationError):
+            entry.save()
+        with self.assertRaises(ValidationError):
+            entry.delete()
+
+    def test_invalid_moment(self):
+        response = self.client.get(reverse("stock-ledger-on-hand"), {"at": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestInventoryBenchmark(APITestCase):
+    def test_seed_run_and_cleanup(self):
+        catalog = seed_catalog(
+            "benchtest", items=5, stores=2, supplies=10, reservations=3
+        )
+        self.assertEqual(Supply.objects.filter(id__in=catalog.supply_ids).count(), 10)
+
+        # Worker threads cannot see the test transaction, so the scenarios
+        # run on this thread here.
+        client, rng = Client(HTTP_AUTHORIZATION="Bearer benchmark"), random.Random(0)
+        with local_environment():
+            for name in ("list", "reserve", "transfer"):
+                func, expected_status = SCENARIOS[name]
+                response = func(client, rng, catalog)
+                self.assertEqual(response.status_code, expected_status, name)
+
+        summary = summarize([0.001, 0.002, 0.003], errors=0, elapsed=1)
+        self.assertEqual(summary["throughput_rps"], 3)
+        self.assertEqual(summary["latency_ms"]["p50"], 2)
+
+        cleanup_catalog(catalog)
+        self.assertFalse(Item.objects.filter(id__in=catalog.item_ids).exists())
+        self.assertFalse(Store.objects.filter(id__in=catalog.store_ids).exists())
+        self.assertFalse(Supply.objects.filter(id__in=catalog.supply_ids).exists())
+
+
+class TestQueryStats(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def list_items(self, size):
+        Item.objects.bulk_create(
+            Item(name=f"Query Item {i}", notify_below=1)
+            for i in range(Item.objects.count(), size)
+        )
+        response = self.client.get(reverse("items-list"))
+        self.assertEqual(len(response.data["results"]), size)
+
+    def test_item_list_queries_do_not_grow(self):
+        self.assertQueryCountConstant(self.list_items, sizes=(1, 5, 10))
+
+    def test_helper_reports_growing_queries(self):
+        def one_query_per_row(size):
+            for i in range(size):
+                Item.objects.filter(pk=i).exists()
+
+        with self.assertRaisesMessage(AssertionError, "Query count grows"):
+            self.assertQueryCountConstant(one_query_per_row, sizes=(1, 3))
+
+    @override_settings(QUERY_STATS_SERVER_TIMING=True, QUERY_STATS_REPEAT_THRESHOLD=3)
+    def test_server_timing_and_log(self):
+        Item.objects.bulk_create(
+            Item(name=f"Logged Item {i}", notify_below=1) for i in range(3)
+        )
+        with self.assertLogs("query_stats", level="INFO") as logs:
+            response = self.client.get(reverse("items-list"))
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries"'
+        )
+        record = logs.records[0].query_stats
+        self.assertEqual(record["path"], reverse("items-list"))
+        self.assertGreater(record["queries"], 0)
+        self.assertEqual(logs.records[0].levelname, "INFO")
+
+
+class TestReorderSuggestions(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=1, name="Forecast Store", location=Location.objects.create()
+        )
+        self.item = Item.objects.create(name="Tea", notify_below=5)
+        self.supply = Supply.objects.create(
+            item=self.item,
+            quantity=100,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number="TEA-001",
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def fulfil(self, quantity, days_ago, status="fulfilled"):
+        reservation = SupplyReservation.objects.create(
+            supply=self.supply, quantity=quantity, status=status
+        )
+        SupplyReservation.objects.filter(pk=reservation.pk).update(
+            reserved_at=timezone.now() - datetime.timedelta(days=days_ago)
+        )
+
+    def test_suggestion_from_daily_demand(self):
+        self.fulfil(10, days_ago=1)
+        self.fulfil(20, days_ago=2)
+        self.fulfil(50, days_ago=2, status="active")
+        self.fulfil(5, days_ago=30)
+
+        response = self.client.get(
+            reverse("reorder-suggestions-list"), {"days": 4, "service_level": 0.95}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [row] = response.data["results"]
+        self.assertEqual(row["item"], self.item.id)
+        self.assertEqual(row["on_hand"], 65)
+        # Daily demand 0, 0, 20, 10 over the four days.
+        self.assertEqual(row["daily_demand"], 7.5)
+        self.assertAlmostEqual(row["demand_std"], 8.292, places=3)
+        # 7.5 * 7 + 1.645 * 8.292 * sqrt(7)
+        self.assertEqual(row["notify_below"], 89)
+        self.assertEqual(row["reorder_quantity"], 77)
+        self.assertTrue(row["needs_reorder"])
+
+    def test_invalid_parameters(self):
+        for params in (
+            {"days": 0},
+            {"service_level": 1},
+            {"lead_time": "x"},
+            {"lead_time": "nan"},
+            {"review_period": "inf"},
+        ):
+            response = self.client.get(reverse("reorder-suggestions-list"), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestABCAnalysis(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=7, name="ABC Store", location=Location.objects.create()
+        )
+        self.items = {}
+        for name, consumed in (("A", 80), ("B", 15), ("C", 5), ("Idle", 0)):
+            item = Item.objects.create(name=f"ABC {name}", notify_below=1)
+            supply = Supply.objects.create(
+                item=item,
+                quantity=100,
+                sale_price=Decimal("20.00"),
+                cost_price=Decimal("10.00"),
+                unit="Piece (pc)",
+                batch_number=f"ABC-{name}",
+                store=self.store,
+                supplier_id=1,
+            )
+            if consumed:
+                SupplyReservation.objects.create(
+                    supply=supply, quantity=consumed, status="fulfilled"
+                )
+            self.items[name] = item.id
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+        cache.clear()
+
+    def test_abc_classes_and_turnover(self):
+        response = self.client.get(
+            reverse("analytics-abc"), {"business_id": 7, "days": 365}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = {row["item"]: row for row in response.data["results"]}
+        self.assertEqual(
+            {name: rows[item_id]["abc_class"] for name, item_id in self.items.items()},
+            {"A": "A", "B": "B", "C": "C", "Idle": "C"},
+        )
+        self.assertEqual(rows[self.items["A"]]["share"], 0.8)
+        # 800 consumed against 200 still in stock over a year.
+        self.assertEqual(rows[self.items["A"]]["turnover"], 4.0)
+        [summary] = response.data["stores"]
+        self.assertEqual(summary["classes"], {"A": 1, "B": 1, "C": 2})
+        self.assertEqual(summary["consumed_value"], 1000.0)
+
+    def test_results_are_cached_until_refresh(self):
+        url = reverse("analytics-abc")
+        first = self.client.get(url, {"business_id": 7, "class": "A"})
+        self.assertEqual(len(first.data["results"]), 1)
+        Item.objects.filter(id__in=self.items.values()).delete()
+
+        cached = self.client.get(url, {"business_id": 7})
+        self.assertEqual(cached.data["computed_at"], first.data["computed_at"])
+        self.assertEqual(cached.data["count"], 4)
+
+        fresh = self.client.get(url, {"business_id": 7, "refresh": "true"})
+        self.assertEqual(fresh.data["count"], 0)
+
+    def test_business_id_is_required(self):
+        response = self.client.get(reverse("analytics-abc"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestSupplyAvailability(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.stores = [
+            Store.objects.create(
+                business_id=3,
+                name=f"Matrix Store {i}",
+                location=Location.objects.create(),
+            )
+            for i in range(2)
+        ]
+        self.items = [
+            Item.objects.create(name=f"Matrix Item {i}", notify_below=1)
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def create_supply(self, item, store, quantity):
+        return Supply.objects.create(
+            item=item,
+            quantity=quantity,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number=f"MATRIX-{Supply.objects.count()}",
+            store=store,
+            supplier_id=1,
+        )
+
+    def test_availability_matrix(self):
+        first = self.create_supply(self.items[0], self.stores[0], 10)
+        self.create_supply(self.items[0], self.stores[0], 5)
+        self.create_supply(self.items[1], self.stores[1], 7)
+        SupplyReservation.objects.create(supply=first, quantity=4)
+        SupplyReservation.objects.create(supply=first, quantity=1, status="cancelled")
+
+        item_ids = [self.items[1].id, self.items[0].id, self.items[2].id]
+        store_ids = [store.id for store in self.stores]
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse("supplies-availability"),
+                {
+                    "items": ",".join(map(str, item_ids)),
+                    "stores": ",".join(map(str, store_ids)),
+                },
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["items"], item_ids)
+        self.assertEqual(response.data["stores"], store_ids)
+        self.assertEqual(response.data["on_hand"], [[0, 7], [15, 0], [0, 0]])
+        self.assertEqual(response.data["reserved"], [[0, 0], [4, 0], [0, 0]])
+        self.assertEqual(response.data["available"], [[0, 7], [11, 0], [0, 0]])
+
+    def test_stores_default_to_those_holding_stock(self):
+        self.create_supply(self.items[0], self.stores[1], 3)
+        response = self.client.post(
+            reverse("supplies-availability"),
+            {"items": [self.items[0].id], "business_id": 3},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["stores"], [self.stores[1].id])
+        self.assertEqual(response.data["available"], [[3]])
+
+    def test_items_are_required(self):
+        response = self.client.get(reverse("supplies-availability"))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse("supplies-availability"), {"items": "a"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestCycleCount(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=1, name="Count Store", location=Location.objects.create()
+        )
+        self.item = Item.objects.create(name="Milk", notify_below=5)
+        self.other_item = Item.objects.create(name="Butter", notify_below=5)
+        self.early = self.create_supply(self.item, 5, "MILK-EARLY", 10)
+        self.late = self.create_supply(self.item, 10, "MILK-LATE", 20)
+        self.butter = self.create_supply(self.other_item, 4, "BUTTER-1", None)
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def create_supply(self, item, quantity, batch_number, expires_in_days):
+        return Supply.objects.create(
+            item=item,
+            quantity=quantity,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number=batch_number,
+            expiration_date=(
+                datetime.date.today() + datetime.timedelta(days=expires_in_days)
+                if expires_in_days
+                else None
+            ),
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def quantities(self):
+        return {
+            supply.batch_number: supply.quantity
+            for supply in Supply.objects.filter(store=self.store)
+        }
+
+    def test_shortfall_taken_first_expired_first_out(self):
+        response = self.client.post(
+            reverse("supplies-cycle-count"),
+            {
+                "lines": [
+                    {"item": self.item.id, "store": self.store.id, "counted": 8},
+                    {
+                        "item": self.other_item.id,
+                        "store": self.store.id,
+                        "batch_number": "BUTTER-1",
+                        "counted": 6,
+                    },
+                    {"item": self.item.id, "store": 999, "counted": 1},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["matched"], 2)
+        self.assertEqual(response.data["shrinkage"], 7)
+        self.assertEqual(response.data["surplus"], 2)
+        self.assertEqual(response.data["movements"], 3)
+        self.assertEqual(len(response.data["unmatched"]), 1)
+        self.assertEqual(
+            self.quantities(), {"MILK-EARLY": 0, "MILK-LATE": 8, "BUTTER-1": 6}
+        )
+        self.assertEqual(StockMovement.objects.filter(reason="Cycle count").count(), 3)
+
+    def test_surplus_goes_to_batch_expiring_last(self):
+        response = self.client.post(
+            reverse("supplies-cycle-count"),
+            {
+                "lines": [
+                    {"item": self.item.id, "store": self.store.id, "counted": 18}
+                ],
+                "reason": "Year end count",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.quantities()["MILK-LATE"], 13)
+        self.assertTrue(StockMovement.objects.filter(reason="Year end count").exists())
+
+    def test_dry_run_changes_nothing(self):
+        response = self.client.post(
+            reverse("supplies-cycle-count"),
+            {
+                "lines": [{"item": self.item.id, "store": self.store.id, "counted": 0}],
+                "dry_run": True,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["shrinkage"], 15)
+        self.assertEqual(response.data["movements"], 0)
+        self.assertEqual(self.quantities()["MILK-EARLY"], 5)
+
+    def test_location_counted_twice_is_rejected(self):
+        response = self.client.post(
+            reverse("supplies-cycle-count"),
+            {
+                "lines": [
+                    {"item": self.item.id, "store": self.store.id, "counted": 3},
+                    {
+                        "item": self.item.id,
+                        "store": self.store.id,
+                        "batch_number": "MILK-LATE",
+                        "counted": 3,
+                    },
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestDeltaSync(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.category = Category.objects.create(name="Drinks")
+        self.store = Store.objects.create(
+            business_id=1, name="Sync Store", location=Location.objects.create()
+        )
+        self.items = [
+            Item.objects.create(
+                name=f"Sync Item {i}", notify_below=1, category=self.category
+            )
+            for i in range(3)
+        ]
+        self.supply = Supply.objects.create(
+            item=self.items[0],
+            quantity=5,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number="SYNC-001",
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def sync(self, **params):
+        """Follow cursors to the end, returning rows per stream and the
+        `updated_since` for the next sync."""
+        streams, pages = {}, 0
+        while True:
+            response = self.client.get(reverse("sync-list"), params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages += 1
+            for name, stream in response.data["results"].items():
+                rows = [dict(zip(stream["fields"], row)) for row in stream["rows"]]
+                streams.setdefault(name, []).extend(rows)
+            if not response.data["cursor"]:
+                return streams, response.data["updated_since"], pages
+            params = {**params, "cursor": response.data["cursor"]}
+
+    def test_full_download_in_pages(self):
+        streams, updated_since, pages = self.sync(limit=2)
+        self.assertEqual(pages, 3)
+        self.assertEqual(
+            {name: len(rows) for name, rows in streams.items()},
+            {"category": 1, "store": 1, "item": 3, "supply": 1},
+        )
+        self.assertEqual(
+            [row["id"] for row in streams["item"]], [item.id for item in self.items]
+        )
+        self.assertIsNotNone(updated_since)
+
+    def test_delta_sync_with_tombstones(self):
+        since = timezone.now()
+        self.items[1].name = "Renamed"
+        self.items[1].save()
+        apply_stock_adjustments(
+            [StockAdjustment(self.supply.id, self.store.id, 2, "Restock")]
+        )
+        deleted_id = self.items[2].id
+        self.items[2].delete()
+
+        streams, _, _ = self.sync(updated_since=since.isoformat())
+        self.assertEqual([row["name"] for row in streams["item"]], ["Renamed"])
+        self.assertEqual([row["quantity"] for row in streams["supply"]], [7])
+        self.assertEqual(
+            [(row["entity"], row["object_id"]) for row in streams["deleted"]],
+            [("item", deleted_id)],
+        )
+        self.assertNotIn("category", streams)
+
+    def test_deleted_category_resyncs_items(self):
+        since = timezone.now()
+        self.category.delete()
+        streams, _, _ = self.sync(updated_since=since.isoformat())
+        self.assertEqual(len(streams["item"]), 3)
+        self.assertTrue(all(row["category_id"] is None for row in streams["item"]))
+        self.assertEqual(streams["deleted"][0]["entity"], "category")
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("sync-list"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestSupplyPriceHistory(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+        self.store = Store.objects.create(
+            business_id=1, name="Price Store", location=Location.objects.create()
+        )
+        self.supply = Supply.objects.create(
+            item=Item.objects.create(name="Tea", notify_below=5),
+            quantity=10,
+            sale_price=Decimal("20.00"),
+            cost_price=Decimal("10.00"),
+            unit="Piece (pc)",
+            batch_number="TEA-001",
+            store=self.store,
+            supplier_id=1,
+        )
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def prices(self):
+        return list(
+            SupplyPriceHistory.objects.filter(supply=self.supply).values_list(
+                "sale_price", "cost_price"
+            )
+        )
+
+    def test_only_price_changes_are_recorded(self):
+        self.supply.quantity = 8
+        self.supply.save()
+        self.supply.sale_price = "20.0"
+        self.supply.save()
+        self.supply.sale_price = Decimal("25.00")
+        self.supply.save()
+        self.supply.cost_price = Decimal("12.00")
+        self.supply.save(update_fields=["quantity", "updated_at"])
+        self.supply.save(update_fields=["cost_price", "updated_at"])
+        self.assertEqual(
+            self.prices(),
+            [
+                (Decimal("20.00"), Decimal("10.00")),
+                (Decimal("25.00"), Decimal("10.00")),
+                (Decimal("25.00"), Decimal("12.00")),
+            ],
+        )
+
+    def test_price_history_range(self):
+        for sale_price in ("22.00", "24.00", "26.00"):
+            self.supply.sale_price = Decimal(sale_price)
+            self.supply.save()
+        history = SupplyPriceHistory.objects.filter(supply=self.supply)
+        start = timezone.make_aware(datetime.datetime(2025, 1, 1))
+        for index, entry in enumerate(history):
+            history.filter(pk=entry.pk).update(
+                effective_at=start + datetime.timedelta(days=10 * index)
+            )
+
+        url = reverse("supplies-price-history", args=[self.supply.id])
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                url, {"since": "2025-01-15", "until": "2025-01-30T12:00:00"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [entry["sale_price"] for entry in response.data],
+            ["22.00", "24.00"],
+        )
+
+        response = self.client.get(url, {"until": "2024-12-31"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+        response = self.client.get(url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(
+            reverse("supplies-price-history", args=[self.supply.id + 100])
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestChangeFeed(APITestCase):
+    def setUp(self):
+        self.auth_patcher = patch(
+            "inventory.authentication.RemoteJWTAuthentication.authenticate",
+            return_value=(DummyUser(), "testtoken"),
+        )
+        self.auth_patcher.start()
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer testtoken")
+
+    def tearDown(self):
+        self.auth_patcher.stop()
+
+    def create_item(self, name):
+        return Item.objects.create(name=name, notify_below=5)
+
+    def test_item_changes_are_logged(self):
+        item = self.create_item("Logged Item")
+        item.name = "Renamed Item"
+        item.save()
+        item_id = item.id
+        item.delete()
+
+        entries = list(ChangeLog.objects.filter(entity="item", object_id=item_id))
+        self.assertEqual(
+            [entry.action for entry in entries],
+            [ChangeLog.UPSERT, ChangeLog.UPSERT, ChangeLog.DELETE],
+        )
+        self.assertEqual(entries[1].payload["name"], "Renamed Item")
+
+    def test_rolled_back_change_is_not_logged(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.create_item("Rolled Back Item")
+                raise RuntimeError
+        self.assertFalse(ChangeLog.objects.exists())
+
+    def test_feed_since_and_limit(self):
+        for i in range(3):
+            self.create_item(f"Feed Item {i}")
+        first_seq = ChangeLog.objects.earliest().seq
+
+        url = reverse("changes-list")
+        response = self.client.get(url, {"since": 0, "limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertTrue(response.data["has_more"])
+        self.assertEqual(response.data["last_seq"], first_seq + 1)
+
+        response = self.client.get(url, {"since": response.data["last_seq"]})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertFalse(response.data["has_more"])
+        self.assertEqual(response.data["results"][0]["payload"]["name"], "Feed Item 2")
+
+    def test_feed_without_new_changes(self):
+        self.create_item("Only Item")
+        last_seq = ChangeLog.objects.latest().seq
+        response = self.client.get(reverse("changes-list"), {"since": last_seq})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.data["last_seq"], last_seq)
+
+    def test_feed_invalid_params(self):
+        response = self.client.get(reverse("changes-list"), {"since": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for wait in ("nan", "inf", "-1"):
+            response = self.client.get(reverse("changes-list"), {"wait": wait})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestParseMoment(SimpleTestCase):
+    def test_dates_cover_the_whole_day(self):
+        since = parse_moment("2026-10-01", end_of_day=False)
+        until = parse_moment("2026-10-01")
+        self.assertEqual(
+            timezone.localtime(since).replace(tzinfo=None),
+            datetime.datetime(2026, 10, 1),
+        )
+        self.assertEqual(
+            timezone.localtime(until).replace(tzinfo=None),
+            datetime.datetime.combine(datetime.date(2026, 10, 1), datetime.time.max),
+        )
+        # Datetimes are taken as given either way.
+        self.assertEqual(
+            parse_moment("2026-10-01T08:30:00", end_of_day=False),
+            parse_moment("2026-10-01T08:30:00"),
+        )
+        with self.assertRaises(ValueError):
+            parse_moment("yesterday")
+
+
+class TestORJSONRenderer(SimpleTestCase):
+    def test_output_matches_json_renderer(self):
+        data = {
+            "price": Decimal("12.50"),
+            "created_at": datetime.datetime(
+                2025, 2, 5, 15, 4, 0, 123456, tzinfo=datetime.timezone.utc
+            ),
+            "expires": datetime.date(2026, 1, 1),
+            "name": "Caf\u00e9 \u2028",
+            "counts": {1: 2},
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {"a": [1, 2]}
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
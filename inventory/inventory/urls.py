@@ -12,6 +12,16 @@ router.register("store", views.StoreViewSet, basename="stores")
 router.register("location", views.LocationViewSet, basename="locations")
 router.register("stock-movement", views.StockMovementViewSet)
 router.register("reservations", views.SupplyReservationViewSet, basename="reservations")
+router.register("returns", views.ReturnRecallViewSet, basename="returns")
+router.register("stock-ledger", views.StockLedgerViewSet, basename="stock-ledger")
+router.register(
+    "reorder-suggestions",
+    views.ReorderSuggestionViewSet,
+    basename="reorder-suggestions",
+)
+router.register("analytics", views.AnalyticsViewSet, basename="analytics")
+router.register("sync", views.SyncViewSet, basename="sync")
+router.register("changes", views.ChangeLogViewSet, basename="changes")
 
 items_router = routers.NestedDefaultRouter(router, "items", lookup="item")
 items_router.register("images", views.ItemImageViewSet, basename="item-images")
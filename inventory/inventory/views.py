@@ -1,32 +1,64 @@
+import datetime
+import math
+import time
+import numpy as np
 from django.shortcuts import render
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django.conf import settings
-from django.db.models.aggregates import Count
+from django.db import transaction
+from django.http import Http404
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.aggregates import Count, Sum
+from django.db.models.functions import Lower
 from django.contrib.postgres.search import TrigramSimilarity
-from rest_framework.viewsets import ModelViewSet, GenericViewSet
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.viewsets import ModelViewSet, GenericViewSet, ReadOnlyModelViewSet
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 
 from .models import (
     Category,
+    ChangeLog,
     Item,
     Location,
     Supply,
     Store,
     StockMovement,
+    StockLedgerEntry,
     ReturnRecall,
     ItemImage,
     SupplyReservation,
 )
 from .serializers import (
     CategorySerializer,
+    ChangeLogSerializer,
     ItemSerializer,
     SupplySerializer,
+    SupplyStockSerializer,
+    SupplyPriceHistorySerializer,
     StoreSerializer,
     LocationSerializer,
     StockMovementSerializer,
+    StockLedgerEntrySerializer,
+    StockOnHandSerializer,
+    CycleCountSerializer,
+    ReorderSuggestionSerializer,
+    ABCAnalysisSerializer,
     ReturnRecallSerializer,
+    ReturnRecallDecisionSerializer,
     ItemImageSerializer,
     SupplyReservationSerializer,
 )
+from .analytics import abc_analysis
+from .forecasting import reorder_suggestions
+from .ledger import stock_on_hand
+from .mixins import BatchRetrieveMixin, parse_id_list
+from .pricing import price_timeline
+from .sync import decode_cursor, initial_state, sync_page
+from .stock import StockAdjustment, apply_stock_adjustments, plan_cycle_count
 
 # Create your views here.
 
@@ -36,7 +68,7 @@ class CategoryViewSet(ModelViewSet):
     serializer_class = CategorySerializer
 
 
-class ItemViewSet(ModelViewSet):
+class ItemViewSet(BatchRetrieveMixin, ModelViewSet):
     serializer_class = ItemSerializer
 
     @extend_schema(parameters=settings.ITEM_LIST_QUERY_PARAMETERS)
@@ -74,13 +106,219 @@ class ItemViewSet(ModelViewSet):
 
         return queryset
 
+    @extend_schema(parameters=settings.ITEM_AUTOCOMPLETE_QUERY_PARAMETERS)
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request, *args, **kwargs):
+        prefix = request.query_params.get("q", "").strip().lower()
+        try:
+            limit = int(
+                request.query_params.get("limit", settings.ITEM_AUTOCOMPLETE_LIMIT)
+            )
+        except ValueError:
+            return Response(
+                {"limit": "limit must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, settings.ITEM_AUTOCOMPLETE_MAX_LIMIT))
+        if not prefix:
+            return Response({"results": []})
+
+        # Matches the expression of `item_name_prefix_idx`, so the lookup is an
+        # index range scan rather than a trigram comparison against every name.
+        results = (
+            self.get_queryset()
+            .annotate(name_lower=Lower("name"))
+            .filter(name_lower__startswith=prefix)
+            .order_by("name_lower", "id")
+            .values("id", "name")[:limit]
+        )
+        return Response({"results": list(results)})
 
-class SupplyViewSet(ModelViewSet):
+
+class SupplyViewSet(BatchRetrieveMixin, ModelViewSet):
     queryset = Supply.objects.all()
     serializer_class = SupplySerializer
 
+    @extend_schema(
+        parameters=settings.SUPPLY_STOCK_QUERY_PARAMETERS,
+        responses=SupplyStockSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"])
+    def stock(self, request, *args, **kwargs):
+        """
+        Stock on hand and its valuation per item and base unit, aggregated
+        entirely in the database from the normalized base quantities.
+        """
+        queryset = self.get_queryset()
+        item_id = request.query_params.get("item_id")
+        if item_id:
+            queryset = queryset.filter(item_id=item_id)
+        store_id = request.query_params.get("store_id")
+        if store_id:
+            queryset = queryset.filter(store_id=store_id)
+
+        totals = (
+            queryset.values("item", "base_unit")
+            .annotate(
+                total_quantity=Sum("base_quantity"),
+                cost_value=Sum(F("quantity") * F("cost_price")),
+                sale_value=Sum(F("quantity") * F("sale_price")),
+            )
+            .order_by("item", "base_unit")
+        )
+        page = self.paginate_queryset(totals)
+        serializer = SupplyStockSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=settings.SUPPLY_PRICE_HISTORY_QUERY_PARAMETERS,
+        responses=SupplyPriceHistorySerializer(many=True),
+    )
+    @action(detail=True, methods=["get"], url_path="price-history")
+    def price_history(self, request, *args, **kwargs):
+        """
+        Price changes of the supply between `since` and `until`, starting
+        with the price in effect at `since`.
+        """
+        params = request.query_params
+        try:
+            since = (
+                parse_moment(params["since"], end_of_day=False)
+                if params.get("since")
+                else None
+            )
+            until = parse_moment(params["until"]) if params.get("until") else None
+        except ValueError:
+            return Response(
+                {"detail": "since and until must be dates or datetimes."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            supply_id = int(kwargs["pk"])
+        except ValueError:
+            raise Http404
+        history = list(price_timeline(supply_id, since=since, until=until))
+        # Every supply has at least one entry, so only an empty range needs
+        # the supply itself looked up.
+        if not history:
+            self.get_object()
+        return Response(SupplyPriceHistorySerializer(history, many=True).data)
+
+    @extend_schema(request=CycleCountSerializer)
+    @action(detail=False, methods=["post"], url_path="cycle-count")
+    def cycle_count(self, request, *args, **kwargs):
+        """
+        Reconcile physical stock counts. Current quantities are loaded for all
+        lines at once and the variances applied with set-based writes, each
+        recorded as a stock movement. With `dry_run` only the summary is
+        returned.
+        """
+        serializer = CycleCountSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = serializer.validated_data["lines"]
 
-class StoreViewSet(ModelViewSet):
+        with transaction.atomic():
+            variances, unmatched, adjustments = plan_cycle_count(
+                lines, serializer.validated_data["reason"]
+            )
+            movements = []
+            if not serializer.validated_data["dry_run"]:
+                movements = apply_stock_adjustments(adjustments)
+
+        return Response(
+            {
+                "lines": len(lines),
+                "matched": len(variances),
+                "expected": sum(line["expected"] for line in variances),
+                "counted": sum(line["counted"] for line in variances),
+                "shrinkage": -sum(
+                    line["variance"] for line in variances if line["variance"] < 0
+                ),
+                "surplus": sum(
+                    line["variance"] for line in variances if line["variance"] > 0
+                ),
+                "movements": len(movements),
+                "dry_run": serializer.validated_data["dry_run"],
+                "variances": [line for line in variances if line["variance"]],
+                "unmatched": unmatched,
+            }
+        )
+
+    @extend_schema(parameters=settings.SUPPLY_AVAILABILITY_QUERY_PARAMETERS)
+    @action(detail=False, methods=["get", "post"])
+    def availability(self, request, *args, **kwargs):
+        """
+        On hand, actively reserved and available quantity of many items across
+        stores, as item x store matrices from one grouped query. Rows follow
+        the requested item order and columns the store order.
+        """
+        data = request.data if request.method == "POST" else request.query_params
+        try:
+            item_ids = parse_id_list(data.get("items", ""))
+            store_ids = parse_id_list(data.get("stores", ""))
+            business_id = data.get("business_id")
+            business_id = int(business_id) if business_id else None
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not item_ids or len(item_ids) > settings.AVAILABILITY_MAX_ITEMS:
+            return Response(
+                {
+                    "items": f"Between 1 and {settings.AVAILABILITY_MAX_ITEMS} item ids are required."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(store_ids) > settings.AVAILABILITY_MAX_STORES:
+            return Response(
+                {
+                    "stores": f"At most {settings.AVAILABILITY_MAX_STORES} store ids are accepted."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = Supply.objects.filter(item_id__in=item_ids)
+        if store_ids:
+            queryset = queryset.filter(store_id__in=store_ids)
+        if business_id is not None:
+            queryset = queryset.filter(store__business_id=business_id)
+        active_reserved = (
+            SupplyReservation.objects.filter(supply=OuterRef("pk"), status="active")
+            .values("supply")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        rows = (
+            queryset.annotate(reserved=Coalesce(Subquery(active_reserved), Value(0)))
+            .values("item_id", "store_id")
+            .annotate(on_hand=Sum("quantity"), reserved_total=Sum("reserved"))
+            .order_by()
+            .values_list("item_id", "store_id", "on_hand", "reserved_total")
+        )
+
+        rows = np.array(list(rows), dtype="i8").reshape(-1, 4)
+        if not store_ids:
+            store_ids = np.unique(rows[:, 1]).tolist()
+        item_index = {item_id: i for i, item_id in enumerate(item_ids)}
+        store_index = {store_id: i for i, store_id in enumerate(store_ids)}
+        rows_at = [item_index[item_id] for item_id in rows[:, 0].tolist()]
+        columns_at = [store_index[store_id] for store_id in rows[:, 1].tolist()]
+
+        on_hand = np.zeros((len(item_ids), len(store_ids)), dtype="i8")
+        reserved = np.zeros_like(on_hand)
+        on_hand[rows_at, columns_at] = rows[:, 2]
+        reserved[rows_at, columns_at] = rows[:, 3]
+        return Response(
+            {
+                "items": item_ids,
+                "stores": store_ids,
+                "on_hand": on_hand.tolist(),
+                "reserved": reserved.tolist(),
+                "available": np.clip(on_hand - reserved, 0, None).tolist(),
+            }
+        )
+
+
+class StoreViewSet(BatchRetrieveMixin, ModelViewSet):
     queryset = Store.objects.all()
     serializer_class = StoreSerializer
 
@@ -100,6 +338,136 @@ class ItemImageViewSet(ModelViewSet):
     serializer_class = ItemImageSerializer
 
 
+class ReturnRecallViewSet(ModelViewSet):
+    """
+    Customer returns and supplier recalls. Creating accepts a single line or a
+    list of lines; pending lines are then approved or rejected in bulk.
+    """
+
+    queryset = ReturnRecall.objects.all().order_by("-id")
+    serializer_class = ReturnRecallSerializer
+    http_method_names = ["get", "post", "delete", "head", "options"]
+
+    def create(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        if many and len(request.data) > settings.RETURNS_MAX_LINES:
+            return Response(
+                {
+                    "detail": f"At most {settings.RETURNS_MAX_LINES} return lines can be submitted at once."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+        lines = serializer.validated_data if many else [serializer.validated_data]
+        returns = ReturnRecall.objects.bulk_create(
+            ReturnRecall(**line) for line in lines
+        )
+        data = self.get_serializer(returns, many=True).data
+        return Response(data if many else data[0], status=status.HTTP_201_CREATED)
+
+    def get_pending_returns(self, request):
+        serializer = ReturnRecallDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        returns = list(
+            # Only the returns are locked: FOR UPDATE cannot cover the
+            # nullable side of the supply join. The restock is an UPDATE
+            # relative to the current quantity, so supplies need no lock.
+            ReturnRecall.objects.select_for_update(of=("self",))
+            .filter(id__in=ids, status=ReturnRecall.PENDING)
+            .select_related("supply")
+        )
+        found = {line.id for line in returns}
+        return returns, [pk for pk in ids if pk not in found]
+
+    @extend_schema(request=ReturnRecallDecisionSerializer)
+    @action(detail=False, methods=["post"])
+    def approve(self, request, *args, **kwargs):
+        """
+        Approve pending returns: restock their supplies and record the stock
+        movements with set-based writes in a single transaction.
+        """
+        with transaction.atomic():
+            returns, not_pending = self.get_pending_returns(request)
+            unlinked = [line.id for line in returns if line.supply is None]
+            if unlinked:
+                return Response(
+                    {
+                        "detail": "Returns without a supply cannot be restocked.",
+                        "ids": unlinked,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            movements = apply_stock_adjustments(
+                [
+                    StockAdjustment(
+                        line.supply_id,
+                        line.supply.store_id,
+                        line.quantity,
+                        f"Return #{line.id} approved",
+                    )
+                    for line in returns
+                ]
+            )
+            ReturnRecall.objects.filter(id__in=[line.id for line in returns]).update(
+                status=ReturnRecall.APPROVED
+            )
+
+        return Response(
+            {
+                "approved": [line.id for line in returns],
+                "not_pending": not_pending,
+                "movements": StockMovementSerializer(movements, many=True).data,
+            }
+        )
+
+    @extend_schema(request=ReturnRecallDecisionSerializer)
+    @action(detail=False, methods=["post"])
+    def reject(self, request, *args, **kwargs):
+        with transaction.atomic():
+            returns, not_pending = self.get_pending_returns(request)
+            ReturnRecall.objects.filter(id__in=[line.id for line in returns]).update(
+                status=ReturnRecall.REJECTED
+            )
+        return Response(
+            {"rejected": [line.id for line in returns], "not_pending": not_pending}
+        )
+
+    @extend_schema(parameters=settings.RECALL_QUERY_PARAMETERS)
+    @action(detail=False, methods=["get"])
+    def recall(self, request, *args, **kwargs):
+        """
+        Trace a batch: every supply, stock movement, reservation and return
+        tied to `batch_number`, each found through an indexed lookup.
+        """
+        batch_number = request.query_params.get("batch_number")
+        if not batch_number:
+            return Response(
+                {"batch_number": "This query parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        supplies = Supply.objects.filter(batch_number=batch_number)
+        movements = StockMovement.objects.filter(supply__batch_number=batch_number)
+        reservations = SupplyReservation.objects.filter(
+            supply__batch_number=batch_number
+        )
+        returns = ReturnRecall.objects.filter(supply__batch_number=batch_number)
+        return Response(
+            {
+                "batch_number": batch_number,
+                "supplies": SupplySerializer(supplies, many=True).data,
+                "movements": StockMovementSerializer(movements, many=True).data,
+                "reservations": SupplyReservationSerializer(
+                    reservations, many=True
+                ).data,
+                "returns": ReturnRecallSerializer(returns, many=True).data,
+            }
+        )
+
+
 class SupplyReservationViewSet(ModelViewSet):
     queryset = SupplyReservation.objects.all()
     serializer_class = SupplyReservationSerializer
@@ -114,3 +482,353 @@ class SupplyReservationViewSet(ModelViewSet):
         if status_param:
             queryset = queryset.filter(status=status_param)
         return queryset
+
+
+class ChangeLogViewSet(GenericViewSet):
+    """
+    Incremental feed of inventory changes ordered by sequence number.
+    Consumers pass the last `seq` they processed as `since` and may long poll
+    with `wait` until new changes are committed.
+    """
+
+    queryset = ChangeLog.objects.all()
+    serializer_class = ChangeLogSerializer
+    pagination_class = None
+
+    def get_feed_params(self):
+        params = self.request.query_params
+        since = int(params.get("since", 0))
+        limit = int(params.get("limit", settings.CHANGE_FEED_DEFAULT_LIMIT))
+        wait = float(params.get("wait", 0))
+        # nan and inf parse as floats but would never let the poll end.
+        if since < 0 or limit < 1 or not math.isfinite(wait) or wait < 0:
+            raise ValueError
+        return (
+            since,
+            min(limit, settings.CHANGE_FEED_MAX_LIMIT),
+            min(wait, settings.CHANGE_FEED_MAX_WAIT),
+        )
+
+    @extend_schema(parameters=settings.CHANGE_FEED_QUERY_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        try:
+            since, limit, wait = self.get_feed_params()
+        except ValueError:
+            return Response(
+                {
+                    "detail": "since and wait must be non-negative numbers and limit a positive integer."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        deadline = time.monotonic() + wait
+        while True:
+            # Fetch one extra row to tell the consumer whether more is waiting.
+            entries = list(
+                self.get_queryset().filter(seq__gt=since).order_by("seq")[: limit + 1]
+            )
+            if entries or time.monotonic() >= deadline:
+                break
+            time.sleep(settings.CHANGE_FEED_POLL_INTERVAL)
+
+        entries, has_more = entries[:limit], len(entries) > limit
+        return Response(
+            {
+                "results": self.get_serializer(entries, many=True).data,
+                "last_seq": entries[-1].seq if entries else since,
+                "has_more": has_more,
+            }
+        )
+
+
+class StockLedgerViewSet(ReadOnlyModelViewSet):
+    """
+    Read-only access to the stock ledger and point-in-time stock levels.
+    """
+
+    serializer_class = StockLedgerEntrySerializer
+
+    def get_queryset(self):
+        queryset = StockLedgerEntry.objects.all()
+        params = self.request.query_params
+        for param in ("item", "store", "supply", "batch_number"):
+            if params.get(param):
+                queryset = queryset.filter(**{param: params[param]})
+        if params.get("since"):
+            queryset = queryset.filter(
+                created_at__gte=parse_moment(params["since"], end_of_day=False)
+            )
+        if params.get("until"):
+            queryset = queryset.filter(created_at__lte=parse_moment(params["until"]))
+        return queryset
+
+    @extend_schema(parameters=settings.STOCK_LEDGER_LIST_QUERY_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        try:
+            return super().list(request, *args, **kwargs)
+        except ValueError:
+            return Response(
+                {
+                    "detail": "item, store and supply must be integers and since/until dates or datetimes."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    @extend_schema(
+        parameters=settings.STOCK_ON_HAND_QUERY_PARAMETERS,
+        responses=StockOnHandSerializer(many=True),
+    )
+    @action(detail=False, methods=["get"], url_path="on-hand")
+    def on_hand(self, request, *args, **kwargs):
+        """
+        Stock per item, store and batch as of `at`, computed from the latest
+        checkpoint taken by then plus the ledger entries after it.
+        """
+        params = request.query_params
+        try:
+            at = parse_moment(params["at"]) if params.get("at") else None
+            store = int(params["store"]) if params.get("store") else None
+            item = int(params["item"]) if params.get("item") else None
+        except ValueError:
+            return Response(
+                {"detail": "at must be a date or datetime and store/item integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        checkpoint, rows = stock_on_hand(at=at, store=store, item=item)
+        return Response(
+            {
+                "at": at or timezone.now(),
+                "checkpoint": checkpoint,
+                "results": StockOnHandSerializer(rows, many=True).data,
+            }
+        )
+
+
+def parse_moment(value, end_of_day=True):
+    """
+    Parse an ISO datetime, or a date, as an aware datetime. A date means the
+    end of that day, for upper bounds, or its start with `end_of_day=False`,
+    for lower bounds. Raises ValueError for anything else.
+    """
+    # parse_datetime also accepts a bare date, as midnight; try dates first.
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        moment = datetime.datetime.combine(
+            day, datetime.time.max if end_of_day else datetime.time.min
+        )
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(value)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class ReorderSuggestionViewSet(GenericViewSet):
+    """
+    Reorder points and quantities per item and store, forecast from the
+    fulfilled reservations of the last `days` days.
+    """
+
+    serializer_class = ReorderSuggestionSerializer
+
+    def get_forecast_params(self):
+        params = self.request.query_params
+        forecast = {
+            "days": int(params.get("days", settings.REORDER_DEFAULT_DAYS)),
+            "lead_time": float(
+                params.get("lead_time", settings.REORDER_DEFAULT_LEAD_TIME)
+            ),
+            "review_period": float(
+                params.get("review_period", settings.REORDER_DEFAULT_REVIEW_PERIOD)
+            ),
+            "service_level": float(
+                params.get("service_level", settings.REORDER_DEFAULT_SERVICE_LEVEL)
+            ),
+            "store": int(params["store"]) if params.get("store") else None,
+            "item": int(params["item"]) if params.get("item") else None,
+        }
+        if (
+            not 1 <= forecast["days"] <= settings.REORDER_MAX_DAYS
+            # nan and inf parse as floats; the forecast needs finite periods.
+            or not math.isfinite(forecast["lead_time"])
+            or not math.isfinite(forecast["review_period"])
+            or forecast["lead_time"] < 0
+            or forecast["review_period"] < 0
+            or not 0.5 <= forecast["service_level"] < 1
+        ):
+            raise ValueError
+        return forecast
+
+    @extend_schema(parameters=settings.REORDER_SUGGESTION_QUERY_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        try:
+            forecast = self.get_forecast_params()
+        except ValueError:
+            return Response(
+                {
+                    "detail": f"days must be between 1 and {settings.REORDER_MAX_DAYS}, lead_time and review_period non-negative, service_level in [0.5, 1) and store/item integers."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        columns, order = reorder_suggestions(**forecast)
+        if request.query_params.get("needs_reorder", "").lower() == "true":
+            order = order[columns["needs_reorder"][order]]
+
+        # Rows are only materialized for the requested page.
+        page = self.paginate_queryset(order)
+        rows = [
+            {
+                "item": int(columns["item"][i]),
+                "store": int(columns["store"][i]),
+                "on_hand": int(columns["on_hand"][i]),
+                "daily_demand": round(float(columns["daily_demand"][i]), 3),
+                "demand_std": round(float(columns["demand_std"][i]), 3),
+                "safety_stock": int(columns["safety_stock"][i]),
+                "notify_below": int(columns["notify_below"][i]),
+                "reorder_quantity": int(columns["reorder_quantity"][i]),
+                "needs_reorder": bool(columns["needs_reorder"][i]),
+                "days_of_cover": (
+                    round(float(columns["days_of_cover"][i]), 1)
+                    if columns["daily_demand"][i] > 0
+                    else None
+                ),
+            }
+            for i in (order if page is None else page)
+        ]
+        data = self.get_serializer(rows, many=True).data
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+
+class AnalyticsViewSet(GenericViewSet):
+    serializer_class = ABCAnalysisSerializer
+
+    @extend_schema(parameters=settings.ABC_ANALYSIS_QUERY_PARAMETERS)
+    @action(detail=False, methods=["get"])
+    def abc(self, request, *args, **kwargs):
+        """
+        ABC classes and turnover per item and store of a business, from stock
+        cost value and fulfilled reservations over the last `days` days.
+        Results are cached; pass `refresh=true` to recompute.
+        """
+        params = request.query_params
+        try:
+            business_id = int(params["business_id"])
+            days = int(params.get("days", settings.ABC_DEFAULT_DAYS))
+            store = int(params["store"]) if params.get("store") else None
+            if not 1 <= days <= settings.ABC_MAX_DAYS:
+                raise ValueError
+        except (KeyError, ValueError):
+            return Response(
+                {
+                    "detail": f"business_id is required, days must be between 1 and {settings.ABC_MAX_DAYS} and store an integer."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        abc_class = params.get("class", "").upper()
+        if abc_class not in ("", "A", "B", "C"):
+            return Response(
+                {"class": "class must be A, B or C."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = abc_analysis(
+            business_id, days, refresh=params.get("refresh", "").lower() == "true"
+        )
+        columns = result["columns"]
+        mask = np.ones(len(columns["item"]), dtype=bool)
+        if store is not None:
+            mask &= columns["store"] == store
+        if abc_class:
+            mask &= columns["abc_class"] == abc_class
+        rows = self.paginate_queryset(np.flatnonzero(mask))
+
+        data = self.get_serializer(
+            [
+                {
+                    "item": int(columns["item"][i]),
+                    "store": int(columns["store"][i]),
+                    "on_hand": int(columns["on_hand"][i]),
+                    "stock_value": round(float(columns["stock_value"][i]), 2),
+                    "consumed": int(columns["consumed"][i]),
+                    "consumed_value": round(float(columns["consumed_value"][i]), 2),
+                    "share": round(float(columns["share"][i]), 4),
+                    "cumulative_share": round(float(columns["cumulative_share"][i]), 4),
+                    "abc_class": str(columns["abc_class"][i]),
+                    "turnover": (
+                        None
+                        if np.isnan(columns["turnover"][i])
+                        else round(float(columns["turnover"][i]), 2)
+                    ),
+                }
+                for i in rows
+            ],
+            many=True,
+        ).data
+        response = self.get_paginated_response(data)
+        response.data["computed_at"] = result["computed_at"]
+        response.data["stores"] = [
+            summary
+            for summary in result["stores"]
+            if store is None or summary["store"] == store
+        ]
+        return response
+
+
+class SyncViewSet(GenericViewSet):
+    """
+    Delta sync for offline catalogs. Returns categories, stores, items and
+    supplies changed since `updated_since`, then tombstones of deleted rows,
+    as compact field lists and row arrays. Follow `cursor` until it is null,
+    then keep `updated_since` for the next sync.
+    """
+
+    pagination_class = None
+
+    @extend_schema(parameters=settings.SYNC_QUERY_PARAMETERS)
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            limit = int(params.get("limit", settings.SYNC_DEFAULT_LIMIT))
+            if limit < 1:
+                raise ValueError("limit must be a positive integer.")
+            if params.get("cursor"):
+                state = decode_cursor(params["cursor"])
+            else:
+                updated_since = None
+                if params.get("updated_since"):
+                    updated_since = parse_moment(
+                        params["updated_since"], end_of_day=False
+                    )
+                business_id = params.get("business_id")
+                state = initial_state(
+                    updated_since, int(business_id) if business_id else None
+                )
+        except ValueError:
+            return Response(
+                {
+                    "detail": "updated_since must be a datetime, cursor one returned by this endpoint, limit and business_id integers."
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results, cursor, updated_since = sync_page(
+            state,
+            min(limit, settings.SYNC_MAX_LIMIT),
+            settings.SYNC_OVERLAP_SECONDS,
+        )
+        return Response(
+            {
+                "results": results,
+                "cursor": cursor,
+                "updated_since": updated_since,
+            }
+        )
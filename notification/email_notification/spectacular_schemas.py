@@ -55,3 +55,49 @@ send_email_schema = extend_schema(
         ),
     },
 )
+
+send_bulk_email_schema = extend_schema(
+    summary="Send Many Emails in One Call",
+    description="This endpoint sends a list of independent emails over one SMTP connection and reports the outcome of each, in request order.",
+    request={
+        'application/json': {
+            'type': 'object',
+            'properties': {
+                'emails': {
+                    'type': 'array',
+                    'description': 'The emails to send, each with its own subject, message and recipients.',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'subject': {'type': 'string', 'example': 'Invitation'},
+                            'message': {'type': 'string', 'example': 'Accept your invitation:\n <Link>'},
+                            'recipients': {'type': 'string', 'example': 'user1@example.com'},
+                        },
+                        'required': ['subject', 'message', 'recipients'],
+                    },
+                },
+            },
+            'required': ['emails'],
+        }
+    },
+    responses={
+        200: OpenApiResponse(
+            description="Emails processed; see the per-email results",
+            examples={
+                'application/json': {
+                    "status": "Sent 1 of 2 emails",
+                    "results": [
+                        {"status": "sent"},
+                        {"status": "failed", "error": "Recipient refused"}
+                    ]
+                }
+            }
+        ),
+        400: OpenApiResponse(
+            description="Missing or invalid emails list",
+        ),
+        500: OpenApiResponse(
+            description="Could not connect to the mail server; nothing was sent",
+        ),
+    },
+)
@@ -59,3 +59,33 @@ class SendSingleEmailTest(TestCase):
             "status": "Failed to send email",
             "error": "SMTP server not responding"
         })
+
+
+class SendBulkEmailTest(TestCase):
+    def setUp(self):
+        self.api_key, self.key = APIKey.objects.create_key(name="Test Bulk Email Key")
+        self.url = reverse('send_bulk_email')
+        self.headers = {'HTTP_AUTHORIZATION': f'Api-Key {self.key}'}
+        self.payload = {
+            "emails": [
+                {"subject": "Invite", "message": "Link 1", "recipients": "one@example.com"},
+                {"subject": "Invite", "message": "Link 2", "recipients": "two@example.com"},
+            ]
+        }
+
+    @patch('django.core.mail.EmailMessage.send')
+    def test_send_bulk_email_reports_each_message(self, mock_send):
+        mock_send.side_effect = [1, Exception("Recipient refused")]
+
+        response = self.client.post(self.url, data=self.payload, content_type='application/json', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [
+            {"status": "sent"},
+            {"status": "failed", "error": "Recipient refused"},
+        ])
+        self.assertEqual(mock_send.call_count, 2)
+
+    def test_send_bulk_email_invalid_payload(self):
+        payload = {"emails": [{"subject": "Invite", "recipients": "one@example.com"}]}
+        response = self.client.post(self.url, data=payload, content_type='application/json', **self.headers)
+        self.assertEqual(response.status_code, 400)
@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('send-single-email/', views.send_single_email, name='send_single_email'),
+    path('send-bulk-email/', views.send_bulk_email, name='send_bulk_email'),
 ]
@@ -3,16 +3,36 @@ from rest_framework.decorators import api_view
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from rest_framework import status
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
 from django.template.loader import render_to_string
 import logging
 from django.shortcuts import render
 from monitor.models import RequestLog
 from monitor.utils import data_from_request, build_error_log
-from .spectacular_schemas import send_email_schema
+from .spectacular_schemas import send_bulk_email_schema, send_email_schema
 
 logger = logging.getLogger(__name__)
 
+def build_email(subject, message, recipients, connection=None):
+    # Ensure recipients is a list (it can be a comma-separated string)
+    if isinstance(recipients, str):
+        recipients = [email.strip() for email in recipients.split(',')]
+
+    html_message = render_to_string('email_template.html', {
+        'subject': subject,
+        'message': message
+    })
+    email = EmailMessage(
+        subject=subject,
+        body=html_message,
+        from_email=settings.EMAIL_HOST_USER,
+        to=recipients,
+        connection=connection,
+    )
+    email.content_subtype = 'html'
+    return email
+
+
 @csrf_exempt
 @send_email_schema
 @api_view(('POST',))
@@ -38,24 +58,7 @@ def send_single_email(request):
             )
 
 
-        # Ensure recipients is a list (it can be a comma-separated string)
-        if isinstance(recipients, str):
-            recipients = [email.strip() for email in recipients.split(',')]
-
-        # Build email
-        html_message = render_to_string('email_template.html', {
-            'subject': subject,
-            'message': message
-        })
-
-        email = EmailMessage(
-            subject=subject,
-            body=html_message,
-            from_email=settings.EMAIL_HOST_USER,
-            to=recipients
-        )
-        email.content_subtype = 'html'
-        
+        email = build_email(subject, message, recipients)
         email.send(fail_silently=False)
 
         RequestLog.objects.create(sender = client_name, 
@@ -75,6 +78,67 @@ def send_single_email(request):
         return Response({"status": "Failed to send email", "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@csrf_exempt
+@send_bulk_email_schema
+@api_view(('POST',))
+def send_bulk_email(request):
+    """
+    Send many independent emails over one SMTP connection. Each message is
+    reported on separately so callers can retry only the ones that failed.
+    """
+
+    client_name, ip_address = data_from_request(request)
+
+    emails = request.data.get('emails')
+    if (
+        not isinstance(emails, list)
+        or not emails
+        or len(emails) > settings.EMAIL_BULK_MAX_MESSAGES
+        or not all(
+            isinstance(email, dict)
+            and email.get('subject') and email.get('message') and email.get('recipients')
+            for email in emails
+        )
+    ):
+        RequestLog.objects.create(sender = client_name,
+                            response_status_code=400,
+                            sent_to = RequestLog.EMAIL)
+        return Response(
+            {
+                "status": "Invalid emails",
+                "error": f"emails must be a list of 1 to {settings.EMAIL_BULK_MAX_MESSAGES} objects with subject, message, and recipients"
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                try:
+                    build_email(email['subject'], email['message'], email['recipients'], connection).send(fail_silently=False)
+                    results.append({"status": "sent"})
+                except Exception as e:
+                    logger.error(e)
+                    results.append({"status": "failed", "error": str(e)})
+    except Exception as e:
+        # The connection itself failed; nothing was sent.
+        my_error = build_error_log(e)
+        RequestLog.objects.create(sender = client_name,
+                                response_status_code=500,
+                                sent_to = RequestLog.EMAIL,
+                                error_log = my_error)
+        logger.error(e)
+        return Response({"status": "Failed to send emails", "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    sent = sum(result['status'] == 'sent' for result in results)
+    RequestLog.objects.create(sender = client_name,
+                            response_status_code=200,
+                            sent_to = RequestLog.EMAIL)
+    logger.info(f"{client_name}({ip_address}) sent {sent} of {len(emails)} bulk emails")
+    return Response({"status": f"Sent {sent} of {len(emails)} emails", "results": results}, status=status.HTTP_200_OK)
+
+
 def home(request):
     return render(request, 'home.html')
 
@@ -0,0 +1,112 @@
+import heapq
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('query_stats')
+
+
+class QueryStats:
+    """
+    Database execute wrapper that counts queries, sums their duration and
+    keeps the slowest ones. Statements are compared before parameters are
+    bound, so the same SQL repeated many times points at an N+1 pattern.
+    """
+
+    def __init__(self, keep_slowest=3):
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            self.statements[sql] += 1
+            entry = (elapsed, self.count, sql)
+            if len(self.slowest) < self.keep_slowest:
+                heapq.heappush(self.slowest, entry)
+            elif self.slowest and entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def repeated(self, threshold):
+        return [
+            (sql, count)
+            for sql, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+    def as_dict(self, repeat_threshold):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.duration * 1000, 2),
+            'slowest': [
+                {'ms': round(elapsed * 1000, 2), 'sql': sql}
+                for elapsed, _, sql in sorted(self.slowest, reverse=True)
+            ],
+            'repeated': [
+                {'count': count, 'sql': sql}
+                for sql, count in self.repeated(repeat_threshold)
+            ],
+        }
+
+
+@contextmanager
+def collect_queries(keep_slowest=3):
+    """
+    Record the queries run on every database connection of this thread.
+    """
+    stats = QueryStats(keep_slowest)
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+        yield stats
+
+
+class QueryStatsMiddleware:
+    """
+    Record query count, DB time and the slowest queries of each request.
+    Logged as one structured line per request, at WARNING level when a
+    statement repeats often enough to look like an N+1 pattern, and exposed
+    as a `Server-Timing` header when QUERY_STATS_SERVER_TIMING is set.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_STATS_ENABLED:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with collect_queries(settings.QUERY_STATS_SLOWEST) as stats:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        if settings.QUERY_STATS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+                f'total;dur={total * 1000:.2f}'
+            )
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            **stats.as_dict(settings.QUERY_STATS_REPEAT_THRESHOLD),
+        }
+        level = logging.WARNING if record['repeated'] else logging.INFO
+        logger.log(level, json.dumps(record), extra={'query_stats': record})
+        return response
@@ -46,6 +46,8 @@ EMAIL_HOST = os.getenv('EMAIL_HOST')  # SMTP host
 EMAIL_PORT = int(os.getenv('EMAIL_PORT'))  # SSMTP port
 EMAIL_USE_TLS = True  
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER') 
+# Most messages accepted by one send-bulk-email call.
+EMAIL_BULK_MAX_MESSAGES = config('EMAIL_BULK_MAX_MESSAGES', default=100, cast=int)
 SMS_API_KEY = os.getenv('SMS_API_KEY')  
 SMS_API_HEADER_FIELD = 'X-GeezSMS-Key'
 SMS_API_URL = 'https://api.geezsms.com/api/v1/sms/send'
@@ -71,6 +73,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notification.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,6 +84,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query instrumentation, see notification.middleware.
+QUERY_STATS_ENABLED = config('QUERY_STATS_ENABLED', default=True, cast=bool)
+# Server-Timing reveals DB timings to clients, keep it to development.
+QUERY_STATS_SERVER_TIMING = config('QUERY_STATS_SERVER_TIMING', default=DEBUG, cast=bool)
+QUERY_STATS_SLOWEST = config('QUERY_STATS_SLOWEST', default=3, cast=int)
+# Identical statements run this many times in one request are logged as
+# a likely N+1 pattern.
+QUERY_STATS_REPEAT_THRESHOLD = config('QUERY_STATS_REPEAT_THRESHOLD', default=10, cast=int)
+
 ROOT_URLCONF = 'notification.urls'
 
 TEMPLATES = [
@@ -161,6 +173,15 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework_api_key.permissions.HasAPIKey',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'notification.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'notification.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_THROTTLE_RATES': {
         'sms': f'{sms_rate_limit}/minute',  
@@ -198,7 +219,14 @@ LOGGING = {
             "handlers": ["console", "file"],
             "level": os.environ.get("DJANGO_LOG_LEVEL", "INFO"),
             "propagate": True, 
-        }
+        },
+        # One JSON line per request from QueryStatsMiddleware, kept at INFO
+        # whatever DJANGO_LOG_LEVEL is.
+        "query_stats": {
+            "handlers": ["console", "file"],
+            "level": config('QUERY_STATS_LOG_LEVEL', default='INFO'),
+            "propagate": False,
+        },
     },
     "formatters": {
         "verbose": {